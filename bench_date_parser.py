@@ -0,0 +1,94 @@
+"""Бенчмарк разбора даты/времени: быстрый парсер против dateparser
+
+Запуск: python bench_date_parser.py
+"""
+import sys
+import io
+import time
+from datetime import date
+
+# Настройка кодировки для Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+from bot.utils.datetime_parser import (
+    parse_date_fast, parse_date_fallback, parse_time_fast, parse_time_fallback
+)
+
+# Реальные вводы пользователей на шагах даты и времени
+DATE_CORPUS = [
+    "26.11.2025", "26.11", "1.12", "01.12.2025", "26/11/2025", "2025-11-26",
+    "14 июня", "14 июня 2026", "1 декабря", "3 мая", "30 ноября", "7 января 2026 г.",
+    "завтра", "Завтра", "сегодня", "послезавтра", "tomorrow", "today",
+    "june 14", "14 june", "December 5th", "в пятницу", "суббота", "friday",
+    "через 3 дня", "in 2 days",
+]
+
+TIME_CORPUS = [
+    "19:00", "19.30", "19", "20:15", "9:00", "21.00", "в 19:00", "1930",
+    "7pm", "7:30 pm", "11 am", "7 вечера", "9 утра", "19ч", "полдень",
+]
+
+ITERATIONS = 200
+
+
+def _bench(func, corpus, iterations):
+    """Среднее время одного вызова в микросекундах"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for text in corpus:
+            func(text)
+    elapsed = time.perf_counter() - started
+    return elapsed / (iterations * len(corpus)) * 1_000_000
+
+
+def main():
+    today = date.today()
+
+    started = time.perf_counter()
+    import dateparser  # noqa: F401
+    import_ms = (time.perf_counter() - started) * 1000
+    print(f"Импорт dateparser: {import_ms:.1f} мс")
+
+    # Прогрев dateparser (первый вызов загружает языковые данные)
+    parse_date_fallback("завтра", today)
+    parse_time_fallback("19:00")
+
+    fast_misses = [text for text in DATE_CORPUS if parse_date_fast(text, today) is None]
+    fast_misses += [text for text in TIME_CORPUS if parse_time_fast(text) is None]
+    total = len(DATE_CORPUS) + len(TIME_CORPUS)
+    print(f"Быстрый путь покрывает {total - len(fast_misses)}/{total} вводов")
+    if fast_misses:
+        print(f"Не распознаны быстрым путем: {fast_misses}")
+
+    mismatches = []
+    for text in DATE_CORPUS:
+        fast = parse_date_fast(text, today)
+        slow = parse_date_fallback(text, today)
+        if fast is not None and fast != slow:
+            mismatches.append((text, fast, slow))
+    for text in TIME_CORPUS:
+        fast = parse_time_fast(text)
+        slow = parse_time_fallback(text)
+        if fast is not None and fast != slow:
+            mismatches.append((text, fast, slow))
+    if mismatches:
+        print("Расхождения (быстрый путь / dateparser):")
+        for text, fast, slow in mismatches:
+            print(f"  {text!r}: {fast} / {slow}")
+
+    slow_iterations = max(ITERATIONS // 20, 1)
+
+    fast_date = _bench(lambda text: parse_date_fast(text, today), DATE_CORPUS, ITERATIONS)
+    slow_date = _bench(lambda text: parse_date_fallback(text, today), DATE_CORPUS, slow_iterations)
+    fast_time = _bench(parse_time_fast, TIME_CORPUS, ITERATIONS)
+    slow_time = _bench(parse_time_fallback, TIME_CORPUS, slow_iterations)
+
+    print()
+    print(f"{'':10}{'быстрый, мкс':>16}{'dateparser, мкс':>18}{'ускорение':>12}")
+    print(f"{'дата':10}{fast_date:>16.1f}{slow_date:>18.1f}{slow_date / fast_date:>11.0f}x")
+    print(f"{'время':10}{fast_time:>16.1f}{slow_time:>18.1f}{slow_time / fast_time:>11.0f}x")
+
+
+if __name__ == "__main__":
+    main()
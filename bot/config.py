@@ -1,5 +1,6 @@
 """Конфигурация бота"""
 import os
+import socket
 from typing import List
 from dotenv import load_dotenv
 
@@ -15,6 +16,22 @@ ADMIN_IDS = [
     if admin_id.strip().isdigit()
 ]
 
+# Получение обновлений: "polling" (по умолчанию) или "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling").strip().lower()
+
+# Webhook: публичный адрес, путь и секрет (заголовок X-Telegram-Bot-Api-Secret-Token)
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL", "").rstrip("/")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+# Адрес встроенного aiohttp-сервера
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+# Сколько одновременных соединений Telegram открывает к webhook (1-100)
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+
+# Свой адрес Bot API (локальный сервер Bot API или тестовая заглушка), пусто - api.telegram.org
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "").rstrip("/")
+
 # Database URL
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./data/bot.db")
 
@@ -24,6 +41,24 @@ ORDERS_CHAT_ID = os.getenv("ORDERS_CHAT_ID", "")
 # Timezone
 TIMEZONE = os.getenv("TIMEZONE", "Europe/Moscow")
 
+# Сколько часов встреч в день у анкеты считается полной занятостью (для календаря)
+BOOKING_DAY_HOURS = float(os.getenv("BOOKING_DAY_HOURS", "12"))
+
+# Уведомления о новых заказах: больше ORDER_DIGEST_RATE заказов в минуту -
+# вместо отдельных сообщений сводка раз в ORDER_DIGEST_INTERVAL секунд
+ORDER_DIGEST_RATE = int(os.getenv("ORDER_DIGEST_RATE", "10"))
+ORDER_DIGEST_INTERVAL = int(os.getenv("ORDER_DIGEST_INTERVAL", "60"))
+
+# Напоминания: в памяти держатся задачи ближайших REMINDER_LOOKAHEAD_MINUTES минут,
+# окно догружается из БД раз в REMINDER_TOPUP_MINUTES минут
+REMINDER_LOOKAHEAD_MINUTES = int(os.getenv("REMINDER_LOOKAHEAD_MINUTES", "120"))
+REMINDER_TOPUP_MINUTES = int(os.getenv("REMINDER_TOPUP_MINUTES", "5"))
+
+# Несколько процессов бота: задачи напоминаний захватываются арендой на
+# REMINDER_LEASE_SECONDS секунд; INSTANCE_ID отличает процессы друг от друга
+REMINDER_LEASE_SECONDS = int(os.getenv("REMINDER_LEASE_SECONDS", "300"))
+INSTANCE_ID = os.getenv("INSTANCE_ID") or f"{socket.gethostname()}:{os.getpid()}"
+
 # Проверка обязательных параметров
 # Закомментировано для тестового запуска
 # if not BOT_TOKEN:
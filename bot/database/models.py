@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Optional
 from sqlalchemy import (
     Column, Integer, String, Float, DateTime, Boolean, 
-    ForeignKey, Text, JSON
+    ForeignKey, Text, JSON, Index, UniqueConstraint
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -21,6 +21,7 @@ class User(Base):
     first_name = Column(String(255), nullable=True)
     rules_accepted = Column(Boolean, default=False)
     rules_accepted_at = Column(DateTime, nullable=True)
+    is_blocked = Column(Boolean, nullable=False, default=False)  # Бот заблокирован или аккаунт удален
     created_at = Column(DateTime, default=datetime.utcnow)
     
     orders = relationship("Order", back_populates="user")
@@ -97,6 +98,9 @@ class Order(Base):
     reminder_sent = Column(Boolean, default=False)  # Отправлено ли напоминание за 15 мин
     notification_enabled = Column(Boolean, default=True)  # Включены ли уведомления
     
+    # Ключ идемпотентности: повторное подтверждение того же бронирования возвращает существующий заказ
+    idempotency_key = Column(String(64), unique=True, nullable=True)
+    
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -104,19 +108,109 @@ class Order(Base):
     profile = relationship("Profile", back_populates="orders")
     game = relationship("Game")
     reminder_tasks = relationship("ReminderTask", back_populates="order", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # История заказов пользователя (keyset-пагинация по created_at)
+        Index("ix_orders_user_created", "user_id", "created_at", "id"),
+        # Ближайшие встречи пользователя
+        Index("ix_orders_user_date", "user_id", "date"),
+        # Фильтры списка заказов в админке (и занятость анкет по датам)
+        Index("ix_orders_date", "date"),
+        Index("ix_orders_status_date", "payment_status", "date"),
+        Index("ix_orders_profile_date", "profile_id", "date"),
+        Index("ix_orders_game_date", "game_id", "date"),
+    )
+
+
+class OrderStats(Base):
+    """Сводная статистика заказов (обновляется вместе с заказами)"""
+    __tablename__ = "order_stats"
+    
+    id = Column(Integer, primary_key=True)
+    scope = Column(String(20), nullable=False)  # "total", "day", "profile", "game"
+    key = Column(String(50), nullable=False, default="")  # "", "2025-11-26", ID анкеты или игры
+    
+    orders_count = Column(Integer, nullable=False, default=0)  # Активные заказы
+    paid_count = Column(Integer, nullable=False, default=0)  # Оплаченные заказы
+    booked_amount = Column(Float, nullable=False, default=0)  # Сумма активных заказов
+    revenue = Column(Float, nullable=False, default=0)  # Сумма оплаченных заказов
+    cancelled_count = Column(Integer, nullable=False, default=0)  # Отмененные заказы
+    
+    __table_args__ = (
+        UniqueConstraint("scope", "key", name="uq_order_stats_scope_key"),
+    )
+
+
+class OutboxMessage(Base):
+    """Исходящее уведомление, записанное в одной транзакции с изменением заказа"""
+    __tablename__ = "outbox_messages"
+    
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)  # "new_order", "message"
+    order_id = Column(Integer, nullable=True)  # Без внешнего ключа: заказ могут отменить до отправки
+    chat_id = Column(Integer, nullable=True)  # Для "message"
+    text = Column(Text, nullable=True)  # Для "message"
+    priority = Column(Integer, nullable=False, default=1)  # Приоритет в очереди исходящих сообщений
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # Выборка неотправленных уведомлений, готовых к отправке
+        Index("ix_outbox_pending", "sent_at", "next_attempt_at"),
+        # Подсчет недавних заказов для сводок
+        Index("ix_outbox_kind_created", "kind", "created_at"),
+    )
+
+
+class DeadLetter(Base):
+    """Сообщение, которое не удалось доставить после всех попыток"""
+    __tablename__ = "dead_letters"
+    
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)  # Источник: "reminder_15min", "new_order", "message" ...
+    chat_id = Column(String(64), nullable=False)  # Строкой: ORDERS_CHAT_ID может быть @username
+    text = Column(Text, nullable=False)
+    order_id = Column(Integer, nullable=True)
+    error_class = Column(String(20), nullable=False)  # retryable, rate_limited, permanent
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    replayed_at = Column(DateTime, nullable=True, index=True)  # Когда отправлено повторно из админки
+
+
+class Broadcast(Base):
+    """Рассылка всем пользователям"""
+    __tablename__ = "broadcasts"
+    
+    id = Column(Integer, primary_key=True)
+    text = Column(Text, nullable=False)
+    status = Column(String(20), nullable=False, default="running")  # running, paused, done
+    last_user_id = Column(Integer, nullable=False, default=0)  # Курсор: users.id последнего обработанного получателя
+    sent_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    blocked_count = Column(Integer, nullable=False, default=0)  # Заблокировавшие бота или удаленные аккаунты
+    created_by = Column(Integer, nullable=True)  # telegram_id админа
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
 
 
 class ReminderTask(Base):
-    """Модель задачи напоминания для APScheduler"""
+    """Модель задачи напоминания (выполняется диспетчером ReminderService)"""
     __tablename__ = "reminder_tasks"
     
     id = Column(Integer, primary_key=True)
     order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False)
     task_type = Column(String(50), nullable=False)  # "reminder_15min", "after_meeting", "check_payment"
     scheduled_time = Column(DateTime, nullable=False, index=True)
-    job_id = Column(String(255), nullable=True)  # ID задачи в APScheduler
+    job_id = Column(String(255), nullable=True)  # ID задачи в APScheduler (не используется диспетчером)
     executed = Column(Boolean, default=False)  # Выполнена ли задача
     executed_at = Column(DateTime, nullable=True)
+    # Аренда: процесс, выполняющий задачу, и до какого времени она за ним
+    lease_owner = Column(String(128), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     order = relationship("Order", back_populates="reminder_tasks")
@@ -1,15 +1,21 @@
 """Репозитории для работы с базой данных"""
 import logging
-from typing import List, Optional
-from sqlalchemy import select, func
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, update, delete, func, or_, and_, case
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlalchemy.orm.attributes import flag_modified
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from bot.database.models import (
-    User, Profile, Game, ProfileGame, Order, ReminderTask
+    User, Profile, Game, ProfileGame, Order, ReminderTask, OutboxMessage, Broadcast, DeadLetter
 )
+from bot.services.game_index import game_index
+from bot.services.slots import slot_index, to_local_naive, local_now
+from bot.services.availability import month_availability
+from bot.utils.cache import entity_versions
+from bot.services import stats as order_stats
 
 logger = logging.getLogger(__name__)
 
@@ -36,9 +42,21 @@ class UserRepository:
             session.add(user)
             await session.commit()
             await session.refresh(user)
+        elif user.is_blocked:
+            # Пользователь снова пишет боту - значит, разблокировал его
+            user.is_blocked = False
+            await session.commit()
         
         return user
     
+    @staticmethod
+    async def get_by_telegram_id(session: AsyncSession, telegram_id: int) -> Optional[User]:
+        """Получить пользователя по telegram_id"""
+        result = await session.execute(
+            select(User).where(User.telegram_id == telegram_id)
+        )
+        return result.scalar_one_or_none()
+    
     @staticmethod
     async def accept_rules(session: AsyncSession, user_id: int):
         """Принять правила пользователем"""
@@ -49,6 +67,43 @@ class UserRepository:
         user.rules_accepted = True
         user.rules_accepted_at = datetime.utcnow()
         await session.commit()
+    
+    @staticmethod
+    async def get_recipients_page(
+        session: AsyncSession,
+        after_id: int,
+        limit: int
+    ) -> List[Tuple[int, int]]:
+        """
+        Страница получателей рассылки: keyset по users.id, без заблокировавших бота
+        
+        Returns:
+            [(users.id, telegram_id)]
+        """
+        result = await session.execute(
+            select(User.id, User.telegram_id)
+            .where(User.id > after_id)
+            .where(User.is_blocked == False)
+            .order_by(User.id)
+            .limit(limit)
+        )
+        return [(user_id, telegram_id) for user_id, telegram_id in result.all()]
+    
+    @staticmethod
+    async def count_recipients(session: AsyncSession) -> int:
+        """Количество получателей рассылки"""
+        result = await session.execute(
+            select(func.count(User.id)).where(User.is_blocked == False)
+        )
+        return result.scalar() or 0
+    
+    @staticmethod
+    async def mark_blocked(session: AsyncSession, user_ids: List[int]):
+        """Отметить пользователей, заблокировавших бота (без commit)"""
+        if user_ids:
+            await session.execute(
+                update(User).where(User.id.in_(user_ids)).values(is_blocked=True)
+            )
 
 
 class ProfileRepository:
@@ -72,6 +127,14 @@ class ProfileRepository:
         )
         return result.scalar_one_or_none()
     
+    @staticmethod
+    async def get_version(session: AsyncSession, profile_id: int) -> Optional[datetime]:
+        """Получить версию анкеты (updated_at) без загрузки связанных данных"""
+        result = await session.execute(
+            select(Profile.updated_at).where(Profile.id == profile_id)
+        )
+        return result.scalar_one_or_none()
+    
     @staticmethod
     async def get_by_game(session: AsyncSession, game_id: int) -> List[Profile]:
         """Получить анкеты по игре"""
@@ -121,6 +184,7 @@ class ProfileRepository:
         await session.commit()
         logger.info(f"[ProfileRepository.update] Изменения сохранены, обновляем объект из БД...")
         await session.refresh(profile)
+        entity_versions.bump("profile", profile_id)
         logger.info(f"[ProfileRepository.update] Профиль обновлен: id={profile.id}, photo_ids={profile.photo_ids}")
         return profile
     
@@ -134,9 +198,21 @@ class ProfileRepository:
         if profile:
             await session.delete(profile)
             await session.commit()
+            game_index.remove_profile(profile_id)
+            entity_versions.bump("profile", profile_id)
             return True
         return False
     
+    @staticmethod
+    async def _touch(session: AsyncSession, profile_ids) -> None:
+        """Обновить updated_at (версию анкеты) без commit"""
+        await session.execute(
+            update(Profile)
+            .where(Profile.id.in_(profile_ids))
+            .values(updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+    
     @staticmethod
     async def add_game(session: AsyncSession, profile_id: int, game_id: int) -> bool:
         """Добавить игру к анкете"""
@@ -151,7 +227,11 @@ class ProfileRepository:
         
         profile_game = ProfileGame(profile_id=profile_id, game_id=game_id)
         session.add(profile_game)
+        # Список игр входит в снимок бронирования - меняем версию анкеты
+        await ProfileRepository._touch(session, [profile_id])
         await session.commit()
+        game_index.add(game_id, profile_id)
+        entity_versions.bump("profile", profile_id)
         return True
     
     @staticmethod
@@ -165,7 +245,10 @@ class ProfileRepository:
         profile_game = result.scalar_one_or_none()
         if profile_game:
             await session.delete(profile_game)
+            await ProfileRepository._touch(session, [profile_id])
             await session.commit()
+            game_index.remove(game_id, profile_id)
+            entity_versions.bump("profile", profile_id)
             return True
         return False
 
@@ -189,6 +272,34 @@ class GameRepository:
         )
         return list(result.scalars().all())
     
+    @staticmethod
+    async def search_page(
+        session: AsyncSession,
+        query: str,
+        limit: int = 10,
+        offset: int = 0
+    ) -> Tuple[List[Tuple[int, str]], int]:
+        """
+        Страница результатов поиска игр по названию
+        
+        Returns:
+            ([(id, название)], общее количество найденных игр)
+        """
+        condition = Game.name.ilike(f"%{query}%")
+        total = (await session.execute(
+            select(func.count(Game.id)).where(condition)
+        )).scalar() or 0
+        if not total:
+            return [], 0
+        result = await session.execute(
+            select(Game.id, Game.name)
+            .where(condition)
+            .order_by(Game.name, Game.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return [(game_id, name) for game_id, name in result.all()], total
+    
     @staticmethod
     async def get_by_id(session: AsyncSession, game_id: int) -> Optional[Game]:
         """Получить игру по ID"""
@@ -204,6 +315,8 @@ class GameRepository:
         session.add(game)
         await session.commit()
         await session.refresh(game)
+        game_index.set_game(game.id, game.name)
+        entity_versions.bump_all("game")
         return game
     
     @staticmethod
@@ -217,8 +330,16 @@ class GameRepository:
             return None
         
         game.name = name
+        # Название игры входит в снимки бронирования анкет с этой игрой
+        await ProfileRepository._touch(
+            session, select(ProfileGame.profile_id).where(ProfileGame.game_id == game_id)
+        )
         await session.commit()
         await session.refresh(game)
+        game_index.set_game(game.id, game.name)
+        # Название игры выводится в анкетах и в результатах поиска игр
+        entity_versions.bump_all("profile")
+        entity_versions.bump_all("game")
         return game
     
     @staticmethod
@@ -229,8 +350,14 @@ class GameRepository:
         )
         game = result.scalar_one_or_none()
         if game:
+            await ProfileRepository._touch(
+                session, select(ProfileGame.profile_id).where(ProfileGame.game_id == game_id)
+            )
             await session.delete(game)
             await session.commit()
+            game_index.remove_game(game_id)
+            entity_versions.bump_all("profile")
+            entity_versions.bump_all("game")
             return True
         return False
 
@@ -239,8 +366,67 @@ class OrderRepository:
     """Репозиторий для работы с заказами"""
     
     @staticmethod
-    async def create(session: AsyncSession, order_data: dict) -> Order:
-        """Создать заказ"""
+    async def find_overlap(
+        session: AsyncSession,
+        profile_id: int,
+        start: datetime,
+        duration_hours: float,
+        exclude_order_id: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        ID заказа анкеты, пересекающегося с [start, start + duration_hours)
+        
+        Кандидаты выбираются по индексу (profile_id, date): начало раньше конца
+        интервала и не раньше start минус самая длинная встреча анкеты.
+        """
+        start = to_local_naive(start)
+        end = start + timedelta(hours=duration_hours)
+        max_result = await session.execute(
+            select(func.max(Order.duration_hours)).where(Order.profile_id == profile_id)
+        )
+        max_hours = max_result.scalar()
+        if not max_hours:
+            return None
+        
+        query = (
+            select(Order.id, Order.date, Order.duration_hours)
+            .where(Order.profile_id == profile_id)
+            .where(Order.date < end)
+            .where(Order.date > start - timedelta(hours=max_hours))
+        )
+        if exclude_order_id is not None:
+            query = query.where(Order.id != exclude_order_id)
+        result = await session.execute(query)
+        for order_id, order_start, order_hours in result.all():
+            if order_start + timedelta(hours=order_hours) > start:
+                return order_id
+        return None
+    
+    @staticmethod
+    async def create(
+        session: AsyncSession,
+        order_data: dict,
+        outbox: Optional[List[dict]] = None,
+        check_slot: bool = False
+    ) -> Optional[Order]:
+        """
+        Создать заказ
+        
+        Args:
+            outbox: Уведомления о заказе (поля OutboxMessage без order_id),
+                записываются в той же транзакции
+            check_slot: Проверить в той же транзакции, что время анкеты свободно
+        
+        Returns:
+            Заказ или None, если время анкеты уже занято (только при check_slot)
+        """
+        if check_slot:
+            # Параллельные бронирования анкеты выполняются по очереди:
+            # блокировка строки анкеты (PostgreSQL; в SQLite - no-op)
+            await session.execute(
+                select(Profile.id).where(Profile.id == order_data["profile_id"]).with_for_update()
+            )
+        
         # Генерация номера заказа
         count_result = await session.execute(
             select(func.count(Order.id))
@@ -253,10 +439,256 @@ class OrderRepository:
             **order_data
         )
         session.add(order)
+        if check_slot:
+            # Проверка после записи: в SQLite транзакция уже держит блокировку
+            # записи, поэтому параллельная транзакция увидит этот заказ
+            await session.flush()
+            conflict_id = await OrderRepository.find_overlap(
+                session, order.profile_id, order.date, order.duration_hours, exclude_order_id=order.id
+            )
+            if conflict_id is not None:
+                await session.rollback()
+                logger.info(
+                    f"[OrderRepository.create] Анкета {order_data['profile_id']} занята заказом {conflict_id}"
+                )
+                return None
+        # Статистика обновляется в той же транзакции
+        await order_stats.apply_order(session, order_stats.OrderContribution.from_order(order))
+        if outbox:
+            # id заказа нужен уведомлениям до commit
+            await session.flush()
+            session.add_all([OutboxMessage(order_id=order.id, **item) for item in outbox])
         await session.commit()
         await session.refresh(order)
+        slot_index.add(order.id, order.profile_id, order.date, order.duration_hours)
+        month_availability.invalidate(order.profile_id)
         return order
     
+    @staticmethod
+    async def get_by_idempotency_key(session: AsyncSession, idempotency_key: str) -> Optional[Order]:
+        """Получить заказ по ключу идемпотентности"""
+        result = await session.execute(
+            select(Order).where(Order.idempotency_key == idempotency_key)
+        )
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def create_idempotent(
+        session: AsyncSession,
+        order_data: dict,
+        idempotency_key: str,
+        outbox: Optional[List[dict]] = None,
+        check_slot: bool = False
+    ) -> Tuple[Optional[Order], bool]:
+        """
+        Создать заказ не более одного раза для ключа идемпотентности
+        
+        Returns:
+            (заказ, создан ли он сейчас). Если заказ с таким ключом уже есть,
+            возвращается существующий заказ и False. Если время анкеты занято
+            (check_slot) - (None, False).
+        """
+        existing = await OrderRepository.get_by_idempotency_key(session, idempotency_key)
+        if existing:
+            return existing, False
+        
+        try:
+            order = await OrderRepository.create(
+                session, {**order_data, "idempotency_key": idempotency_key}, outbox, check_slot
+            )
+            if order is None:
+                return None, False
+        except IntegrityError:
+            # Параллельное подтверждение успело создать заказ с тем же ключом
+            await session.rollback()
+            existing = await OrderRepository.get_by_idempotency_key(session, idempotency_key)
+            if not existing:
+                raise
+            return existing, False
+        return order, True
+    
+    @staticmethod
+    async def reschedule(
+        session: AsyncSession,
+        order_id: int,
+        new_date: datetime,
+        duration_hours: Optional[float] = None
+    ) -> Optional[Order]:
+        """
+        Перенести заказ на другое время (и при необходимости изменить продолжительность)
+        
+        Невыполненные напоминания о встрече пересоздаются на новое время;
+        ReminderService.track_order добавит их в окно диспетчера.
+        """
+        result = await session.execute(
+            select(Order).where(Order.id == order_id)
+        )
+        order = result.scalar_one_or_none()
+        if not order:
+            return None
+        
+        before = order_stats.OrderContribution.from_order(order)
+        order.date = new_date
+        if duration_hours is not None:
+            order.duration_hours = duration_hours
+        await order_stats.apply_change(session, before, order_stats.OrderContribution.from_order(order))
+        # Напоминания о встрече переносятся в той же транзакции
+        await session.execute(
+            delete(ReminderTask)
+            .where(ReminderTask.order_id == order_id)
+            .where(ReminderTask.executed == False)
+            .where(ReminderTask.task_type.in_(MEETING_TASK_TYPES))
+        )
+        session.add_all(ReminderTaskRepository.build_for_order(order, MEETING_TASK_TYPES))
+        await session.commit()
+        await session.refresh(order)
+        slot_index.move(order.id, order.date, order.duration_hours)
+        month_availability.invalidate(order.profile_id)
+        entity_versions.bump("order", order.id)
+        return order
+    
+    @staticmethod
+    async def delete(session: AsyncSession, order_id: int) -> bool:
+        """Удалить (отменить) заказ"""
+        result = await session.execute(
+            select(Order).where(Order.id == order_id)
+        )
+        order = result.scalar_one_or_none()
+        if not order:
+            return False
+        
+        profile_id = order.profile_id
+        await order_stats.apply_cancel(session, order_stats.OrderContribution.from_order(order))
+        await session.delete(order)
+        await session.commit()
+        slot_index.remove(order_id)
+        month_availability.invalidate(profile_id)
+        entity_versions.bump("order", order_id)
+        return True
+    
+    @staticmethod
+    async def set_payment_status(session: AsyncSession, order_id: int, status: str) -> Optional[Order]:
+        """Изменить статус оплаты заказа"""
+        result = await session.execute(
+            select(Order).where(Order.id == order_id)
+        )
+        order = result.scalar_one_or_none()
+        if not order:
+            return None
+        
+        before = order_stats.OrderContribution.from_order(order)
+        order.payment_status = status
+        await order_stats.apply_change(session, before, order_stats.OrderContribution.from_order(order))
+        await session.commit()
+        entity_versions.bump("order", order_id)
+        return order
+    
+    @staticmethod
+    async def set_conference_link(session: AsyncSession, order_id: int, link: str) -> Optional[Order]:
+        """Сохранить ссылку на конференцию"""
+        result = await session.execute(
+            select(Order).where(Order.id == order_id)
+        )
+        order = result.scalar_one_or_none()
+        if not order:
+            return None
+        
+        order.conference_link = link
+        await session.commit()
+        entity_versions.bump("order", order_id)
+        return order
+    
+    @staticmethod
+    async def bulk_set_payment_status(session: AsyncSession, order_ids: List[int], status: str) -> List[int]:
+        """
+        Изменить статус оплаты нескольких заказов одним UPDATE
+        
+        Returns:
+            id заказов, у которых статус действительно изменился
+        """
+        if not order_ids:
+            return []
+        result = await session.execute(
+            select(
+                Order.id, Order.profile_id, Order.game_id, Order.date,
+                Order.total_price, Order.payment_status,
+            )
+            .where(Order.id.in_(order_ids))
+            .where(Order.payment_status != status)
+        )
+        rows = result.all()
+        if not rows:
+            return []
+        
+        changed_ids = [row.id for row in rows]
+        await order_stats.apply_bulk_change(session, [
+            (before, order_stats.OrderContribution(
+                profile_id=before.profile_id,
+                game_id=before.game_id,
+                date=before.date,
+                total_price=before.total_price,
+                payment_status=status,
+            ))
+            for before in map(order_stats.OrderContribution.from_row, rows)
+        ])
+        await session.execute(
+            update(Order)
+            .where(Order.id.in_(changed_ids))
+            .values(payment_status=status)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        for order_id in changed_ids:
+            entity_versions.bump("order", order_id)
+        logger.info(f"[bulk_set_payment_status] Статус {status} установлен для заказов: {len(changed_ids)}")
+        return changed_ids
+    
+    @staticmethod
+    async def bulk_delete(session: AsyncSession, order_ids: List[int]) -> List[Tuple[int, int, str]]:
+        """
+        Удалить (отменить) несколько заказов одним DELETE
+        
+        Заказы в статусе "processing" не отменяются (как и при отмене по одному).
+        
+        Returns:
+            [(id заказа, telegram_id пользователя, статус оплаты)] отмененных заказов
+        """
+        if not order_ids:
+            return []
+        result = await session.execute(
+            select(
+                Order.id, Order.profile_id, Order.game_id, Order.date,
+                Order.total_price, Order.payment_status, User.telegram_id,
+            )
+            .join(User, User.id == Order.user_id)
+            .where(Order.id.in_(order_ids))
+            .where(Order.payment_status != "processing")
+        )
+        rows = result.all()
+        if not rows:
+            return []
+        
+        cancelled_ids = [row.id for row in rows]
+        await order_stats.apply_bulk_cancel(session, map(order_stats.OrderContribution.from_row, rows))
+        # Каскад relationship не работает для DELETE по условию
+        await session.execute(
+            delete(ReminderTask).where(ReminderTask.order_id.in_(cancelled_ids))
+        )
+        await session.execute(
+            delete(Order)
+            .where(Order.id.in_(cancelled_ids))
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        
+        for row in rows:
+            slot_index.remove(row.id)
+            entity_versions.bump("order", row.id)
+        for profile_id in {row.profile_id for row in rows}:
+            month_availability.invalidate(profile_id)
+        logger.info(f"[bulk_delete] Отменено заказов: {len(cancelled_ids)}")
+        return [(row.id, row.telegram_id, row.payment_status or "not_paid") for row in rows]
+    
     @staticmethod
     async def get_by_user(session: AsyncSession, user_id: int) -> List[Order]:
         """Получить заказы пользователя"""
@@ -272,6 +704,59 @@ class OrderRepository:
         )
         return list(result.scalars().all())
     
+    @staticmethod
+    async def get_user_history_page(
+        session: AsyncSession,
+        user_id: int,
+        limit: int = 5,
+        before: Optional[Tuple[datetime, int]] = None
+    ) -> List[Order]:
+        """
+        Страница истории заказов пользователя (от новых к старым)
+        
+        Keyset-пагинация по индексу (user_id, created_at, id): вместо OFFSET
+        передается (created_at, id) последнего заказа предыдущей страницы.
+        
+        Args:
+            user_id: ID пользователя в БД (users.id)
+            limit: Размер страницы
+            before: (created_at, id) последнего заказа предыдущей страницы
+        """
+        query = select(Order).where(Order.user_id == user_id)
+        if before:
+            created_at, order_id = before
+            query = query.where(
+                or_(
+                    Order.created_at < created_at,
+                    and_(Order.created_at == created_at, Order.id < order_id),
+                )
+            )
+        result = await session.execute(
+            query
+            .options(selectinload(Order.profile))
+            .order_by(Order.created_at.desc(), Order.id.desc())
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+    
+    @staticmethod
+    async def get_upcoming_by_user(
+        session: AsyncSession,
+        user_id: int,
+        now: datetime,
+        limit: int = 5
+    ) -> List[Order]:
+        """Ближайшие встречи пользователя (по индексу (user_id, date))"""
+        result = await session.execute(
+            select(Order)
+            .where(Order.user_id == user_id)
+            .where(Order.date >= now)
+            .options(selectinload(Order.profile))
+            .order_by(Order.date)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+    
     @staticmethod
     async def get_by_id(session: AsyncSession, order_id: int) -> Optional[Order]:
         """Получить заказ по ID"""
@@ -286,6 +771,105 @@ class OrderRepository:
         )
         return result.scalar_one_or_none()
     
+    @staticmethod
+    def _apply_filters(query, filters: dict, now: datetime, with_status: bool = True):
+        """
+        Условия фильтров списка заказов
+        
+        filters: payment_status, profile_id, game_id, date_from, date_to (ISO),
+        upcoming (ближайшие 24 часа от now). Без with_status статус и upcoming
+        не применяются (для подсчета по статусам одним запросом).
+        """
+        if filters.get("profile_id"):
+            query = query.where(Order.profile_id == filters["profile_id"])
+        if filters.get("game_id"):
+            query = query.where(Order.game_id == filters["game_id"])
+        if filters.get("date_from"):
+            query = query.where(Order.date >= datetime.fromisoformat(filters["date_from"]))
+        if filters.get("date_to"):
+            # Дата "по" включительно
+            query = query.where(Order.date < datetime.fromisoformat(filters["date_to"]) + timedelta(days=1))
+        if with_status:
+            if filters.get("payment_status"):
+                query = query.where(Order.payment_status == filters["payment_status"])
+            if filters.get("upcoming"):
+                query = query.where(Order.date >= now).where(Order.date < now + timedelta(hours=24))
+        return query
+    
+    @staticmethod
+    async def get_filtered_page(
+        session: AsyncSession,
+        filters: dict,
+        now: datetime,
+        limit: int = 10,
+        offset: int = 0
+    ) -> Tuple[List[Order], int]:
+        """
+        Страница заказов по фильтрам и общее количество найденных заказов
+        
+        Returns:
+            (заказы страницы, количество заказов по фильтрам)
+        """
+        count_query = OrderRepository._apply_filters(select(func.count(Order.id)), filters, now)
+        total = (await session.execute(count_query)).scalar() or 0
+        
+        query = OrderRepository._apply_filters(select(Order), filters, now)
+        # Ближайшие встречи - по возрастанию даты, остальные - сначала новые
+        if filters.get("upcoming"):
+            query = query.order_by(Order.date, Order.id)
+        else:
+            query = query.order_by(Order.date.desc(), Order.id.desc())
+        result = await session.execute(query.limit(limit).offset(offset))
+        return list(result.scalars().all()), total
+    
+    @staticmethod
+    async def count_by_filters(session: AsyncSession, filters: dict, now: datetime) -> Dict[str, int]:
+        """
+        Количество заказов для кнопок фильтров одним запросом
+        
+        Считается в рамках фильтров анкеты, игры и периода: всего, по каждому
+        статусу оплаты и на ближайшие 24 часа.
+        """
+        upcoming = and_(Order.date >= now, Order.date < now + timedelta(hours=24))
+        query = select(
+            func.count(Order.id),
+            func.sum(case((Order.payment_status == "not_paid", 1), else_=0)),
+            func.sum(case((Order.payment_status == "processing", 1), else_=0)),
+            func.sum(case((Order.payment_status == "paid", 1), else_=0)),
+            func.sum(case((upcoming, 1), else_=0)),
+        )
+        query = OrderRepository._apply_filters(query, filters, now, with_status=False)
+        total, not_paid, processing, paid, upcoming_count = (await session.execute(query)).one()
+        return {
+            "total": total or 0,
+            "not_paid": not_paid or 0,
+            "processing": processing or 0,
+            "paid": paid or 0,
+            "upcoming": upcoming_count or 0,
+        }
+    
+    @staticmethod
+    async def count_by_profile(session: AsyncSession) -> List[Tuple[int, str, int]]:
+        """Количество заказов по анкетам: (profile_id, имя, количество)"""
+        result = await session.execute(
+            select(Profile.id, Profile.name, func.count(Order.id))
+            .join(Order, Order.profile_id == Profile.id)
+            .group_by(Profile.id, Profile.name)
+            .order_by(Profile.name)
+        )
+        return [tuple(row) for row in result.all()]
+    
+    @staticmethod
+    async def count_by_game(session: AsyncSession) -> List[Tuple[int, str, int]]:
+        """Количество заказов по играм: (game_id, название, количество)"""
+        result = await session.execute(
+            select(Game.id, Game.name, func.count(Order.id))
+            .join(Order, Order.game_id == Game.id)
+            .group_by(Game.id, Game.name)
+            .order_by(Game.name)
+        )
+        return [tuple(row) for row in result.all()]
+    
     @staticmethod
     async def get_all(session: AsyncSession) -> List[Order]:
         """Получить все заказы"""
@@ -301,16 +885,60 @@ class OrderRepository:
         return list(result.scalars().all())
 
 
+# Задачи, время которых считается от времени встречи (переносятся вместе с заказом)
+MEETING_TASK_TYPES = ("reminder_15min", "after_meeting")
+
+
 class ReminderTaskRepository:
     """Репозиторий для работы с задачами напоминаний"""
     
+    @staticmethod
+    def build_for_order(order: Order, task_types: Optional[Tuple[str, ...]] = None) -> List[ReminderTask]:
+        """
+        Задачи напоминаний для заказа (без добавления в сессию)
+        
+        Время - МСК без tzinfo, как и даты заказов. Задачи в прошлом не создаются.
+        
+        Args:
+            task_types: Создать только эти типы (None - все)
+        """
+        now = local_now()
+        start = to_local_naive(order.date)
+        candidates = [
+            # Напоминание за 15 минут до встречи
+            ("reminder_15min", start - timedelta(minutes=15)),
+            # Сообщение после окончания встречи
+            ("after_meeting", start + timedelta(hours=order.duration_hours)),
+        ]
+        # Проверка оплаты: "processing" - через 15 минут, "not_paid" - через 30 минут
+        if order.payment_status == "processing":
+            candidates.append(("check_payment_processing", now + timedelta(minutes=15)))
+        if order.payment_status == "not_paid":
+            candidates.append(("check_payment_not_paid", now + timedelta(minutes=30)))
+        
+        return [
+            ReminderTask(order_id=order.id, task_type=task_type, scheduled_time=scheduled_time)
+            for task_type, scheduled_time in candidates
+            if scheduled_time > now and (task_types is None or task_type in task_types)
+        ]
+    
+    @staticmethod
+    async def get_pending_for_order(session: AsyncSession, order_id: int) -> List[ReminderTask]:
+        """Невыполненные задачи заказа"""
+        result = await session.execute(
+            select(ReminderTask)
+            .where(ReminderTask.order_id == order_id)
+            .where(ReminderTask.executed == False)
+        )
+        return list(result.scalars().all())
+    
     @staticmethod
     async def get_pending_tasks(session: AsyncSession) -> List[ReminderTask]:
         """Получить все невыполненные задачи"""
         result = await session.execute(
             select(ReminderTask)
             .where(ReminderTask.executed == False)
-            .where(ReminderTask.scheduled_time > datetime.utcnow())
+            .where(ReminderTask.scheduled_time > local_now())
         )
         return list(result.scalars().all())
     
@@ -330,3 +958,115 @@ class ReminderTaskRepository:
             await session.commit()
             return True
         return False
+
+
+class BroadcastRepository:
+    """Репозиторий для работы с рассылками"""
+    
+    @staticmethod
+    async def create(session: AsyncSession, text: str, created_by: Optional[int] = None) -> Broadcast:
+        """Создать рассылку"""
+        broadcast = Broadcast(text=text, created_by=created_by)
+        session.add(broadcast)
+        await session.commit()
+        await session.refresh(broadcast)
+        return broadcast
+    
+    @staticmethod
+    async def get_by_id(session: AsyncSession, broadcast_id: int) -> Optional[Broadcast]:
+        """Получить рассылку по ID"""
+        result = await session.execute(
+            select(Broadcast).where(Broadcast.id == broadcast_id)
+        )
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def get_latest(session: AsyncSession) -> Optional[Broadcast]:
+        """Последняя рассылка"""
+        result = await session.execute(
+            select(Broadcast).order_by(Broadcast.id.desc()).limit(1)
+        )
+        return result.scalar_one_or_none()
+    
+    @staticmethod
+    async def get_running_ids(session: AsyncSession) -> List[int]:
+        """Рассылки, прерванные остановкой бота"""
+        result = await session.execute(
+            select(Broadcast.id).where(Broadcast.status == "running").order_by(Broadcast.id)
+        )
+        return list(result.scalars().all())
+    
+    @staticmethod
+    async def set_status(session: AsyncSession, broadcast_id: int, status: str) -> Optional[Broadcast]:
+        """Изменить статус рассылки"""
+        broadcast = await BroadcastRepository.get_by_id(session, broadcast_id)
+        if not broadcast:
+            return None
+        broadcast.status = status
+        await session.commit()
+        return broadcast
+
+
+class DeadLetterRepository:
+    """Репозиторий недоставленных сообщений"""
+    
+    @staticmethod
+    async def add(session: AsyncSession, data: dict) -> DeadLetter:
+        """Записать недоставленное сообщение"""
+        dead_letter = DeadLetter(**data)
+        session.add(dead_letter)
+        await session.commit()
+        return dead_letter
+    
+    @staticmethod
+    async def count_pending(session: AsyncSession) -> Dict[str, int]:
+        """Количество неповторенных сообщений по классу ошибки"""
+        result = await session.execute(
+            select(DeadLetter.error_class, func.count(DeadLetter.id))
+            .where(DeadLetter.replayed_at.is_(None))
+            .group_by(DeadLetter.error_class)
+        )
+        return {error_class: count for error_class, count in result.all()}
+    
+    @staticmethod
+    async def get_pending(session: AsyncSession, limit: int = 10) -> List[DeadLetter]:
+        """Последние неповторенные сообщения"""
+        result = await session.execute(
+            select(DeadLetter)
+            .where(DeadLetter.replayed_at.is_(None))
+            .order_by(DeadLetter.id.desc())
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+    
+    @staticmethod
+    async def claim_for_replay(session: AsyncSession, limit: int) -> List[DeadLetter]:
+        """
+        Забрать пачку сообщений для повтора: отметка replayed_at одним UPDATE
+        
+        Повторная неудача запишет новую строку.
+        """
+        result = await session.execute(
+            select(DeadLetter)
+            .where(DeadLetter.replayed_at.is_(None))
+            .order_by(DeadLetter.id)
+            .limit(limit)
+        )
+        dead_letters = list(result.scalars().all())
+        if dead_letters:
+            await session.execute(
+                update(DeadLetter)
+                .where(DeadLetter.id.in_([item.id for item in dead_letters]))
+                .values(replayed_at=datetime.utcnow())
+            )
+            await session.commit()
+        return dead_letters
+    
+    @staticmethod
+    async def delete_pending(session: AsyncSession) -> int:
+        """Удалить все неповторенные сообщения"""
+        result = await session.execute(
+            delete(DeadLetter).where(DeadLetter.replayed_at.is_(None))
+        )
+        await session.commit()
+        return result.rowcount
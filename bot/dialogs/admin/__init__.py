@@ -3,12 +3,18 @@ from bot.dialogs.admin.menu import admin_menu_dialog
 from bot.dialogs.admin.games import games_dialog
 from bot.dialogs.admin.profiles import profiles_dialog
 from bot.dialogs.admin.orders import orders_dialog
+from bot.dialogs.admin.stats import stats_dialog
+from bot.dialogs.admin.broadcast import broadcast_dialog
+from bot.dialogs.admin.dead_letters import dead_letters_dialog
 
 __all__ = [
     "admin_menu_dialog",
     "games_dialog",
     "profiles_dialog",
     "orders_dialog",
+    "stats_dialog",
+    "broadcast_dialog",
+    "dead_letters_dialog",
 ]
 
 
@@ -19,5 +25,8 @@ def get_admin_dialogs():
         games_dialog,
         profiles_dialog,
         orders_dialog,
+        stats_dialog,
+        broadcast_dialog,
+        dead_letters_dialog,
     ]
 
@@ -0,0 +1,178 @@
+"""Диалог рассылки всем пользователям"""
+import logging
+from aiogram_dialog import Dialog, Window, DialogManager
+from aiogram_dialog.widgets.text import Const, Format
+from aiogram_dialog.widgets.kbd import Button, Row, Column, SwitchTo, Cancel
+from aiogram_dialog.widgets.input import TextInput
+from aiogram.types import Message, CallbackQuery
+
+from bot.dialogs.admin import states
+from bot.database.database import async_session_maker
+from bot.database.repositories import BroadcastRepository, UserRepository
+from bot.services.broadcast import broadcast_runner, BROADCAST_RUNNING, BROADCAST_PAUSED, BROADCAST_DONE
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_STATUS_NAMES = {
+    BROADCAST_RUNNING: "🔄 Идет",
+    BROADCAST_PAUSED: "⏸ Приостановлена",
+    BROADCAST_DONE: "✅ Завершена",
+}
+
+
+async def get_broadcast_data(dialog_manager: DialogManager, **kwargs):
+    """Получение состояния последней рассылки"""
+    async with async_session_maker() as session:
+        broadcast = await BroadcastRepository.get_latest(session)
+        recipients = await UserRepository.count_recipients(session)
+    
+    if not broadcast:
+        return {
+            "broadcast_text": "Рассылок еще не было",
+            "recipients": recipients,
+            "is_running": False,
+            "is_paused": False,
+            "can_start": True,
+        }
+    
+    dialog_manager.dialog_data["broadcast_id"] = broadcast.id
+    rate = broadcast_runner.throughput(broadcast)
+    lines = [
+        f"Рассылка #{broadcast.id}: {BROADCAST_STATUS_NAMES.get(broadcast.status, broadcast.status)}",
+        f"Отправлено: {broadcast.sent_count}",
+        f"Ошибок: {broadcast.failed_count}",
+        f"Заблокировали бота (исключены): {broadcast.blocked_count}",
+    ]
+    if rate and broadcast.status == BROADCAST_RUNNING:
+        lines.append(f"Скорость: {rate:.1f} сообщ./с")
+    if broadcast.finished_at:
+        lines.append(f"Завершена: {broadcast.finished_at.strftime('%d.%m.%Y %H:%M')} UTC")
+    
+    return {
+        "broadcast_text": "\n".join(lines),
+        "recipients": recipients,
+        "is_running": broadcast.status == BROADCAST_RUNNING,
+        "is_paused": broadcast.status == BROADCAST_PAUSED,
+        "can_start": broadcast.status == BROADCAST_DONE,
+    }
+
+
+async def get_confirm_data(dialog_manager: DialogManager, **kwargs):
+    """Получение данных для подтверждения рассылки"""
+    async with async_session_maker() as session:
+        recipients = await UserRepository.count_recipients(session)
+    return {
+        "text": dialog_manager.dialog_data.get("broadcast_text", ""),
+        "recipients": recipients,
+    }
+
+
+async def on_text_input(message: Message, widget: TextInput, manager: DialogManager, text: str):
+    """Ввод текста рассылки"""
+    if not text.strip():
+        await message.answer("❌ Текст рассылки не может быть пустым")
+        return
+    manager.dialog_data["broadcast_text"] = message.html_text
+    await manager.switch_to(states.AdminBroadcast.CONFIRM)
+
+
+async def on_confirm(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Запуск рассылки"""
+    text = manager.dialog_data.pop("broadcast_text", None)
+    if not text:
+        await c.answer("❌ Текст рассылки не задан", show_alert=True)
+        return
+    
+    async with async_session_maker() as session:
+        broadcast = await BroadcastRepository.create(session, text, created_by=c.from_user.id)
+    broadcast_runner.launch(broadcast.id)
+    logger.info(f"[on_confirm] Рассылка {broadcast.id} запущена админом {c.from_user.id}")
+    
+    await c.answer("✅ Рассылка запущена")
+    await manager.switch_to(states.AdminBroadcast.MAIN)
+
+
+async def _set_status(c: CallbackQuery, manager: DialogManager, status: str):
+    broadcast_id = manager.dialog_data.get("broadcast_id")
+    if not broadcast_id:
+        await c.answer("❌ Рассылка не найдена", show_alert=True)
+        return None
+    async with async_session_maker() as session:
+        return await BroadcastRepository.set_status(session, broadcast_id, status)
+
+
+async def on_pause(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Приостановить рассылку (текущая пачка будет дослана)"""
+    if await _set_status(c, manager, BROADCAST_PAUSED):
+        await c.answer("⏸ Рассылка приостановлена")
+
+
+async def on_resume(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Продолжить рассылку с сохраненного курсора"""
+    broadcast = await _set_status(c, manager, BROADCAST_RUNNING)
+    if broadcast:
+        broadcast_runner.launch(broadcast.id)
+        await c.answer("▶️ Рассылка продолжена")
+
+
+broadcast_dialog = Dialog(
+    Window(
+        Format(
+            "📣 <b>Рассылка</b>\n\n"
+            "{broadcast_text}\n\n"
+            "Получателей: {recipients}"
+        ),
+        Column(
+            Button(Const("🔄 Обновить"), id="broadcast_refresh"),
+            SwitchTo(
+                Const("✉️ Новая рассылка"),
+                id="broadcast_new",
+                state=states.AdminBroadcast.INPUT_TEXT,
+                when="can_start",
+            ),
+            Button(
+                Const("⏸ Приостановить"),
+                id="broadcast_pause",
+                on_click=on_pause,
+                when="is_running",
+            ),
+            Button(
+                Const("▶️ Продолжить"),
+                id="broadcast_resume",
+                on_click=on_resume,
+                when="is_paused",
+            ),
+            Cancel(Const("🔙 Назад")),
+        ),
+        getter=get_broadcast_data,
+        state=states.AdminBroadcast.MAIN,
+    ),
+    
+    Window(
+        Const("✉️ <b>Новая рассылка</b>\n\nОтправьте текст сообщения для всех пользователей:"),
+        TextInput(
+            id="broadcast_text_input",
+            on_success=on_text_input,
+        ),
+        SwitchTo(Const("🔙 Назад"), id="back", state=states.AdminBroadcast.MAIN),
+        state=states.AdminBroadcast.INPUT_TEXT,
+    ),
+    
+    Window(
+        Format(
+            "❓ <b>Подтверждение рассылки</b>\n\n"
+            "{text}\n\n"
+            "Получателей: {recipients}"
+        ),
+        Row(
+            Button(
+                Const("✅ Отправить"),
+                id="broadcast_confirm",
+                on_click=on_confirm,
+            ),
+            SwitchTo(Const("❌ Отмена"), id="broadcast_cancel", state=states.AdminBroadcast.MAIN),
+        ),
+        getter=get_confirm_data,
+        state=states.AdminBroadcast.CONFIRM,
+    ),
+)
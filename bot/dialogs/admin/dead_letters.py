@@ -0,0 +1,114 @@
+"""Диалог недоставленных сообщений"""
+import asyncio
+import logging
+from typing import Set
+from aiogram_dialog import Dialog, Window, DialogManager
+from aiogram_dialog.widgets.text import Const, Format
+from aiogram_dialog.widgets.kbd import Button, Row, Column, SwitchTo, Cancel
+from aiogram.types import CallbackQuery
+
+from bot.dialogs.admin import states
+from bot.database.database import async_session_maker
+from bot.database.repositories import DeadLetterRepository
+from bot.services.delivery import replay_dead_letters, ERROR_RETRYABLE, ERROR_RATE_LIMITED, ERROR_PERMANENT
+
+logger = logging.getLogger(__name__)
+
+# Сколько последних сообщений показывать
+DEAD_LETTERS_SHOWN = 10
+# Сообщений за один повтор
+REPLAY_BATCH_SIZE = 500
+
+ERROR_CLASS_NAMES = {
+    ERROR_RETRYABLE: "🌐 Временные ошибки",
+    ERROR_RATE_LIMITED: "🐢 Лимит Telegram",
+    ERROR_PERMANENT: "⛔️ Постоянные ошибки",
+}
+
+# Запущенные повторы (ссылки держатся до завершения задач)
+_replay_tasks: Set[asyncio.Task] = set()
+
+
+async def get_dead_letters_data(dialog_manager: DialogManager, **kwargs):
+    """Получение сводки и последних недоставленных сообщений"""
+    async with async_session_maker() as session:
+        counts = await DeadLetterRepository.count_pending(session)
+        recent = await DeadLetterRepository.get_pending(session, DEAD_LETTERS_SHOWN)
+
+    total = sum(counts.values())
+    if not total:
+        return {"dead_letters_text": "Недоставленных сообщений нет", "has_pending": False}
+
+    lines = [f"Всего: {total}"]
+    lines.extend(
+        f"{ERROR_CLASS_NAMES.get(error_class, error_class)}: {count}"
+        for error_class, count in counts.items()
+    )
+    lines.append("\n<b>Последние:</b>")
+    for item in recent:
+        lines.append(
+            f"{item.created_at.strftime('%d.%m %H:%M')} · {item.kind} · чат {item.chat_id}"
+            + (f" · заказ #{item.order_id}" if item.order_id else "")
+            + f"\n   {(item.error or '')[:120]}"
+        )
+
+    return {"dead_letters_text": "\n".join(lines), "has_pending": True}
+
+
+async def on_replay(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Повторить отправку всех недоставленных сообщений (в фоне)"""
+    task = asyncio.create_task(replay_dead_letters(c.bot, REPLAY_BATCH_SIZE))
+    _replay_tasks.add(task)
+    task.add_done_callback(_replay_tasks.discard)
+    logger.info(f"[on_replay] Повтор недоставленных запущен админом {c.from_user.id}")
+    await c.answer("🔁 Повторная отправка запущена")
+
+
+async def on_clear_confirm(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Удалить все недоставленные сообщения"""
+    async with async_session_maker() as session:
+        deleted = await DeadLetterRepository.delete_pending(session)
+    logger.info(f"[on_clear_confirm] Удалено недоставленных: {deleted} (админ {c.from_user.id})")
+    await c.answer(f"🗑 Удалено: {deleted}")
+    await manager.switch_to(states.AdminDeadLetters.MAIN)
+
+
+dead_letters_dialog = Dialog(
+    Window(
+        Format(
+            "📭 <b>Недоставленные сообщения</b>\n\n"
+            "{dead_letters_text}"
+        ),
+        Column(
+            Button(Const("🔄 Обновить"), id="dead_letters_refresh"),
+            Button(
+                Const("🔁 Повторить все"),
+                id="dead_letters_replay",
+                on_click=on_replay,
+                when="has_pending",
+            ),
+            SwitchTo(
+                Const("🗑 Очистить"),
+                id="dead_letters_clear",
+                state=states.AdminDeadLetters.CLEAR,
+                when="has_pending",
+            ),
+            Cancel(Const("🔙 Назад")),
+        ),
+        getter=get_dead_letters_data,
+        state=states.AdminDeadLetters.MAIN,
+    ),
+
+    Window(
+        Const("❓ Удалить все недоставленные сообщения без отправки?"),
+        Row(
+            Button(
+                Const("✅ Удалить"),
+                id="dead_letters_clear_confirm",
+                on_click=on_clear_confirm,
+            ),
+            SwitchTo(Const("❌ Отмена"), id="dead_letters_clear_cancel", state=states.AdminDeadLetters.MAIN),
+        ),
+        state=states.AdminDeadLetters.CLEAR,
+    ),
+)
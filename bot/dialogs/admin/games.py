@@ -1,6 +1,6 @@
 """Диалог управления играми"""
 import logging
-from typing import List
+from typing import List, Tuple
 from aiogram_dialog import Dialog, Window, DialogManager
 from aiogram_dialog.widgets.text import Const, Format
 from aiogram_dialog.widgets.kbd import (
@@ -14,9 +14,34 @@ from aiogram_dialog.api.entities import ShowMode
 from bot.dialogs.admin import states
 from bot.database.database import async_session_maker
 from bot.database.repositories import GameRepository
+from bot.utils.cache import TTLCache, entity_versions
 
 logger = logging.getLogger(__name__)
 
+# Количество игр на странице результатов поиска
+SEARCH_PAGE_SIZE = 10
+# Сколько секунд страница результатов поиска берется из кэша
+SEARCH_CACHE_TTL = 60
+
+# (запрос, смещение, поколение игр) -> ([(id, название)], всего найдено)
+search_cache = TTLCache(ttl=SEARCH_CACHE_TTL)
+
+
+async def _get_search_page(search_query: str, offset: int) -> Tuple[List[Tuple[int, str]], int]:
+    """Страница результатов поиска (из кэша или одним запросом с LIMIT)"""
+    generation, _ = entity_versions.get("game", 0)
+    # Запрос без приведения регистра: ilike в SQLite не сворачивает регистр
+    # кириллицы, и "Дота" и "дота" находят разное
+    key = (search_query, offset, generation)
+    page = search_cache.get(key)
+    if page is None:
+        async with async_session_maker() as session:
+            page = await GameRepository.search_page(
+                session, search_query, limit=SEARCH_PAGE_SIZE, offset=offset
+            )
+        search_cache.set(key, page)
+    return page
+
 
 async def get_games_data(dialog_manager: DialogManager, **kwargs):
     """Получение списка игр для отображения"""
@@ -249,6 +274,8 @@ async def get_main_data(dialog_manager: DialogManager, **kwargs):
         del dialog_manager.dialog_data["edit_game_name"]
     if "search_query" in dialog_manager.dialog_data:
         del dialog_manager.dialog_data["search_query"]
+    if "search_offset" in dialog_manager.dialog_data:
+        del dialog_manager.dialog_data["search_offset"]
     return {}
 
 
@@ -257,20 +284,24 @@ async def get_search_data(dialog_manager: DialogManager, **kwargs):
     # Очищаем данные поиска при открытии окна
     if "search_query" in dialog_manager.dialog_data:
         del dialog_manager.dialog_data["search_query"]
-    if "search_results" in dialog_manager.dialog_data:
-        del dialog_manager.dialog_data["search_results"]
+    if "search_offset" in dialog_manager.dialog_data:
+        del dialog_manager.dialog_data["search_offset"]
     return {}
 
 
 async def get_search_results_data(dialog_manager: DialogManager, **kwargs):
-    """Получение данных для окна результатов поиска"""
-    search_results = dialog_manager.dialog_data.get("search_results", [])
+    """Получение страницы результатов поиска"""
+    # В dialog_data хранятся только запрос и смещение, сами игры - в кэше страниц
     search_query = dialog_manager.dialog_data.get("search_query", "")
+    offset = dialog_manager.dialog_data.get("search_offset", 0)
+    games, total = await _get_search_page(search_query, offset)
     
     return {
-        "games": search_results,
+        "games": games,
         "search_query": search_query,
-        "results_count": len(search_results),
+        "results_count": total,
+        "has_prev": offset > 0,
+        "has_next": offset + SEARCH_PAGE_SIZE < total,
     }
 
 
@@ -299,21 +330,32 @@ async def on_search_query(message: Message, widget: TextInput, manager: DialogMa
         return
     
     search_query = text.strip()
-    manager.dialog_data["search_query"] = search_query
     
-    async with async_session_maker() as session:
-        games = await GameRepository.search(session, search_query)
-        logger.info(f"[on_search_query] Найдено игр: {len(games)}")
-        
-        if not games:
-            logger.info(f"[on_search_query] Игры не найдены")
-            await message.answer("❌ Игры не найдены")
-            return
-        
-        # Сохраняем результаты поиска для отображения в окне
-        manager.dialog_data["search_results"] = games
-        logger.info(f"[on_search_query] Сохранили результаты поиска. Переключаемся на SEARCH_RESULTS")
-        await manager.switch_to(states.AdminGames.SEARCH_RESULTS)
+    # Первая страница попадает в кэш и сразу используется окном результатов
+    _, total = await _get_search_page(search_query, 0)
+    logger.info(f"[on_search_query] Найдено игр: {total}")
+    
+    if not total:
+        logger.info(f"[on_search_query] Игры не найдены")
+        await message.answer("❌ Игры не найдены")
+        return
+    
+    manager.dialog_data["search_query"] = search_query
+    manager.dialog_data["search_offset"] = 0
+    logger.info(f"[on_search_query] Переключаемся на SEARCH_RESULTS")
+    await manager.switch_to(states.AdminGames.SEARCH_RESULTS)
+
+
+async def on_search_prev_page(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Предыдущая страница результатов поиска"""
+    offset = manager.dialog_data.get("search_offset", 0)
+    manager.dialog_data["search_offset"] = max(0, offset - SEARCH_PAGE_SIZE)
+
+
+async def on_search_next_page(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Следующая страница результатов поиска"""
+    offset = manager.dialog_data.get("search_offset", 0)
+    manager.dialog_data["search_offset"] = offset + SEARCH_PAGE_SIZE
 
 
 async def on_prev_page(c: CallbackQuery, button: Button, manager: DialogManager):
@@ -499,20 +541,29 @@ games_dialog = Dialog(
     # Окно результатов поиска
     Window(
         Format("🔍 <b>Результаты поиска</b>\n\nЗапрос: <i>{search_query}</i>\nНайдено: {results_count}\n\nВыберите игру:"),
-        ScrollingGroup(
-            ListGroup(
-                Button(
-                    Format("{item.name}"),
-                    id="game_search_btn",
-                    on_click=on_game_select,
-                ),
-                id="games_search_list",
-                item_id_getter=lambda item: str(item.id),
-                items="games",
+        ListGroup(
+            Button(
+                Format("{item[1]}"),
+                id="game_search_btn",
+                on_click=on_game_select,
+            ),
+            id="games_search_list",
+            item_id_getter=lambda item: str(item[0]),
+            items="games",
+        ),
+        Row(
+            Button(
+                Const("◀️"),
+                id="search_prev",
+                on_click=on_search_prev_page,
+                when="has_prev",
+            ),
+            Button(
+                Const("▶️"),
+                id="search_next",
+                on_click=on_search_next_page,
+                when="has_next",
             ),
-            id="games_search_scroll",
-            width=1,
-            height=10,
         ),
         Button(
             Const("🔙 Назад"),
@@ -26,6 +26,24 @@ async def on_orders_click(c: CallbackQuery, button: Button, manager):
     await manager.start(AdminOrders.MAIN, mode=StartMode.NORMAL)
 
 
+async def on_stats_click(c: CallbackQuery, button: Button, manager):
+    """Переход к статистике заказов"""
+    from bot.dialogs.admin.states import AdminStats
+    await manager.start(AdminStats.MAIN, mode=StartMode.NORMAL)
+
+
+async def on_broadcast_click(c: CallbackQuery, button: Button, manager):
+    """Переход к рассылке"""
+    from bot.dialogs.admin.states import AdminBroadcast
+    await manager.start(AdminBroadcast.MAIN, mode=StartMode.NORMAL)
+
+
+async def on_dead_letters_click(c: CallbackQuery, button: Button, manager):
+    """Переход к недоставленным сообщениям"""
+    from bot.dialogs.admin.states import AdminDeadLetters
+    await manager.start(AdminDeadLetters.MAIN, mode=StartMode.NORMAL)
+
+
 admin_menu_dialog = Dialog(
     Window(
         Const("🔧 <b>Админ-панель</b>\n\nВыберите раздел:"),
@@ -45,6 +63,21 @@ admin_menu_dialog = Dialog(
                 id="orders",
                 on_click=on_orders_click,
             ),
+            Button(
+                Const("📊 Статистика"),
+                id="stats",
+                on_click=on_stats_click,
+            ),
+            Button(
+                Const("📣 Рассылка"),
+                id="broadcast",
+                on_click=on_broadcast_click,
+            ),
+            Button(
+                Const("📭 Недоставленные"),
+                id="dead_letters",
+                on_click=on_dead_letters_click,
+            ),
         ),
         state=states.AdminMenu.MAIN,
     ),
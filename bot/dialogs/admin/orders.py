@@ -1,11 +1,11 @@
 """Диалог управления заказами"""
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional
 from aiogram_dialog import Dialog, Window, DialogManager
 from aiogram_dialog.widgets.text import Const, Format
 from aiogram_dialog.widgets.kbd import (
     Button, Row, Column, ScrollingGroup, SwitchTo, 
-    Back, Cancel, Group, ListGroup
+    Back, Cancel, Group, ListGroup, Multiselect, ManagedMultiselect
 )
 from aiogram_dialog.widgets.input import MessageInput, TextInput
 from aiogram.types import Message, CallbackQuery
@@ -15,33 +15,299 @@ import pytz
 from bot.dialogs.admin import states
 from bot.database.database import async_session_maker
 from bot.database.repositories import OrderRepository
-from bot.database.models import Order
-from bot.services.notifications import send_order_cancellation_to_user
-from bot.utils.formatters import format_order_message
+from bot.services.notifications import format_cancellation_text
+from bot.services.outbound import outbound, PRIORITY_INTERACTIVE
+from bot.services.reminders import reminder_service
+from bot.services.slots import slot_index, to_local_naive
+from bot.utils.datetime_parser import parse_date_fast, parse_time_fast
+from bot.utils.callbacks import answer_callback
+from bot.utils.cache import cached_getter
+from bot.utils.formatters import format_order_message, format_payment_status
 from bot.config import TIMEZONE
-from sqlalchemy import select
+
+
+# Количество заказов на странице списка
+ORDERS_PAGE_SIZE = 10
+
+# Кнопки фильтров по статусу: id кнопки -> (статус оплаты, ближайшие 24 часа)
+STATUS_FILTERS = {
+    "filter_all": (None, False),
+    "filter_not_paid": ("not_paid", False),
+    "filter_processing": ("processing", False),
+    "filter_paid": ("paid", False),
+    "filter_upcoming": (None, True),
+}
+
+# Кнопки массовой смены статуса оплаты: id кнопки -> статус
+BULK_STATUS_BUTTONS = {
+    "bulk_paid": "paid",
+    "bulk_processing": "processing",
+}
+
+
+def _admin_now() -> datetime:
+    """Текущее время по МСК без tzinfo (в таком виде даты заказов хранятся в БД)"""
+    return datetime.now(pytz.timezone(TIMEZONE)).replace(tzinfo=None)
+
+
+def _get_filters(dialog_manager: DialogManager) -> dict:
+    """Текущие фильтры списка заказов"""
+    return dialog_manager.dialog_data.get("order_filters", {})
+
+
+def _describe_filters(filters: dict) -> str:
+    """Текстовое описание фильтров анкеты, игры и периода"""
+    parts = []
+    if filters.get("profile_id"):
+        parts.append(f"🎀 {filters.get('profile_name', filters['profile_id'])}")
+    if filters.get("game_id"):
+        parts.append(f"🎮 {filters.get('game_name', filters['game_id'])}")
+    if filters.get("date_from") or filters.get("date_to"):
+        date_from = filters.get("date_from")
+        date_to = filters.get("date_to")
+        period_from = datetime.fromisoformat(date_from).strftime("%d.%m.%Y") if date_from else "..."
+        period_to = datetime.fromisoformat(date_to).strftime("%d.%m.%Y") if date_to else "..."
+        parts.append(f"📅 {period_from} – {period_to}")
+    return ", ".join(parts)
+
+
+def _clear_selected_order(dialog_manager: DialogManager):
+    """Очистка данных выбранного заказа при возврате к спискам"""
+    for key in ("selected_order_id", "message_user_id", "message_order_id"):
+        dialog_manager.dialog_data.pop(key, None)
 
 
 async def get_orders_data(dialog_manager: DialogManager, **kwargs):
-    """Получение списка заказов для отображения"""
+    """Получение количества заказов для кнопок фильтров (один сгруппированный запрос)"""
     # Очищаем старые данные при открытии главного окна
-    if "selected_order_id" in dialog_manager.dialog_data:
-        del dialog_manager.dialog_data["selected_order_id"]
-    if "message_user_id" in dialog_manager.dialog_data:
-        del dialog_manager.dialog_data["message_user_id"]
-    if "message_order_id" in dialog_manager.dialog_data:
-        del dialog_manager.dialog_data["message_order_id"]
+    _clear_selected_order(dialog_manager)
     
+    filters = _get_filters(dialog_manager)
     async with async_session_maker() as session:
-        orders = await OrderRepository.get_all(session)
-        has_orders = len(orders) > 0 if orders else False
-        return {
-            "orders": orders or [],
-            "has_orders": has_orders,
-            "orders_text": "Выберите заказ:" if has_orders else "❌ Заказов пока нет",
-        }
+        counts = await OrderRepository.count_by_filters(session, filters, _admin_now())
+    
+    filters_text = _describe_filters(filters)
+    return {
+        "count_total": counts["total"],
+        "count_not_paid": counts["not_paid"],
+        "count_processing": counts["processing"],
+        "count_paid": counts["paid"],
+        "count_upcoming": counts["upcoming"],
+        "filters_text": filters_text or "нет",
+        "has_scope_filters": bool(filters_text),
+    }
+
+
+async def get_orders_list_data(dialog_manager: DialogManager, **kwargs):
+    """Получение страницы заказов по фильтрам"""
+    _clear_selected_order(dialog_manager)
+    
+    filters = _get_filters(dialog_manager)
+    page = dialog_manager.dialog_data.get("orders_page", 0)
+    
+    async with async_session_maker() as session:
+        orders, total = await OrderRepository.get_filtered_page(
+            session, filters, _admin_now(),
+            limit=ORDERS_PAGE_SIZE, offset=page * ORDERS_PAGE_SIZE
+        )
+    
+    pages = max(1, (total + ORDERS_PAGE_SIZE - 1) // ORDERS_PAGE_SIZE)
+    
+    if filters.get("upcoming"):
+        list_title = "🕐 Ближайшие 24 часа"
+    elif filters.get("payment_status"):
+        list_title = format_payment_status(filters["payment_status"])
+    else:
+        list_title = "📋 Все"
+    scope_text = _describe_filters(filters)
+    if scope_text:
+        list_title = f"{list_title}, {scope_text}"
+    
+    return {
+        "orders": [
+            {
+                "id": order.id,
+                "title": (
+                    f"{order.order_number} · {order.date.strftime('%d.%m %H:%M')} · "
+                    f"{order.total_price:.0f}₽ · {format_payment_status(order.payment_status)}"
+                ),
+            }
+            for order in orders
+        ],
+        "has_orders": len(orders) > 0,
+        "orders_text": "Выберите заказ:" if orders else "❌ Заказов не найдено",
+        "list_title": list_title,
+        "total": total,
+        "page": page + 1,
+        "pages": pages,
+        "has_prev": page > 0,
+        "has_next": page + 1 < pages,
+    }
+
+
+async def on_status_filter(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Выбор фильтра по статусу оплаты или ближайших 24 часов"""
+    payment_status, upcoming = STATUS_FILTERS[button.widget_id]
+    filters = dict(_get_filters(manager))
+    filters["payment_status"] = payment_status
+    filters["upcoming"] = upcoming
+    manager.dialog_data["order_filters"] = filters
+    manager.dialog_data["orders_page"] = 0
+    await manager.switch_to(states.AdminOrders.LIST)
+
+
+async def on_reset_filters(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Сброс фильтров анкеты, игры и периода"""
+    manager.dialog_data["order_filters"] = {}
+    manager.dialog_data["orders_page"] = 0
+
+
+async def on_orders_prev_page(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Предыдущая страница списка заказов"""
+    manager.dialog_data["orders_page"] = max(0, manager.dialog_data.get("orders_page", 0) - 1)
+
+
+async def on_orders_next_page(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Следующая страница списка заказов"""
+    manager.dialog_data["orders_page"] = manager.dialog_data.get("orders_page", 0) + 1
+
+
+def _get_bulk_selection(manager: DialogManager) -> ManagedMultiselect:
+    """Выбранные для массовой операции заказы"""
+    return manager.find("bulk_orders")
+
+
+async def get_bulk_data(dialog_manager: DialogManager, **kwargs):
+    """Получение страницы заказов для массового выбора"""
+    data = await get_orders_list_data(dialog_manager, **kwargs)
+    selected_count = len(_get_bulk_selection(dialog_manager).get_checked())
+    data["selected_count"] = selected_count
+    data["has_selection"] = selected_count > 0
+    return data
+
+
+async def on_bulk_clear(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Снять выбор со всех заказов"""
+    await _get_bulk_selection(manager).reset_checked()
+
+
+async def on_bulk_status(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Массовая смена статуса оплаты выбранных заказов"""
+    status = BULK_STATUS_BUTTONS[button.widget_id]
+    selection = _get_bulk_selection(manager)
+    order_ids = selection.get_checked()
+    if not order_ids:
+        await answer_callback(c, manager, "❌ Заказы не выбраны", show_alert=True)
+        return
+    
+    async with async_session_maker() as session:
+        changed_ids = await OrderRepository.bulk_set_payment_status(session, order_ids, status)
+    
+    await selection.reset_checked()
+    await answer_callback(
+        c, manager,
+        f"✅ Статус {format_payment_status(status)}: изменено {len(changed_ids)} из {len(order_ids)}",
+        show_alert=True,
+    )
+
+
+async def on_bulk_cancel_confirm(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Массовая отмена выбранных заказов"""
+    selection = _get_bulk_selection(manager)
+    order_ids = selection.get_checked()
+    if not order_ids:
+        await answer_callback(c, manager, "❌ Заказы не выбраны", show_alert=True)
+        await manager.switch_to(states.AdminOrders.BULK)
+        return
+    
+    async with async_session_maker() as session:
+        cancelled = await OrderRepository.bulk_delete(session, order_ids)
+    
+    # Уведомления пользователям отправляются в фоне с ограничением скорости
+    for _, telegram_id, payment_status in cancelled:
+        outbound.enqueue(telegram_id, format_cancellation_text(payment_status))
+    
+    await selection.reset_checked()
+    skipped = len(order_ids) - len(cancelled)
+    text = f"✅ Отменено заказов: {len(cancelled)}"
+    if skipped:
+        text += f"\nПропущено (в обработке или уже удалены): {skipped}"
+    await answer_callback(c, manager, text, show_alert=True)
+    await manager.switch_to(states.AdminOrders.BULK)
+
+
+async def get_filter_profiles_data(dialog_manager: DialogManager, **kwargs):
+    """Получение анкет с количеством заказов"""
+    async with async_session_maker() as session:
+        rows = await OrderRepository.count_by_profile(session)
+    return {
+        "items": [{"id": profile_id, "name": name, "count": count} for profile_id, name, count in rows],
+        "has_items": len(rows) > 0,
+        "items_text": "Выберите анкету:" if rows else "❌ Заказов пока нет",
+    }
+
+
+async def get_filter_games_data(dialog_manager: DialogManager, **kwargs):
+    """Получение игр с количеством заказов"""
+    async with async_session_maker() as session:
+        rows = await OrderRepository.count_by_game(session)
+    return {
+        "items": [{"id": game_id, "name": name, "count": count} for game_id, name, count in rows],
+        "has_items": len(rows) > 0,
+        "items_text": "Выберите игру:" if rows else "❌ Заказов с играми пока нет",
+    }
 
 
+async def _set_scope_filter(manager: DialogManager, key: str, name_key: str, items_getter):
+    """Установка фильтра по анкете или игре из выбранного элемента списка"""
+    item_id = int(manager.item_id)
+    data = await items_getter(manager)
+    name = next((item["name"] for item in data["items"] if item["id"] == item_id), str(item_id))
+    filters = dict(_get_filters(manager))
+    filters[key] = item_id
+    filters[name_key] = name
+    manager.dialog_data["order_filters"] = filters
+    manager.dialog_data["orders_page"] = 0
+
+
+async def on_filter_profile_select(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Выбор анкеты для фильтра"""
+    await _set_scope_filter(manager, "profile_id", "profile_name", get_filter_profiles_data)
+    await manager.switch_to(states.AdminOrders.MAIN)
+
+
+async def on_filter_game_select(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Выбор игры для фильтра"""
+    await _set_scope_filter(manager, "game_id", "game_name", get_filter_games_data)
+    await manager.switch_to(states.AdminOrders.MAIN)
+
+
+async def on_filter_dates_input(message: Message, widget: TextInput, manager: DialogManager, text: str):
+    """Ввод периода: "01.11.2025-30.11.2025" или одна дата"""
+    today = _admin_now().date()
+    parts = [part.strip() for part in text.replace("–", "-").split("-", maxsplit=1)]
+    # Разделитель "-" внутри ISO-дат не поддерживается, ожидаются даты вида дд.мм.гггг
+    date_from = parse_date_fast(parts[0], today) if parts[0] else None
+    date_to = parse_date_fast(parts[1], today) if len(parts) > 1 and parts[1] else date_from
+    
+    if date_from is None or date_to is None or date_to < date_from:
+        await message.answer("❌ Неверный период. Пример: 01.11.2025-30.11.2025")
+        return
+    
+    filters = dict(_get_filters(manager))
+    filters["date_from"] = date_from.isoformat()
+    filters["date_to"] = date_to.isoformat()
+    manager.dialog_data["order_filters"] = filters
+    manager.dialog_data["orders_page"] = 0
+    await manager.switch_to(states.AdminOrders.MAIN)
+
+
+@cached_getter(
+    "order",
+    lambda manager: manager.dialog_data.get("selected_order_id"),
+    # Имя анкеты в карточке устаревает при ее изменении
+    related=lambda data: [("profile", data.get("profile_id"))],
+)
 async def get_order_detail_data(dialog_manager: DialogManager, **kwargs):
     """Получение деталей заказа"""
     order_id = dialog_manager.dialog_data.get("selected_order_id")
@@ -81,6 +347,7 @@ async def get_order_detail_data(dialog_manager: DialogManager, **kwargs):
                 "order_number": order.order_number,
                 "user_username": f"@{order.user.username}" if order.user.username else "Не указан",
                 "user_id": order.user.telegram_id,
+                "profile_id": order.profile_id,
                 "profile_name": order.profile.name,
                 "format_emoji": format_emoji,
                 "format_name": format_name,
@@ -116,18 +383,15 @@ async def get_order_detail_data(dialog_manager: DialogManager, **kwargs):
 
 async def on_order_select(c: CallbackQuery, button: Button, manager: DialogManager):
     """Выбор заказа"""
-    # В ListGroup item_id передается через callback_data
-    if c.data:
-        parts = c.data.split(":")
-        item_id = parts[-1] if len(parts) >= 3 else (parts[-1] if parts else None)
-    else:
-        item_id = button.widget_id.split(":")[-1] if ":" in button.widget_id else None
+    # В ListGroup id элемента доступен через manager.item_id
+    item_id = getattr(manager, 'item_id', None)
     
-    if not item_id:
+    try:
+        order_id = int(item_id)
+    except (TypeError, ValueError):
         await c.answer("❌ Ошибка: не удалось получить ID заказа", show_alert=True)
         return
     
-    order_id = int(item_id)
     manager.dialog_data["selected_order_id"] = order_id
     await manager.switch_to(states.AdminOrders.DETAIL)
 
@@ -192,24 +456,25 @@ async def on_payment_status_select(c: CallbackQuery, button: Button, manager: Di
     order_id = manager.dialog_data.get("selected_order_id")
     
     if not order_id:
-        await c.answer("❌ Заказ не выбран", show_alert=True)
+        await answer_callback(c, manager, "❌ Заказ не выбран", show_alert=True)
         return
     
     async with async_session_maker() as session:
         order = await OrderRepository.get_by_id(session, order_id)
         if not order:
-            await c.answer("❌ Заказ не найден", show_alert=True)
+            await answer_callback(c, manager, "❌ Заказ не найден", show_alert=True)
+            return
+        
+        # Повторный выбор того же статуса ничего не меняет
+        if order.payment_status == status:
+            await answer_callback(c, manager, f"Статус уже: {status}")
+            await manager.switch_to(states.AdminOrders.DETAIL)
             return
         
         # Обновляем статус
-        result = await session.execute(
-            select(Order).where(Order.id == order_id)
-        )
-        order = result.scalar_one()
-        order.payment_status = status
-        await session.commit()
+        await OrderRepository.set_payment_status(session, order_id, status)
         
-        await c.answer(f"✅ Статус изменен на: {status}")
+        await answer_callback(c, manager, f"✅ Статус изменен на: {status}")
         await manager.switch_to(states.AdminOrders.DETAIL)
 
 
@@ -221,15 +486,10 @@ async def on_conference_link_input(message: Message, widget: TextInput, manager:
         return
     
     async with async_session_maker() as session:
-        from bot.database.models import Order as OrderModel
-        from sqlalchemy import select
-        
-        result = await session.execute(
-            select(OrderModel).where(OrderModel.id == order_id)
-        )
-        order = result.scalar_one()
-        order.conference_link = text.strip()
-        await session.commit()
+        order = await OrderRepository.set_conference_link(session, order_id, text.strip())
+        if not order:
+            await message.answer("❌ Заказ не найден")
+            return
         
         await message.answer("✅ Ссылка на конференцию добавлена")
         await manager.switch_to(states.AdminOrders.DETAIL)
@@ -239,38 +499,30 @@ async def on_cancel_confirm(c: CallbackQuery, button: Button, manager: DialogMan
     """Подтверждение отмены заказа"""
     order_id = manager.dialog_data.get("selected_order_id")
     if not order_id:
-        await c.answer("❌ Заказ не выбран", show_alert=True)
+        await answer_callback(c, manager, "❌ Заказ не выбран", show_alert=True)
         return
     
     async with async_session_maker() as session:
         order = await OrderRepository.get_by_id(session, order_id)
         if not order:
-            await c.answer("❌ Заказ не найден", show_alert=True)
+            await answer_callback(c, manager, "❌ Заказ не найден", show_alert=True)
             return
         
         payment_status = order.payment_status
         
         if payment_status == "processing":
-            await c.answer("❌ Невозможно отменить заказ со статусом 'В обработке'. Сначала измените статус оплаты.", show_alert=True)
+            await answer_callback(c, manager, "❌ Невозможно отменить заказ со статусом 'В обработке'. Сначала измените статус оплаты.", show_alert=True)
             return
         
-        # Удаляем заказ
-        result = await session.execute(
-            select(Order).where(Order.id == order_id)
-        )
-        order = result.scalar_one()
+        telegram_id = order.user.telegram_id
         
-        # Отправляем уведомление пользователю
-        from aiogram import Bot
-        from bot.config import BOT_TOKEN
-        bot = Bot(token=BOT_TOKEN)
-        await send_order_cancellation_to_user(bot, order, payment_status)
+        # Удаляем заказ (интервал освобождается в индексе слотов)
+        await OrderRepository.delete(session, order_id)
         
-        # Удаляем заказ
-        await session.delete(order)
-        await session.commit()
+        # Уведомление пользователю отправляется через очередь
+        outbound.enqueue(telegram_id, format_cancellation_text(payment_status))
         
-        await c.answer("✅ Заказ отменен")
+        await answer_callback(c, manager, "✅ Заказ отменен")
         await manager.switch_to(states.AdminOrders.LIST)
 
 
@@ -297,19 +549,74 @@ async def on_user_message_sent(message: Message, widget: MessageInput, manager:
             f"Если есть вопросы напишите в ответ на это сообщение!"
         )
         
-        # Отправляем сообщение пользователю
-        from aiogram import Bot
-        from bot.config import BOT_TOKEN
-        bot = Bot(token=BOT_TOKEN)
-        await bot.send_message(chat_id=user_id, text=text)
+        # Отправляем сообщение пользователю (ответ админа - вне очереди уведомлений)
+        await outbound.send_message(message.bot, user_id, text, priority=PRIORITY_INTERACTIVE)
         
         await message.answer("✅ Сообщение отправлено пользователю")
         await manager.switch_to(states.AdminOrders.DETAIL)
 
 
+async def on_datetime_input(message: Message, widget: TextInput, manager: DialogManager, text: str):
+    """Обработка ввода новой даты и времени заказа"""
+    order_id = manager.dialog_data.get("selected_order_id")
+    if not order_id:
+        await message.answer("❌ Заказ не выбран")
+        return
+    
+    # Ожидается "дата время", например "26.11.2025 19:00" или "14 июня 19:00"
+    parts = text.strip().rsplit(maxsplit=1)
+    tz = pytz.timezone(TIMEZONE)
+    today = datetime.now(tz).date()
+    parsed_date = parse_date_fast(parts[0], today) if len(parts) == 2 else None
+    parsed_time = parse_time_fast(parts[1]) if len(parts) == 2 else None
+    if parsed_date is None or parsed_time is None:
+        await message.answer("❌ Неверный формат. Введите дату и время, например: 26.11.2025 19:00")
+        return
+    
+    hours, minutes = parsed_time
+    new_date = datetime(parsed_date.year, parsed_date.month, parsed_date.day, hours, minutes)
+    
+    async with async_session_maker() as session:
+        order = await OrderRepository.get_by_id(session, order_id)
+        if not order:
+            await message.answer("❌ Заказ не найден")
+            return
+        
+        await slot_index.ensure_loaded(session)
+        
+        # Проверяем, что у анкеты нет других встреч в это время
+        end = new_date + timedelta(hours=order.duration_hours)
+        if slot_index.find_conflict(order.profile_id, new_date, end, exclude_order_id=order.id):
+            suggestion = slot_index.nearest_free(
+                order.profile_id, new_date, order.duration_hours,
+                not_before=datetime.now(tz), exclude_order_id=order.id
+            )
+            await message.answer(
+                "❌ У анкеты уже есть встреча в это время. "
+                f"Ближайшее свободное время: {suggestion.strftime('%d.%m.%Y %H:%M')}"
+            )
+            return
+        
+        await OrderRepository.reschedule(session, order_id, new_date)
+        # Напоминания о встрече перенесены вместе с заказом
+        await reminder_service.track_order(session, order_id)
+    
+    await message.answer(f"✅ Заказ перенесен на {new_date.strftime('%d.%m.%Y %H:%M')}")
+    await manager.switch_to(states.AdminOrders.DETAIL)
+
+
 async def get_change_datetime_data(dialog_manager: DialogManager, **kwargs):
     """Получение данных для окна изменения даты и времени"""
-    return {}
+    order_id = dialog_manager.dialog_data.get("selected_order_id")
+    current_datetime = "не указано"
+    
+    if order_id:
+        async with async_session_maker() as session:
+            order = await OrderRepository.get_by_id(session, order_id)
+            if order:
+                current_datetime = to_local_naive(order.date).strftime('%d.%m.%Y %H:%M')
+    
+    return {"current_datetime": current_datetime}
 
 
 async def get_change_payment_status_data(dialog_manager: DialogManager, **kwargs):
@@ -329,30 +636,202 @@ async def get_message_user_data(dialog_manager: DialogManager, **kwargs):
 
 orders_dialog = Dialog(
     Window(
-        Format("📋 <b>Управление заказами</b>\n\n{orders_text}"),
-        Group(
-            ScrollingGroup(
-                ListGroup(
-                    Button(
-                        Format("{item.order_number} - {item.total_price:.0f}₽ - {item.payment_status}"),
-                        id="order_btn",
-                        on_click=on_order_select,
-                    ),
-                    id="orders_list",
-                    item_id_getter=lambda item: str(item.id),
-                    items="orders",
-                ),
-                id="orders_scroll",
-                width=1,
-                height=10,
+        Format(
+            "📋 <b>Управление заказами</b>\n\n"
+            "Фильтры: {filters_text}\n"
+            "Выберите список:"
+        ),
+        Column(
+            Button(
+                Format("📋 Все ({count_total})"),
+                id="filter_all",
+                on_click=on_status_filter,
+            ),
+            Button(
+                Format("❌ Не оплачено ({count_not_paid})"),
+                id="filter_not_paid",
+                on_click=on_status_filter,
+            ),
+            Button(
+                Format("⏳ В обработке ({count_processing})"),
+                id="filter_processing",
+                on_click=on_status_filter,
+            ),
+            Button(
+                Format("✅ Оплачено ({count_paid})"),
+                id="filter_paid",
+                on_click=on_status_filter,
+            ),
+            Button(
+                Format("🕐 Ближайшие 24 часа ({count_upcoming})"),
+                id="filter_upcoming",
+                on_click=on_status_filter,
+            ),
+        ),
+        Row(
+            SwitchTo(
+                Const("🎀 Анкета"),
+                id="filter_profile",
+                state=states.AdminOrders.FILTER_PROFILE,
+            ),
+            SwitchTo(
+                Const("🎮 Игра"),
+                id="filter_game",
+                state=states.AdminOrders.FILTER_GAME,
+            ),
+            SwitchTo(
+                Const("📅 Период"),
+                id="filter_dates",
+                state=states.AdminOrders.FILTER_DATES,
             ),
-            when="has_orders",
+        ),
+        Button(
+            Const("♻️ Сбросить фильтры"),
+            id="filter_reset",
+            on_click=on_reset_filters,
+            when="has_scope_filters",
         ),
         Cancel(Const("🔙 Назад")),
         getter=get_orders_data,
         state=states.AdminOrders.MAIN,
     ),
     
+    Window(
+        Format(
+            "📋 <b>{list_title}</b>\n"
+            "Найдено: {total} · стр. {page}/{pages}\n\n"
+            "{orders_text}"
+        ),
+        Group(
+            ListGroup(
+                Button(
+                    Format("{item[title]}"),
+                    id="order_btn",
+                    on_click=on_order_select,
+                ),
+                id="orders_list",
+                item_id_getter=lambda item: str(item["id"]),
+                items="orders",
+            ),
+            when="has_orders",
+        ),
+        Row(
+            Button(
+                Const("◀️"),
+                id="orders_prev",
+                on_click=on_orders_prev_page,
+                when="has_prev",
+            ),
+            Button(
+                Const("▶️"),
+                id="orders_next",
+                on_click=on_orders_next_page,
+                when="has_next",
+            ),
+        ),
+        SwitchTo(
+            Const("☑️ Выбрать несколько"),
+            id="bulk_mode",
+            state=states.AdminOrders.BULK,
+            when="has_orders",
+        ),
+        SwitchTo(
+            Const("🔙 К фильтрам"),
+            id="back_to_filters",
+            state=states.AdminOrders.MAIN,
+        ),
+        getter=get_orders_list_data,
+        state=states.AdminOrders.LIST,
+    ),
+    
+    Window(
+        Format(
+            "☑️ <b>{list_title}</b>\n"
+            "Найдено: {total} · стр. {page}/{pages}\n\n"
+            "Выбрано заказов: {selected_count}"
+        ),
+        Column(
+            Multiselect(
+                Format("✅ {item[title]}"),
+                Format("{item[title]}"),
+                id="bulk_orders",
+                item_id_getter=lambda item: item["id"],
+                items="orders",
+                type_factory=int,
+            ),
+        ),
+        Row(
+            Button(
+                Const("◀️"),
+                id="orders_prev",
+                on_click=on_orders_prev_page,
+                when="has_prev",
+            ),
+            Button(
+                Const("▶️"),
+                id="orders_next",
+                on_click=on_orders_next_page,
+                when="has_next",
+            ),
+        ),
+        Row(
+            Button(
+                Const("✅ Оплачено"),
+                id="bulk_paid",
+                on_click=on_bulk_status,
+            ),
+            Button(
+                Const("⏳ В обработке"),
+                id="bulk_processing",
+                on_click=on_bulk_status,
+            ),
+            when="has_selection",
+        ),
+        Row(
+            SwitchTo(
+                Const("❌ Отменить"),
+                id="bulk_cancel",
+                state=states.AdminOrders.BULK_CANCEL,
+            ),
+            Button(
+                Const("🔄 Снять выбор"),
+                id="bulk_clear",
+                on_click=on_bulk_clear,
+            ),
+            when="has_selection",
+        ),
+        SwitchTo(
+            Const("🔙 К списку"),
+            id="back_to_list",
+            state=states.AdminOrders.LIST,
+        ),
+        getter=get_bulk_data,
+        state=states.AdminOrders.BULK,
+    ),
+    
+    Window(
+        Format(
+            "❓ <b>Подтверждение отмены</b>\n\n"
+            "Отменить выбранные заказы ({selected_count})?\n"
+            "Заказы в статусе 'В обработке' будут пропущены, "
+            "пользователи получат уведомления об отмене."
+        ),
+        Row(
+            Button(
+                Const("✅ Да, отменить"),
+                id="bulk_cancel_confirm",
+                on_click=on_bulk_cancel_confirm,
+            ),
+            SwitchTo(
+                Const("❌ Отмена"),
+                id="bulk_cancel_back",
+                state=states.AdminOrders.BULK,
+            ),
+        ),
+        getter=get_bulk_data,
+        state=states.AdminOrders.BULK_CANCEL,
+    ),
+    
     Window(
         Format(
             "📄 <b>Заказ {order_number}</b>\n\n"
@@ -408,7 +887,15 @@ orders_dialog = Dialog(
     ),
     
     Window(
-        Const("📅 <b>Изменить дату и время</b>\n\nФункция в разработке"),
+        Format(
+            "📅 <b>Изменить дату и время</b>\n\n"
+            "Сейчас: {current_datetime}\n\n"
+            "Введите новую дату и время (например: 26.11.2025 19:00):"
+        ),
+        TextInput(
+            id="order_datetime",
+            on_success=on_datetime_input,
+        ),
         Back(Const("🔙 Назад")),
         getter=get_change_datetime_data,
         state=states.AdminOrders.CHANGE_DATETIME,
@@ -476,5 +963,68 @@ orders_dialog = Dialog(
         getter=get_message_user_data,
         state=states.AdminOrders.MESSAGE_USER,
     ),
+    
+    Window(
+        Format("🎀 <b>Фильтр по анкете</b>\n\n{items_text}"),
+        Group(
+            ScrollingGroup(
+                ListGroup(
+                    Button(
+                        Format("{item[name]} ({item[count]})"),
+                        id="profile_btn",
+                        on_click=on_filter_profile_select,
+                    ),
+                    id="filter_profiles_list",
+                    item_id_getter=lambda item: str(item["id"]),
+                    items="items",
+                ),
+                id="filter_profiles_scroll",
+                width=1,
+                height=10,
+            ),
+            when="has_items",
+        ),
+        SwitchTo(Const("🔙 Назад"), id="back", state=states.AdminOrders.MAIN),
+        getter=get_filter_profiles_data,
+        state=states.AdminOrders.FILTER_PROFILE,
+    ),
+    
+    Window(
+        Format("🎮 <b>Фильтр по игре</b>\n\n{items_text}"),
+        Group(
+            ScrollingGroup(
+                ListGroup(
+                    Button(
+                        Format("{item[name]} ({item[count]})"),
+                        id="game_btn",
+                        on_click=on_filter_game_select,
+                    ),
+                    id="filter_games_list",
+                    item_id_getter=lambda item: str(item["id"]),
+                    items="items",
+                ),
+                id="filter_games_scroll",
+                width=1,
+                height=10,
+            ),
+            when="has_items",
+        ),
+        SwitchTo(Const("🔙 Назад"), id="back", state=states.AdminOrders.MAIN),
+        getter=get_filter_games_data,
+        state=states.AdminOrders.FILTER_GAME,
+    ),
+    
+    Window(
+        Const(
+            "📅 <b>Фильтр по периоду</b>\n\n"
+            "Введите период (например: 01.11.2025-30.11.2025) или одну дату:"
+        ),
+        TextInput(
+            id="filter_dates_input",
+            on_success=on_filter_dates_input,
+        ),
+        SwitchTo(Const("🔙 Назад"), id="back", state=states.AdminOrders.MAIN),
+        state=states.AdminOrders.FILTER_DATES,
+    ),
 )
 
@@ -17,6 +17,8 @@ from aiogram_dialog.api.entities import ShowMode
 from bot.dialogs.admin import states
 from bot.database.database import async_session_maker
 from bot.database.repositories import ProfileRepository, GameRepository
+from bot.utils.cache import cached_getter
+from bot.utils.media_group import media_group_collector
 from bot.database.models import Profile, Game
 
 logger = logging.getLogger(__name__)
@@ -709,20 +711,10 @@ async def on_delete_confirm(c: CallbackQuery, button: Button, manager: DialogMan
             await c.answer("❌ Ошибка при удалении", show_alert=True)
 
 
-async def get_edit_menu_data(dialog_manager: DialogManager, **kwargs):
-    """Получение данных для меню редактирования анкеты"""
+@cached_getter("profile", lambda manager: manager.dialog_data.get("selected_profile_id"))
+async def _get_edit_menu_view(dialog_manager: DialogManager, **kwargs):
+    """Данные меню редактирования анкеты (без изменения dialog_data, кэшируются)"""
     profile_id = dialog_manager.dialog_data.get("selected_profile_id")
-    if not profile_id:
-        return {
-            "profile_name": "Не выбрана",
-            "profile_age": "",
-            "profile_description": "",
-            "audio_price": "",
-            "video_price": "",
-            "private_price": "",
-            "channel_link": "",
-            "games_list": "",
-        }
     
     async with async_session_maker() as session:
         profile = await ProfileRepository.get_by_id(session, profile_id)
@@ -738,9 +730,8 @@ async def get_edit_menu_data(dialog_manager: DialogManager, **kwargs):
                 "games_list": "",
             }
         
-        # Обновляем данные для редактирования из базы (чтобы всегда были актуальные)
-        edit_profile = dialog_manager.dialog_data.get("edit_profile", {})
-        edit_profile.update({
+        # Данные анкеты из базы для синхронизации dialog_data
+        edit_sync = {
             "name": profile.name,
             "age": profile.age,
             "description": profile.description,
@@ -750,9 +741,7 @@ async def get_edit_menu_data(dialog_manager: DialogManager, **kwargs):
             "channel_link": profile.channel_link,
             "photo_ids": profile.photo_ids or [],
             "games": [pg.game_id for pg in profile.games],
-        })
-        dialog_manager.dialog_data["edit_profile"] = edit_profile
-        dialog_manager.dialog_data["selected_games"] = [pg.game_id for pg in profile.games]
+        }
         
         # Форматируем игры
         games_list = ", ".join([pg.game.name for pg in profile.games]) if profile.games else "Не указаны"
@@ -777,9 +766,43 @@ async def get_edit_menu_data(dialog_manager: DialogManager, **kwargs):
             "channel_link": profile.channel_link if profile.channel_link else "Не указана",
             "games_list": games_list,
             "photo_info": photo_info,
+            "edit_sync": edit_sync,
         }
 
 
+async def get_edit_menu_data(dialog_manager: DialogManager, **kwargs):
+    """Получение данных для меню редактирования анкеты"""
+    profile_id = dialog_manager.dialog_data.get("selected_profile_id")
+    if not profile_id:
+        return {
+            "profile_name": "Не выбрана",
+            "profile_age": "",
+            "profile_description": "",
+            "audio_price": "",
+            "video_price": "",
+            "private_price": "",
+            "channel_link": "",
+            "games_list": "",
+        }
+    
+    data = await _get_edit_menu_view(dialog_manager)
+    
+    # Обновляем данные для редактирования из базы (чтобы всегда были актуальные).
+    # Списки копируются, чтобы правки в dialog_data не меняли закэшированный результат
+    edit_sync = data.get("edit_sync")
+    if edit_sync:
+        edit_profile = dialog_manager.dialog_data.get("edit_profile", {})
+        edit_profile.update({
+            **edit_sync,
+            "photo_ids": list(edit_sync["photo_ids"]),
+            "games": list(edit_sync["games"]),
+        })
+        dialog_manager.dialog_data["edit_profile"] = edit_profile
+        dialog_manager.dialog_data["selected_games"] = list(edit_sync["games"])
+    
+    return data
+
+
 async def on_edit_field_select(c: CallbackQuery, button: Button, manager: DialogManager):
     """Выбор поля для редактирования"""
     field = button.widget_id.split("_")[-1]  # Получаем название поля из id кнопки
@@ -1087,59 +1110,85 @@ async def on_edit_channel_input(message: Message, widget: TextInput, manager: Di
     await manager.switch_to(states.AdminProfiles.EDIT_MENU)
 
 
+# Максимальное количество фотографий в анкете
+MAX_PROFILE_PHOTOS = 3
+
+
+async def _collect_photo_ids(message: Message, manager: DialogManager) -> Optional[List[str]]:
+    """
+    file_id фотографий из сообщения или целого альбома
+    
+    Для не первых частей альбома возвращает None и отключает перерисовку
+    окна: альбом целиком обрабатывает первая часть.
+    """
+    messages = await media_group_collector.collect(message)
+    if messages is None:
+        manager.show_mode = ShowMode.NO_UPDATE
+        return None
+    # Берем самое большое фото из каждого сообщения
+    return [part.photo[-1].file_id for part in messages if part.photo]
+
+
+async def _add_photos(message: Message, photos: List[str], photo_ids: List[str]) -> Optional[List[str]]:
+    """
+    Проверка и добавление пачки фотографий к анкете
+    
+    Returns:
+        Новый список фотографий или None, если пачка не прошла проверку
+    """
+    if not photo_ids:
+        await message.answer("❌ Отправьте фотографию")
+        return None
+    if len(photos) + len(photo_ids) > MAX_PROFILE_PHOTOS:
+        await message.answer(
+            f"❌ Можно загрузить максимум {MAX_PROFILE_PHOTOS} фотографии "
+            f"(уже загружено {len(photos)}, в сообщении {len(photo_ids)})"
+        )
+        return None
+    return photos + photo_ids
+
+
 async def on_photo_received(message: Message, widget: MessageInput, manager: DialogManager):
-    """Обработка получения фотографии"""
-    if message.photo:
-        # Берем самое большое фото
-        photo = message.photo[-1]
-        photo_id = photo.file_id
-        
-        photos = manager.dialog_data["new_profile"].get("photo_ids", [])
-        if len(photos) >= 3:
-            await message.answer("❌ Можно загрузить максимум 3 фотографии")
-            return
-        
-        photos.append(photo_id)
-        manager.dialog_data["new_profile"]["photo_ids"] = photos
-        
-        remaining = 3 - len(photos)
-        if remaining > 0:
-            await message.answer(f"✅ Фото добавлено. Осталось загрузить: {remaining}")
-        else:
-            await message.answer("✅ Все 3 фотографии загружены! Нажмите 'Продолжить'")
+    """Обработка получения фотографии или альбома"""
+    photo_ids = await _collect_photo_ids(message, manager)
+    if photo_ids is None:
+        return
+    
+    photos = await _add_photos(message, manager.dialog_data["new_profile"].get("photo_ids", []), photo_ids)
+    if photos is None:
+        return
+    manager.dialog_data["new_profile"]["photo_ids"] = photos
+    
+    remaining = MAX_PROFILE_PHOTOS - len(photos)
+    if remaining > 0:
+        await message.answer(f"✅ Добавлено фото: {len(photo_ids)}. Осталось загрузить: {remaining}")
     else:
-        await message.answer("❌ Отправьте фотографию")
+        await message.answer("✅ Все 3 фотографии загружены! Нажмите 'Продолжить'")
 
 
 async def on_edit_photo_received(message: Message, widget: MessageInput, manager: DialogManager):
-    """Обработка получения фотографии при редактировании"""
-    if message.photo:
-        # Берем самое большое фото
-        photo = message.photo[-1]
-        photo_id = photo.file_id
-        
-        photos = manager.dialog_data["edit_profile"].get("photo_ids", [])
-        if len(photos) >= 3:
-            await message.answer("❌ Можно загрузить максимум 3 фотографии")
-            return
-        
-        photos.append(photo_id)
-        manager.dialog_data["edit_profile"]["photo_ids"] = photos
-        
-        # Сохраняем изменения сразу
-        profile_id = manager.dialog_data.get("selected_profile_id")
-        if profile_id:
-            async with async_session_maker() as session:
-                await ProfileRepository.update(session, profile_id, {"photo_ids": photos})
-        
-        remaining = 3 - len(photos)
-        if remaining > 0:
-            await message.answer(f"✅ Фото добавлено. Осталось загрузить: {remaining}")
-        else:
-            await message.answer("✅ Все 3 фотографии загружены!")
-        await manager.switch_to(states.AdminProfiles.EDIT_MENU)
+    """Обработка получения фотографии или альбома при редактировании"""
+    photo_ids = await _collect_photo_ids(message, manager)
+    if photo_ids is None:
+        return
+    
+    photos = await _add_photos(message, manager.dialog_data["edit_profile"].get("photo_ids", []), photo_ids)
+    if photos is None:
+        return
+    manager.dialog_data["edit_profile"]["photo_ids"] = photos
+    
+    # Сохраняем весь альбом одной записью
+    profile_id = manager.dialog_data.get("selected_profile_id")
+    if profile_id:
+        async with async_session_maker() as session:
+            await ProfileRepository.update(session, profile_id, {"photo_ids": photos})
+    
+    remaining = MAX_PROFILE_PHOTOS - len(photos)
+    if remaining > 0:
+        await message.answer(f"✅ Добавлено фото: {len(photo_ids)}. Осталось загрузить: {remaining}")
     else:
-        await message.answer("❌ Отправьте фотографию")
+        await message.answer("✅ Все 3 фотографии загружены!")
+    await manager.switch_to(states.AdminProfiles.EDIT_MENU)
 
 
 async def on_game_toggle(c: CallbackQuery, button: Button, manager: DialogManager):
@@ -60,4 +60,26 @@ class AdminOrders(StatesGroup):
     CANCEL = State()
     MESSAGE_USER = State()
     MESSAGE_GIRL = State()
+    FILTER_PROFILE = State()
+    FILTER_GAME = State()
+    FILTER_DATES = State()
+    BULK = State()
+    BULK_CANCEL = State()
 
+
+class AdminStats(StatesGroup):
+    MAIN = State()
+    DAYS = State()
+    PROFILES = State()
+    GAMES = State()
+
+
+class AdminBroadcast(StatesGroup):
+    MAIN = State()
+    INPUT_TEXT = State()
+    CONFIRM = State()
+
+
+class AdminDeadLetters(StatesGroup):
+    MAIN = State()
+    CLEAR = State()
@@ -0,0 +1,157 @@
+"""Диалог статистики заказов"""
+import logging
+from datetime import datetime, timedelta
+from aiogram_dialog import Dialog, Window, DialogManager
+from aiogram_dialog.widgets.text import Const, Format
+from aiogram_dialog.widgets.kbd import Column, SwitchTo, Cancel
+import pytz
+from sqlalchemy import select
+
+from bot.dialogs.admin import states
+from bot.database.database import async_session_maker
+from bot.database.models import Profile, Game
+from bot.services import stats as order_stats
+from bot.config import TIMEZONE
+
+logger = logging.getLogger(__name__)
+
+# Количество дней в разбивке по дням
+DAYS_COUNT = 14
+# Количество строк в топах анкет и игр
+TOP_LIMIT = 10
+
+
+def _format_row(row) -> str:
+    """Строка статистики: заказы, оплаты, суммы"""
+    if row is None:
+        return "0 заказов"
+    return (
+        f"{row.orders_count} заказов, оплачено {row.paid_count} · "
+        f"{row.revenue:.0f} ₽ из {row.booked_amount:.0f} ₽"
+    )
+
+
+def _local_today():
+    """Сегодняшняя дата по МСК"""
+    return datetime.now(pytz.timezone(TIMEZONE)).date()
+
+
+async def get_stats_data(dialog_manager: DialogManager, **kwargs):
+    """Получение общей статистики из сводной таблицы"""
+    today = _local_today()
+    week_keys = [(today - timedelta(days=offset)).isoformat() for offset in range(7)]
+
+    async with async_session_maker() as session:
+        total = (await order_stats.get_rows(session, order_stats.SCOPE_TOTAL, [""])).get("")
+        days = await order_stats.get_rows(session, order_stats.SCOPE_DAY, week_keys)
+
+    week_orders = sum(row.orders_count for row in days.values())
+    week_revenue = sum(row.revenue for row in days.values())
+
+    return {
+        "total_text": _format_row(total),
+        "cancelled": total.cancelled_count if total else 0,
+        "today_text": _format_row(days.get(today.isoformat())),
+        "week_text": f"{week_orders} заказов, оплачено на {week_revenue:.0f} ₽",
+    }
+
+
+async def get_stats_days_data(dialog_manager: DialogManager, **kwargs):
+    """Получение статистики по дням встреч"""
+    today = _local_today()
+    day_list = [today + timedelta(days=offset) for offset in range(-DAYS_COUNT + 1, 7)]
+
+    async with async_session_maker() as session:
+        rows = await order_stats.get_rows(
+            session, order_stats.SCOPE_DAY, [day.isoformat() for day in day_list]
+        )
+
+    lines = [
+        f"{day.strftime('%d.%m')}{' ◀️' if day == today else ''}: {_format_row(rows[day.isoformat()])}"
+        for day in day_list if day.isoformat() in rows
+    ]
+    return {"days_text": "\n".join(lines) if lines else "Нет заказов"}
+
+
+async def _get_top_text(scope: str, model) -> str:
+    """Топ анкет или игр по выручке с названиями"""
+    async with async_session_maker() as session:
+        rows = await order_stats.get_top(session, scope, limit=TOP_LIMIT)
+        ids = [int(row.key) for row in rows if row.key.isdigit() and row.key != "0"]
+        names = {}
+        if ids:
+            result = await session.execute(select(model.id, model.name).where(model.id.in_(ids)))
+            names = {str(entity_id): name for entity_id, name in result.all()}
+
+    lines = []
+    for row in rows:
+        if row.key == "0":
+            name = "Без игры"
+        else:
+            name = names.get(row.key, f"#{row.key} (удалено)")
+        lines.append(f"{name}: {_format_row(row)}")
+    return "\n".join(lines) if lines else "Нет заказов"
+
+
+async def get_stats_profiles_data(dialog_manager: DialogManager, **kwargs):
+    """Получение статистики по анкетам"""
+    return {"top_text": await _get_top_text(order_stats.SCOPE_PROFILE, Profile)}
+
+
+async def get_stats_games_data(dialog_manager: DialogManager, **kwargs):
+    """Получение статистики по играм"""
+    return {"top_text": await _get_top_text(order_stats.SCOPE_GAME, Game)}
+
+
+stats_dialog = Dialog(
+    Window(
+        Format(
+            "📊 <b>Статистика заказов</b>\n\n"
+            "Всего: {total_text}\n"
+            "Отменено: {cancelled}\n\n"
+            "📅 Сегодня: {today_text}\n"
+            "🗓 За 7 дней: {week_text}"
+        ),
+        Column(
+            SwitchTo(
+                Const("📅 По дням"),
+                id="stats_days",
+                state=states.AdminStats.DAYS,
+            ),
+            SwitchTo(
+                Const("🎀 По анкетам"),
+                id="stats_profiles",
+                state=states.AdminStats.PROFILES,
+            ),
+            SwitchTo(
+                Const("🎮 По играм"),
+                id="stats_games",
+                state=states.AdminStats.GAMES,
+            ),
+            Cancel(Const("🔙 Назад")),
+        ),
+        getter=get_stats_data,
+        state=states.AdminStats.MAIN,
+    ),
+
+    Window(
+        Format("📅 <b>Статистика по дням встреч</b>\n\n{days_text}"),
+        SwitchTo(Const("🔙 Назад"), id="back", state=states.AdminStats.MAIN),
+        getter=get_stats_days_data,
+        state=states.AdminStats.DAYS,
+    ),
+
+    Window(
+        Format("🎀 <b>Топ анкет по выручке</b>\n\n{top_text}"),
+        SwitchTo(Const("🔙 Назад"), id="back", state=states.AdminStats.MAIN),
+        getter=get_stats_profiles_data,
+        state=states.AdminStats.PROFILES,
+    ),
+
+    Window(
+        Format("🎮 <b>Топ игр по выручке</b>\n\n{top_text}"),
+        SwitchTo(Const("🔙 Назад"), id="back", state=states.AdminStats.MAIN),
+        getter=get_stats_games_data,
+        state=states.AdminStats.GAMES,
+    ),
+)
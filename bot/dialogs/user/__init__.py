@@ -2,6 +2,8 @@
 from bot.dialogs.user.start import start_dialog
 from bot.dialogs.user.profiles import profiles_dialog
 from bot.dialogs.user.booking import booking_dialog
+from bot.dialogs.user.games import games_dialog
+from bot.dialogs.user.cabinet import cabinet_dialog
 
 
 def get_user_dialogs():
@@ -10,5 +12,7 @@ def get_user_dialogs():
         start_dialog,
         profiles_dialog,
         booking_dialog,
+        games_dialog,
+        cabinet_dialog,
     ]
 
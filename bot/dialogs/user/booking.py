@@ -1,8 +1,9 @@
 """Диалог бронирования встречи"""
+import asyncio
 import logging
-from datetime import datetime, timedelta
+import uuid
+from datetime import date, datetime, time, timedelta
 from typing import List, Optional
-import dateparser
 import pytz
 from aiogram_dialog import Dialog, Window, DialogManager, StartMode
 from aiogram_dialog.widgets.text import Const, Format
@@ -13,12 +14,20 @@ from aiogram.types import CallbackQuery, Message
 from bot.dialogs.user.states import UserBooking
 from bot.database.database import async_session_maker
 from bot.database.repositories import (
-    ProfileRepository, GameRepository, OrderRepository, UserRepository
+    ProfileRepository, OrderRepository, UserRepository
 )
 from bot.services.payment import calculate_order_price, format_price_calculation
-from bot.services.notifications import send_new_order_notification
+from bot.services.outbound import PRIORITY_INTERACTIVE
+from bot.services.outbox import outbox_worker, OUTBOX_NEW_ORDER, OUTBOX_MESSAGE
+from bot.services.reminders import reminder_service
+from bot.services.slots import slot_index, to_local_naive
+from bot.services.availability import month_availability, DAY_FULL
+from bot.utils.calendar import BookingCalendar, get_calendar_month
+from bot.utils.callbacks import answer_callback
+from bot.utils.datetime_parser import (
+    parse_date_fast, parse_date_fallback, parse_time_fast, parse_time_fallback
+)
 from bot.config import TIMEZONE
-from aiogram import Bot
 
 logger = logging.getLogger(__name__)
 
@@ -26,8 +35,71 @@ logger = logging.getLogger(__name__)
 tz = pytz.timezone(TIMEZONE)
 
 
+def _make_booking_snapshot(profile) -> dict:
+    """Снимок данных анкеты, нужных на всех шагах бронирования"""
+    return {
+        "profile_id": profile.id,
+        "profile_name": profile.name,
+        "audio_chat_price": profile.audio_chat_price,
+        "video_chat_price": profile.video_chat_price,
+        "private_price": profile.private_price,
+        "games": [
+            {"id": pg.game.id, "name": pg.game.name}
+            for pg in profile.games if pg.game
+        ],
+        # Версия анкеты для проверки изменения цен при подтверждении
+        "version": profile.updated_at.isoformat() if profile.updated_at else None,
+    }
+
+
+def _get_booking(dialog_manager: DialogManager) -> Optional[dict]:
+    """Снимок данных бронирования из dialog_data"""
+    return dialog_manager.dialog_data.get("booking")
+
+
+def _get_game_name(booking: dict, game_id: Optional[int]) -> Optional[str]:
+    """Название игры из снимка бронирования"""
+    if not game_id:
+        return None
+    for game in booking.get("games", []):
+        if game["id"] == game_id:
+            return game["name"]
+    return None
+
+
+async def _check_slot(dialog_manager: DialogManager, start: datetime, duration_hours: float) -> Optional[str]:
+    """
+    Проверка, свободна ли анкета в [start, start + duration_hours)
+    
+    Returns:
+        Текст ошибки с ближайшим свободным временем или None, если время свободно
+    """
+    booking = _get_booking(dialog_manager)
+    if not booking:
+        return None
+    
+    if not slot_index.loaded:
+        async with async_session_maker() as session:
+            await slot_index.ensure_loaded(session)
+    
+    profile_id = booking["profile_id"]
+    start = to_local_naive(start)
+    end = start + timedelta(hours=duration_hours)
+    if slot_index.find_conflict(profile_id, start, end) is None:
+        return None
+    
+    suggestion = slot_index.nearest_free(
+        profile_id, start, duration_hours, not_before=datetime.now(tz)
+    )
+    logger.info(f"[_check_slot] Анкета {profile_id} занята в {start}, предложено {suggestion}")
+    return (
+        "❌ Это время уже занято. "
+        f"Ближайшее свободное время: {suggestion.strftime('%d.%m.%Y %H:%M')}"
+    )
+
+
 async def on_booking_start(start_data, dialog_manager: DialogManager):
-    """Обработчик запуска диалога - сохраняем данные из start_data в dialog_data"""
+    """Обработчик запуска диалога - сохраняем данные из start_data и снимок анкеты в dialog_data"""
     if start_data:
         logger.info(f"[on_booking_start] Получены данные из start_data: {start_data}")
         if isinstance(start_data, dict):
@@ -37,21 +109,34 @@ async def on_booking_start(start_data, dialog_manager: DialogManager):
             logger.warning(f"[on_booking_start] start_data не является словарем: {type(start_data)}")
     else:
         logger.warning(f"[on_booking_start] start_data пуст или None")
+    
+    # Ключ идемпотентности бронирования: повторное подтверждение не создаст второй заказ
+    dialog_manager.dialog_data["idempotency_key"] = uuid.uuid4().hex
+    
+    profile_id = dialog_manager.dialog_data.get("selected_profile_id")
+    if not profile_id:
+        return
+    
+    # Загружаем анкету один раз на всё бронирование
+    async with async_session_maker() as session:
+        profile = await ProfileRepository.get_by_id(session, profile_id)
+        if not profile:
+            logger.error(f"[on_booking_start] Профиль с id {profile_id} не найден в БД")
+            return
+        dialog_manager.dialog_data["booking"] = _make_booking_snapshot(profile)
+    logger.info(f"[on_booking_start] Снимок анкеты {profile_id} сохранен")
 
 
 async def get_confirm_format_data(dialog_manager: DialogManager, **kwargs):
     """Получение данных для подтверждения формата"""
-    # В aiogram-dialog данные из data при start() автоматически попадают в dialog_data
-    profile_id = dialog_manager.dialog_data.get("selected_profile_id")
+    booking = _get_booking(dialog_manager)
     format_type = dialog_manager.dialog_data.get("format_type", "audio")
     
-    logger.info(f"[get_confirm_format_data] Начало. profile_id = {profile_id}, format_type = {format_type}")
-    logger.info(f"[get_confirm_format_data] dialog_data keys = {list(dialog_manager.dialog_data.keys())}")
-    logger.info(f"[get_confirm_format_data] dialog_data = {dict(dialog_manager.dialog_data)}")
+    logger.info(f"[get_confirm_format_data] Начало. format_type = {format_type}")
     
     # Если данных нет, это критическая ошибка - данные должны были быть переданы
-    if not profile_id:
-        logger.error(f"[get_confirm_format_data] КРИТИЧЕСКАЯ ОШИБКА: profile_id не найден в dialog_data!")
+    if not booking:
+        logger.error(f"[get_confirm_format_data] КРИТИЧЕСКАЯ ОШИБКА: снимок анкеты не найден в dialog_data!")
         logger.error(f"[get_confirm_format_data] dialog_data полностью: {dict(dialog_manager.dialog_data)}")
         return {
             "format_emoji": "🎧",
@@ -60,52 +145,30 @@ async def get_confirm_format_data(dialog_manager: DialogManager, **kwargs):
             "description": "Ошибка: данные анкеты не найдены. Пожалуйста, попробуйте выбрать формат еще раз.",
         }
     
-    if not profile_id:
-        logger.warning(f"[get_confirm_format_data] profile_id не найден в dialog_data")
-        return {
-            "format_emoji": "🎧",
-            "format_name": "Аудио-чат",
-            "price": "0 ₽/час",
-            "description": "",
-        }
+    if format_type == "audio":
+        format_emoji = "🎧"
+        format_name = "Аудио-чат"
+        price = f"{booking['audio_chat_price']:.0f} ₽/час"
+        description = "В аудио-чате вы сможете поговорить в реальном времени, поиграть вместе и просто классно провести время."
+    elif format_type == "video":
+        format_emoji = "🎥"
+        format_name = "Видео-чат"
+        price = f"{booking['video_chat_price']:.0f} ₽/час"
+        description = "В видео-чате вы сможете видеть друг друга, поговорить в реальном времени, поиграть вместе и просто классно провести время."
+    else:  # private
+        format_emoji = "💎"
+        format_name = "Приватка"
+        price = f"{booking['private_price']:.0f} ₽" if booking["private_price"] else "0 ₽"
+        description = "Приватка - это особый формат общения с расширенными возможностями."
     
-    async with async_session_maker() as session:
-        profile = await ProfileRepository.get_by_id(session, profile_id)
-        if not profile:
-            logger.error(f"[get_confirm_format_data] Профиль с id {profile_id} не найден в БД")
-            return {
-                "format_emoji": "🎧",
-                "format_name": "Аудио-чат",
-                "price": "0 ₽/час",
-                "description": "",
-            }
-        
-        logger.info(f"[get_confirm_format_data] Профиль найден: {profile.name}, audio_price = {profile.audio_chat_price}, video_price = {profile.video_chat_price}")
-        
-        if format_type == "audio":
-            format_emoji = "🎧"
-            format_name = "Аудио-чат"
-            price = f"{profile.audio_chat_price:.0f} ₽/час"
-            description = "В аудио-чате вы сможете поговорить в реальном времени, поиграть вместе и просто классно провести время."
-        elif format_type == "video":
-            format_emoji = "🎥"
-            format_name = "Видео-чат"
-            price = f"{profile.video_chat_price:.0f} ₽/час"
-            description = "В видео-чате вы сможете видеть друг друга, поговорить в реальном времени, поиграть вместе и просто классно провести время."
-        else:  # private
-            format_emoji = "💎"
-            format_name = "Приватка"
-            price = f"{profile.private_price:.0f} ₽" if profile.private_price else "0 ₽"
-            description = "Приватка - это особый формат общения с расширенными возможностями."
-        
-        logger.info(f"[get_confirm_format_data] Возвращаем: format_name = {format_name}, price = {price}")
-        
-        return {
-            "format_emoji": format_emoji,
-            "format_name": format_name,
-            "price": price,
-            "description": description,
-        }
+    logger.info(f"[get_confirm_format_data] Возвращаем: format_name = {format_name}, price = {price}")
+    
+    return {
+        "format_emoji": format_emoji,
+        "format_name": format_name,
+        "price": price,
+        "description": description,
+    }
 
 
 async def on_confirm_format_yes(c: CallbackQuery, button: Button, manager: DialogManager):
@@ -116,7 +179,7 @@ async def on_confirm_format_yes(c: CallbackQuery, button: Button, manager: Dialo
 
 async def get_select_game_data(dialog_manager: DialogManager, **kwargs):
     """Получение списка игр для выбора"""
-    profile_id = dialog_manager.dialog_data.get("selected_profile_id")
+    booking = _get_booking(dialog_manager)
     format_type = dialog_manager.dialog_data.get("format_type", "audio")
     
     format_names = {
@@ -126,29 +189,13 @@ async def get_select_game_data(dialog_manager: DialogManager, **kwargs):
     }
     format_name = format_names.get(format_type, "Аудио-чат")
     
-    if not profile_id:
-        return {
-            "games": [],
-            "has_games": False,
-            "format_name": format_name,
-        }
+    games = booking.get("games", []) if booking else []
     
-    async with async_session_maker() as session:
-        profile = await ProfileRepository.get_by_id(session, profile_id)
-        if not profile:
-            return {
-                "games": [],
-                "has_games": False,
-                "format_name": format_name,
-            }
-        
-        games = [pg.game for pg in profile.games if pg.game]
-        
-        return {
-            "games": games,
-            "has_games": len(games) > 0,
-            "format_name": format_name,
-        }
+    return {
+        "games": games,
+        "has_games": len(games) > 0,
+        "format_name": format_name,
+    }
 
 
 async def on_game_select(c: CallbackQuery, button: Button, manager: DialogManager):
@@ -179,34 +226,79 @@ async def on_game_select(c: CallbackQuery, button: Button, manager: DialogManage
 
 
 async def get_input_date_data(dialog_manager: DialogManager, **kwargs):
-    """Получение данных для ввода даты"""
-    return {}
+    """Получение данных для выбора даты: занятость анкеты по дням показанного месяца"""
+    booking = _get_booking(dialog_manager)
+    if not booking:
+        return {"day_statuses": {}}
+    
+    month = get_calendar_month(dialog_manager, "booking_calendar")
+    async with async_session_maker() as session:
+        day_statuses = await month_availability.get_day_statuses(
+            session, booking["profile_id"], month.year, month.month
+        )
+    
+    return {"day_statuses": day_statuses}
+
+
+async def _is_day_full(manager: DialogManager, day: date) -> bool:
+    """Занят ли у анкеты весь день (по кэшу занятости месяца)"""
+    booking = _get_booking(manager)
+    if not booking:
+        return False
+    
+    async with async_session_maker() as session:
+        day_statuses = await month_availability.get_day_statuses(
+            session, booking["profile_id"], day.year, day.month
+        )
+    return day_statuses.get(day.isoformat()) == DAY_FULL
+
+
+async def _set_order_date(manager: DialogManager, order_date: date):
+    """Сохранение выбранной даты и переход к вводу времени"""
+    # Сохраняем только дату (без времени)
+    manager.dialog_data["order_date"] = order_date.isoformat()
+    logger.info(f"[_set_order_date] Дата установлена: {order_date}")
+    await manager.switch_to(UserBooking.INPUT_TIME)
+
+
+async def on_calendar_date_selected(c: CallbackQuery, widget, manager: DialogManager, selected_date: date):
+    """Выбор даты в календаре"""
+    today = datetime.now(tz).date()
+    if selected_date < today:
+        await c.answer("❌ Дата должна быть в будущем", show_alert=True)
+        return
+    
+    if await _is_day_full(manager, selected_date):
+        await c.answer("❌ На этот день всё занято. Выберите другой день", show_alert=True)
+        return
+    
+    await _set_order_date(manager, selected_date)
 
 
 async def on_date_input(message: Message, widget: TextInput, manager: DialogManager, text: str):
     """Обработка ввода даты"""
     text = text.strip()
+    today = datetime.now(tz).date()
     
-    # Парсим дату с помощью dateparser
-    parsed_date = dateparser.parse(text, languages=['ru', 'en'], settings={
-        'TIMEZONE': TIMEZONE,
-        'RELATIVE_BASE': datetime.now(tz),
-    })
+    # Типовые формы разбираем быстро, редкие - через dateparser в отдельном потоке
+    parsed_date = parse_date_fast(text, today)
+    if parsed_date is None:
+        parsed_date = await asyncio.to_thread(parse_date_fallback, text, today)
     
     if not parsed_date:
         await message.answer("❌ Не удалось распознать дату. Попробуйте еще раз (например: 14 июня, 26.11.2025)")
         return
     
-    # Убеждаемся, что дата в будущем
-    now = datetime.now(tz)
-    if parsed_date.replace(tzinfo=tz) < now:
+    # Убеждаемся, что дата не в прошлом (время проверяется на следующем шаге)
+    if parsed_date < today:
         await message.answer("❌ Дата должна быть в будущем. Попробуйте еще раз")
         return
     
-    # Сохраняем только дату (без времени)
-    manager.dialog_data["order_date"] = parsed_date.date().isoformat()
-    logger.info(f"[on_date_input] Дата установлена: {parsed_date.date()}")
-    await manager.switch_to(UserBooking.INPUT_TIME)
+    if await _is_day_full(manager, parsed_date):
+        await message.answer("❌ На этот день всё занято. Выберите другой день")
+        return
+    
+    await _set_order_date(manager, parsed_date)
 
 
 async def get_input_time_data(dialog_manager: DialogManager, **kwargs):
@@ -218,40 +310,41 @@ async def on_time_input(message: Message, widget: TextInput, manager: DialogMana
     """Обработка ввода времени"""
     text = text.strip()
     
-    # Парсим время (формат HH:MM)
-    try:
-        time_parts = text.split(":")
-        if len(time_parts) != 2:
-            raise ValueError
-        
-        hours = int(time_parts[0])
-        minutes = int(time_parts[1])
-        
-        if not (0 <= hours < 24 and 0 <= minutes < 60):
-            raise ValueError
-        
-        # Объединяем дату и время
-        order_date_str = manager.dialog_data.get("order_date")
-        if not order_date_str:
-            await message.answer("❌ Ошибка: дата не установлена")
-            return
-        
-        from datetime import date
-        order_date = date.fromisoformat(order_date_str)
-        order_datetime = tz.localize(datetime.combine(order_date, datetime.min.time().replace(hour=hours, minute=minutes)))
-        
-        # Проверяем, что дата и время в будущем
-        now = datetime.now(tz)
-        if order_datetime < now:
-            await message.answer("❌ Время должно быть в будущем. Попробуйте еще раз")
-            return
-        
-        manager.dialog_data["order_datetime"] = order_datetime.isoformat()
-        logger.info(f"[on_time_input] Время установлено: {order_datetime}")
-        await manager.switch_to(UserBooking.INPUT_DURATION)
-        
-    except (ValueError, IndexError):
+    # Поддерживаются 19:00, 19.30, 19, 7pm, 7 вечера и т.п.
+    parsed_time = parse_time_fast(text)
+    if parsed_time is None:
+        parsed_time = await asyncio.to_thread(parse_time_fallback, text)
+    
+    if parsed_time is None:
         await message.answer("❌ Неверный формат времени. Используйте формат ЧЧ:ММ (например: 19:00)")
+        return
+    
+    hours, minutes = parsed_time
+    
+    # Объединяем дату и время
+    order_date_str = manager.dialog_data.get("order_date")
+    if not order_date_str:
+        await message.answer("❌ Ошибка: дата не установлена")
+        return
+    
+    order_date = date.fromisoformat(order_date_str)
+    order_datetime = tz.localize(datetime.combine(order_date, time(hour=hours, minute=minutes)))
+    
+    # Проверяем, что дата и время в будущем
+    now = datetime.now(tz)
+    if order_datetime < now:
+        await message.answer("❌ Время должно быть в будущем. Попробуйте еще раз")
+        return
+    
+    # Встреча длится минимум час - проверяем, что этот час у анкеты свободен
+    conflict_text = await _check_slot(manager, order_datetime, 1.0)
+    if conflict_text:
+        await message.answer(conflict_text)
+        return
+    
+    manager.dialog_data["order_datetime"] = order_datetime.isoformat()
+    logger.info(f"[on_time_input] Время установлено: {order_datetime}")
+    await manager.switch_to(UserBooking.INPUT_DURATION)
 
 
 async def get_input_duration_data(dialog_manager: DialogManager, **kwargs):
@@ -272,14 +365,25 @@ async def on_duration_input(message: Message, widget: TextInput, manager: Dialog
     """Обработка ввода продолжительности"""
     try:
         duration = float(text.strip())
-        if duration < 1:
-            await message.answer("❌ Продолжительность должна быть не менее 1 часа")
-            return
-        manager.dialog_data["duration_hours"] = duration
-        logger.info(f"[on_duration_input] Продолжительность установлена: {duration} часов")
-        await manager.switch_to(UserBooking.INPUT_PARTICIPANTS)
     except ValueError:
         await message.answer("❌ Введите число (например: 2)")
+        return
+    
+    if duration < 1:
+        await message.answer("❌ Продолжительность должна быть не менее 1 часа")
+        return
+    
+    # Проверяем, что анкета свободна на всю продолжительность встречи
+    order_datetime_str = manager.dialog_data.get("order_datetime")
+    if order_datetime_str:
+        conflict_text = await _check_slot(manager, datetime.fromisoformat(order_datetime_str), duration)
+        if conflict_text:
+            await message.answer(conflict_text)
+            return
+    
+    manager.dialog_data["duration_hours"] = duration
+    logger.info(f"[on_duration_input] Продолжительность установлена: {duration} часов")
+    await manager.switch_to(UserBooking.INPUT_PARTICIPANTS)
 
 
 async def get_input_participants_data(dialog_manager: DialogManager, **kwargs):
@@ -303,14 +407,14 @@ async def on_participants_input(message: Message, widget: TextInput, manager: Di
 
 async def get_confirm_order_data(dialog_manager: DialogManager, **kwargs):
     """Получение данных для подтверждения заказа"""
-    profile_id = dialog_manager.dialog_data.get("selected_profile_id")
+    booking = _get_booking(dialog_manager)
     format_type = dialog_manager.dialog_data.get("format_type", "audio")
     game_id = dialog_manager.dialog_data.get("selected_game_id")
     order_datetime_str = dialog_manager.dialog_data.get("order_datetime")
     duration_hours = dialog_manager.dialog_data.get("duration_hours", 1.0)
     participants_count = dialog_manager.dialog_data.get("participants_count", 1)
     
-    if not profile_id or not order_datetime_str:
+    if not booking or not order_datetime_str:
         return {
             "format_emoji": "🎧",
             "format_name": "Аудио-чат",
@@ -322,124 +426,106 @@ async def get_confirm_order_data(dialog_manager: DialogManager, **kwargs):
             "calculation_text": "",
         }
     
-    async with async_session_maker() as session:
-        profile = await ProfileRepository.get_by_id(session, profile_id)
-        if not profile:
-            return {
-                "format_emoji": "🎧",
-                "format_name": "Аудио-чат",
-                "game_name": "Не указана",
-                "date": "Не указана",
-                "time": "Не указано",
-                "duration": "0 ч.",
-                "participants": 0,
-                "calculation_text": "",
-            }
-        
-        # Получаем игру
-        game_name = "Не указана"
-        if game_id:
-            game = await GameRepository.get_by_id(session, game_id)
-            if game:
-                game_name = game.name
-        
-        # Парсим дату и время
-        order_datetime = datetime.fromisoformat(order_datetime_str)
-        date_str = order_datetime.strftime("%d.%m.%Y")
-        time_str = order_datetime.strftime("%H:%M")
-        
-        # Определяем формат и цену
-        if format_type == "audio":
-            format_emoji = "🎧"
-            format_name = "Аудио-чат"
-            price_per_hour = profile.audio_chat_price
-        elif format_type == "video":
-            format_emoji = "🎥"
-            format_name = "Видео-чат"
-            price_per_hour = profile.video_chat_price
-        else:  # private
-            format_emoji = "💎"
-            format_name = "Приватка"
-            # Для приватки цена фиксированная, не по часам
-            price_per_hour = profile.private_price or 0
-            duration_hours = 1.0  # Для расчета используем 1 час
-        
-        # Рассчитываем стоимость
-        if format_type == "private":
-            # Для приватки просто фиксированная цена
-            calculation = {
-                "base_price": price_per_hour,
-                "additional_participants_price": 0,
-                "total_price": price_per_hour,
-            }
-            calculation_text = f"💰 Стоимость: {price_per_hour:.0f}₽"
-        else:
-            calculation = calculate_order_price(price_per_hour, duration_hours, participants_count)
-            calculation_text = format_price_calculation(price_per_hour, duration_hours, participants_count, calculation)
-        
-        # Сохраняем расчет в dialog_data для создания заказа
-        dialog_manager.dialog_data["calculation"] = calculation
-        dialog_manager.dialog_data["price_per_hour"] = price_per_hour
-        
-        # Формируем краткое сообщение для подтверждения (БЕЗ "✅ Заказ оформлен!")
-        if format_type == "private":
-            order_preview = (
-                f"{format_emoji} Формат: {format_name}\n"
-                f"🎮 Игра: {game_name}\n"
-                f"📅 Дата: {date_str}\n"
-                f"⏰ Время: {time_str}\n"
-                f"👥 Участников: {participants_count}\n\n"
-                f"{calculation_text}"
-            )
-        else:
-            order_preview = (
-                f"{format_emoji} Формат: {format_name}\n"
-                f"🎮 Игра: {game_name}\n"
-                f"📅 Дата: {date_str}\n"
-                f"⏰ Время: {time_str}\n"
-                f"⏱️ Продолжительность: {duration_hours:.0f} ч.\n"
-                f"👥 Участников: {participants_count}\n\n"
-                f"{calculation_text}"
-            )
-        
-        # Сохраняем полное итоговое сообщение для отправки после подтверждения
-        if format_type == "private":
-            order_summary = (
-                f"✅ Заказ оформлен!\n"
-                f"{format_emoji} Формат: {format_name}\n"
-                f"🎮 Игра: {game_name}\n"
-                f"📅 Дата: {date_str}\n"
-                f"⏰ Время: {time_str}\n"
-                f"👥 Участников: {participants_count}\n\n"
-                f"{calculation_text}\n\n"
-                f"Пожалуйста, подождите с Вами свяжется администратор для завершения заказа."
-            )
-        else:
-            order_summary = (
-                f"✅ Заказ оформлен!\n"
-                f"{format_emoji} Формат: {format_name}\n"
-                f"🎮 Игра: {game_name}\n"
-                f"📅 Дата: {date_str}\n"
-                f"⏰ Время: {time_str}\n"
-                f"⏱️ Продолжительность: {duration_hours:.0f} ч.\n"
-                f"👥 Участников: {participants_count}\n\n"
-                f"{calculation_text}\n\n"
-                f"Пожалуйста, подождите с Вами свяжется администратор для завершения заказа."
-            )
-        
-        dialog_manager.dialog_data["order_summary"] = order_summary
-        
-        return {
-            "format_emoji": format_emoji,
-            "format_name": format_name,
-            "game_name": game_name,
-            "date": date_str,
-            "time": time_str,
-            "duration": f"{duration_hours:.0f} ч.",
-            "participants": participants_count,
-            "calculation_text": calculation_text,
-            "order_preview": order_preview,
+    # Название игры из снимка бронирования
+    game_name = _get_game_name(booking, game_id) or "Не указана"
+    
+    # Парсим дату и время
+    order_datetime = datetime.fromisoformat(order_datetime_str)
+    date_str = order_datetime.strftime("%d.%m.%Y")
+    time_str = order_datetime.strftime("%H:%M")
+    
+    # Определяем формат и цену
+    if format_type == "audio":
+        format_emoji = "🎧"
+        format_name = "Аудио-чат"
+        price_per_hour = booking["audio_chat_price"]
+    elif format_type == "video":
+        format_emoji = "🎥"
+        format_name = "Видео-чат"
+        price_per_hour = booking["video_chat_price"]
+    else:  # private
+        format_emoji = "💎"
+        format_name = "Приватка"
+        # Для приватки цена фиксированная, не по часам
+        price_per_hour = booking["private_price"] or 0
+        duration_hours = 1.0  # Для расчета используем 1 час
+    
+    # Рассчитываем стоимость
+    if format_type == "private":
+        # Для приватки просто фиксированная цена
+        calculation = {
+            "base_price": price_per_hour,
+            "additional_participants_price": 0,
+            "total_price": price_per_hour,
         }
+        calculation_text = f"💰 Стоимость: {price_per_hour:.0f}₽"
+    else:
+        calculation = calculate_order_price(price_per_hour, duration_hours, participants_count)
+        calculation_text = format_price_calculation(price_per_hour, duration_hours, participants_count, calculation)
+    
+    # Сохраняем расчет в dialog_data для создания заказа
+    dialog_manager.dialog_data["calculation"] = calculation
+    dialog_manager.dialog_data["price_per_hour"] = price_per_hour
+    
+    # Формируем краткое сообщение для подтверждения (БЕЗ "✅ Заказ оформлен!")
+    if format_type == "private":
+        order_preview = (
+            f"{format_emoji} Формат: {format_name}\n"
+            f"🎮 Игра: {game_name}\n"
+            f"📅 Дата: {date_str}\n"
+            f"⏰ Время: {time_str}\n"
+            f"👥 Участников: {participants_count}\n\n"
+            f"{calculation_text}"
+        )
+    else:
+        order_preview = (
+            f"{format_emoji} Формат: {format_name}\n"
+            f"🎮 Игра: {game_name}\n"
+            f"📅 Дата: {date_str}\n"
+            f"⏰ Время: {time_str}\n"
+            f"⏱️ Продолжительность: {duration_hours:.0f} ч.\n"
+            f"👥 Участников: {participants_count}\n\n"
+            f"{calculation_text}"
+        )
+    
+    # Сохраняем полное итоговое сообщение для отправки после подтверждения
+    if format_type == "private":
+        order_summary = (
+            f"✅ Заказ оформлен!\n"
+            f"{format_emoji} Формат: {format_name}\n"
+            f"🎮 Игра: {game_name}\n"
+            f"📅 Дата: {date_str}\n"
+            f"⏰ Время: {time_str}\n"
+            f"👥 Участников: {participants_count}\n\n"
+            f"{calculation_text}\n\n"
+            f"Пожалуйста, подождите с Вами свяжется администратор для завершения заказа."
+        )
+    else:
+        order_summary = (
+            f"✅ Заказ оформлен!\n"
+            f"{format_emoji} Формат: {format_name}\n"
+            f"🎮 Игра: {game_name}\n"
+            f"📅 Дата: {date_str}\n"
+            f"⏰ Время: {time_str}\n"
+            f"⏱️ Продолжительность: {duration_hours:.0f} ч.\n"
+            f"👥 Участников: {participants_count}\n\n"
+            f"{calculation_text}\n\n"
+            f"Пожалуйста, подождите с Вами свяжется администратор для завершения заказа."
+        )
+    
+    dialog_manager.dialog_data["order_summary"] = order_summary
+    
+    return {
+        "format_emoji": format_emoji,
+        "format_name": format_name,
+        "game_name": game_name,
+        "date": date_str,
+        "time": time_str,
+        "duration": f"{duration_hours:.0f} ч.",
+        "participants": participants_count,
+        "calculation_text": calculation_text,
+        "order_preview": order_preview,
+    }
 
 
 async def on_confirm_order_cancel(c: CallbackQuery, button: Button, manager: DialogManager):
@@ -453,23 +539,61 @@ async def on_confirm_order_yes(c: CallbackQuery, button: Button, manager: Dialog
     """Создание заказа"""
     logger.info(f"[on_confirm_order_yes] Пользователь {c.from_user.id} подтверждает заказ")
     
-    profile_id = manager.dialog_data.get("selected_profile_id")
+    booking = manager.dialog_data.get("booking")
     format_type = manager.dialog_data.get("format_type", "audio")
     game_id = manager.dialog_data.get("selected_game_id")
     order_datetime_str = manager.dialog_data.get("order_datetime")
     duration_hours = manager.dialog_data.get("duration_hours", 1.0)
     participants_count = manager.dialog_data.get("participants_count", 1)
     calculation = manager.dialog_data.get("calculation", {})
-    order_summary = manager.dialog_data.get("order_summary", "")
     
-    if not profile_id or not order_datetime_str:
-        await c.answer("❌ Ошибка: не все данные заполнены", show_alert=True)
+    if not booking or not order_datetime_str:
+        await answer_callback(c, manager, "❌ Ошибка: не все данные заполнены", show_alert=True)
         return
     
-    # Получаем бота из события
-    bot: Bot = manager.event.bot
+    profile_id = booking["profile_id"]
+    idempotency_key = manager.dialog_data.get("idempotency_key") or uuid.uuid4().hex
     
     async with async_session_maker() as session:
+        # Повторное подтверждение того же бронирования - заказ уже создан
+        existing_order = await OrderRepository.get_by_idempotency_key(session, idempotency_key)
+        if existing_order:
+            logger.info(f"[on_confirm_order_yes] Заказ {existing_order.order_number} уже создан, повтор пропущен")
+            await answer_callback(c, manager, f"✅ Заказ {existing_order.order_number} уже создан")
+            await manager.done()
+            return
+        
+        # Единственная проверка анкеты: не изменилась ли она с начала бронирования
+        version = await ProfileRepository.get_version(session, profile_id)
+        if version is None:
+            await answer_callback(c, manager, "❌ Анкета не найдена", show_alert=True)
+            return
+        
+        if version.isoformat() != booking.get("version"):
+            logger.info(f"[on_confirm_order_yes] Анкета {profile_id} изменилась, обновляем снимок")
+            profile = await ProfileRepository.get_by_id(session, profile_id)
+            if not profile:
+                await answer_callback(c, manager, "❌ Анкета не найдена", show_alert=True)
+                return
+            manager.dialog_data["booking"] = _make_booking_snapshot(profile)
+            await answer_callback(
+                c, manager,
+                "⚠️ Данные анкеты изменились. Проверьте стоимость и подтвердите заказ ещё раз.",
+                show_alert=True
+            )
+            # Перерисовываем окно подтверждения с актуальными ценами
+            await manager.switch_to(UserBooking.CONFIRM_ORDER)
+            return
+        
+        # Пока пользователь заполнял заказ, время могли занять
+        conflict_text = await _check_slot(
+            manager, datetime.fromisoformat(order_datetime_str), duration_hours
+        )
+        if conflict_text:
+            await answer_callback(c, manager, conflict_text, show_alert=True)
+            await manager.switch_to(UserBooking.INPUT_TIME)
+            return
+        
         # Получаем или создаем пользователя
         user = await UserRepository.get_or_create(
             session,
@@ -478,19 +602,7 @@ async def on_confirm_order_yes(c: CallbackQuery, button: Button, manager: Dialog
             first_name=c.from_user.first_name
         )
         
-        # Получаем профиль
-        profile = await ProfileRepository.get_by_id(session, profile_id)
-        if not profile:
-            await c.answer("❌ Анкета не найдена", show_alert=True)
-            return
-        
-        # Получаем игру
-        game = None
-        game_name = None
-        if game_id:
-            game = await GameRepository.get_by_id(session, game_id)
-            if game:
-                game_name = game.name
+        game_name = _get_game_name(booking, game_id)
         
         # Парсим дату и время
         order_datetime = datetime.fromisoformat(order_datetime_str)
@@ -512,34 +624,51 @@ async def on_confirm_order_yes(c: CallbackQuery, button: Button, manager: Dialog
             "total_price": calculation.get("total_price", 0),
         }
         
-        order = await OrderRepository.create(session, order_data)
+        # Уведомление админам и итоговое сообщение пользователю пишутся в outbox
+        # в той же транзакции, что и заказ, и отправляются воркером
+        outbox = [{"kind": OUTBOX_NEW_ORDER}]
+        order_summary = manager.dialog_data.get("order_summary", "")
+        if order_summary:
+            outbox.append({
+                "kind": OUTBOX_MESSAGE,
+                "chat_id": c.from_user.id,
+                "text": order_summary,
+                "priority": PRIORITY_INTERACTIVE,
+            })
+        
+        # Индекс слотов - быстрая проверка выше; окончательная - запросом в транзакции заказа
+        order, created = await OrderRepository.create_idempotent(
+            session, order_data, idempotency_key, outbox=outbox, check_slot=True
+        )
+        if order is None:
+            logger.info(f"[on_confirm_order_yes] Время анкеты {profile_id} заняли параллельным заказом")
+            conflict_text = await _check_slot(manager, order_datetime, duration_hours)
+            await answer_callback(
+                c, manager,
+                conflict_text or "❌ Это время уже занято. Выберите другое время.",
+                show_alert=True
+            )
+            await manager.switch_to(UserBooking.INPUT_TIME)
+            return
+        if not created:
+            logger.info(f"[on_confirm_order_yes] Заказ {order.order_number} уже создан параллельным подтверждением")
+            await answer_callback(c, manager, f"✅ Заказ {order.order_number} уже создан")
+            await manager.done()
+            return
         logger.info(f"[on_confirm_order_yes] Заказ создан: {order.order_number}")
         
-        # Отправляем уведомление админу
+        # Заказ уже сохранен - ошибка планирования напоминаний его не отменяет
         try:
-            await send_new_order_notification(bot, order, user, profile, game)
-            logger.info(f"[on_confirm_order_yes] Уведомление админу отправлено")
+            await reminder_service.schedule_order_reminders(session, order)
         except Exception as e:
-            logger.error(f"[on_confirm_order_yes] Ошибка при отправке уведомления админу: {e}")
-        
-        # Сохраняем итоговое сообщение перед закрытием диалога
-        order_summary = manager.dialog_data.get("order_summary", "")
-        
-        await c.answer("✅ Заказ создан!")
-        
-        # Закрываем диалог
-        await manager.done()
-        
-        # Отправляем итоговое сообщение пользователю
-        if order_summary:
-            try:
-                await bot.send_message(
-                    chat_id=c.from_user.id,
-                    text=order_summary
-                )
-                logger.info(f"[on_confirm_order_yes] Итоговое сообщение отправлено пользователю {c.from_user.id}")
-            except Exception as e:
-                logger.error(f"[on_confirm_order_yes] Ошибка при отправке итогового сообщения: {e}")
+            logger.error(f"[on_confirm_order_yes] Не удалось создать напоминания для {order.order_number}: {e}", exc_info=True)
+    
+    outbox_worker.wake()
+    
+    await answer_callback(c, manager, "✅ Заказ создан!")
+    
+    # Закрываем диалог
+    await manager.done()
 
 
 booking_dialog = Dialog(
@@ -572,12 +701,12 @@ booking_dialog = Dialog(
         Group(
             ListGroup(
                 Button(
-                    Format("{item.name}"),
+                    Format("{item[name]}"),
                     id="game_btn",
                     on_click=on_game_select,
                 ),
                 id="games_list",
-                item_id_getter=lambda item: str(item.id),
+                item_id_getter=lambda item: str(item["id"]),
                 items="games",
             ),
             when="has_games",
@@ -592,7 +721,14 @@ booking_dialog = Dialog(
     ),
     
     Window(
-        Const("📅 Укажите дату проведения (пример: 14 июня):"),
+        Const(
+            "📅 Выберите дату в календаре или введите её (пример: 14 июня):\n\n"
+            "½ - есть встречи, ✖ - день занят"
+        ),
+        BookingCalendar(
+            id="booking_calendar",
+            on_click=on_calendar_date_selected,
+        ),
         TextInput(
             id="date_input",
             on_success=on_date_input,
@@ -0,0 +1,302 @@
+"""Диалог личного кабинета пользователя"""
+import logging
+from datetime import datetime
+import pytz
+from aiogram_dialog import Dialog, Window, DialogManager
+from aiogram_dialog.widgets.text import Const, Format
+from aiogram_dialog.widgets.kbd import Button, Column, Row, ListGroup, Group
+from aiogram.types import CallbackQuery
+
+from bot.dialogs.user.states import UserCabinet
+from bot.database.database import async_session_maker
+from bot.database.repositories import OrderRepository, UserRepository
+from bot.utils.formatters import format_payment_status
+from bot.config import TIMEZONE
+
+logger = logging.getLogger(__name__)
+
+# Часовой пояс
+tz = pytz.timezone(TIMEZONE)
+
+# Количество заказов на странице истории
+HISTORY_PAGE_SIZE = 5
+# Количество ближайших встреч на главном экране
+UPCOMING_LIMIT = 5
+
+
+def _local_now() -> datetime:
+    """Текущее время по МСК без tzinfo (в таком виде даты заказов хранятся в БД)"""
+    return datetime.now(tz).replace(tzinfo=None)
+
+
+def _order_item(order) -> dict:
+    """Элемент списка заказов для кнопки"""
+    return {
+        "id": order.id,
+        "title": (
+            f"{order.order_number} · {order.date.strftime('%d.%m %H:%M')} · "
+            f"{format_payment_status(order.payment_status)}"
+        ),
+    }
+
+
+async def _get_cabinet_user_id(dialog_manager: DialogManager):
+    """ID пользователя в БД (кэшируется в dialog_data)"""
+    user_id = dialog_manager.dialog_data.get("cabinet_user_id")
+    if user_id:
+        return user_id
+
+    telegram_id = dialog_manager.event.from_user.id
+    async with async_session_maker() as session:
+        user = await UserRepository.get_by_telegram_id(session, telegram_id)
+    if not user:
+        return None
+
+    dialog_manager.dialog_data["cabinet_user_id"] = user.id
+    return user.id
+
+
+async def get_cabinet_data(dialog_manager: DialogManager, **kwargs):
+    """Получение ближайших встреч пользователя"""
+    user_id = await _get_cabinet_user_id(dialog_manager)
+    if not user_id:
+        return {
+            "orders": [],
+            "has_orders": False,
+            "upcoming_text": "У вас пока нет заказов",
+        }
+
+    async with async_session_maker() as session:
+        orders = await OrderRepository.get_upcoming_by_user(
+            session, user_id, _local_now(), limit=UPCOMING_LIMIT
+        )
+
+    logger.info(f"[get_cabinet_data] Пользователь {user_id}: ближайших встреч {len(orders)}")
+
+    return {
+        "orders": [_order_item(order) for order in orders],
+        "has_orders": len(orders) > 0,
+        "upcoming_text": "Выберите заказ:" if orders else "Запланированных встреч нет",
+    }
+
+
+async def get_history_data(dialog_manager: DialogManager, **kwargs):
+    """Получение страницы истории заказов"""
+    user_id = await _get_cabinet_user_id(dialog_manager)
+    cursors = dialog_manager.dialog_data.get("history_cursors", [])
+
+    if not user_id:
+        return {
+            "orders": [],
+            "has_orders": False,
+            "has_prev": False,
+            "has_next": False,
+            "page": 1,
+            "history_text": "У вас пока нет заказов",
+        }
+
+    before = None
+    if cursors:
+        created_at, order_id = cursors[-1]
+        before = (datetime.fromisoformat(created_at), order_id)
+
+    async with async_session_maker() as session:
+        # Берем на один заказ больше, чтобы узнать, есть ли следующая страница
+        orders = await OrderRepository.get_user_history_page(
+            session, user_id, limit=HISTORY_PAGE_SIZE + 1, before=before
+        )
+
+    has_next = len(orders) > HISTORY_PAGE_SIZE
+    orders = orders[:HISTORY_PAGE_SIZE]
+
+    # Курсор для следующей страницы - последний заказ текущей
+    if orders:
+        last = orders[-1]
+        dialog_manager.dialog_data["history_next_cursor"] = [last.created_at.isoformat(), last.id]
+
+    return {
+        "orders": [_order_item(order) for order in orders],
+        "has_orders": len(orders) > 0,
+        "has_prev": len(cursors) > 0,
+        "has_next": has_next,
+        "page": len(cursors) + 1,
+        "history_text": "Выберите заказ:" if orders else "У вас пока нет заказов",
+    }
+
+
+async def get_order_data(dialog_manager: DialogManager, **kwargs):
+    """Получение деталей заказа пользователя"""
+    order_id = dialog_manager.dialog_data.get("cabinet_order_id")
+    user_id = dialog_manager.dialog_data.get("cabinet_user_id")
+
+    if not order_id or not user_id:
+        return {"order_text": "❌ Заказ не найден"}
+
+    async with async_session_maker() as session:
+        order = await OrderRepository.get_by_id(session, order_id)
+
+    # Пользователь может видеть только свои заказы
+    if not order or order.user_id != user_id:
+        return {"order_text": "❌ Заказ не найден"}
+
+    if order.format_type == "audio":
+        format_text = "🎧 Формат: Аудио-чат"
+    elif order.format_type == "video":
+        format_text = "🎥 Формат: Видео-чат"
+    else:
+        format_text = "💎 Формат: Приватка"
+
+    lines = [
+        f"📄 <b>Заказ {order.order_number}</b>",
+        "",
+        f"🎀 Модель: {order.profile.name if order.profile else 'Не указана'}",
+        format_text,
+        f"🎮 Игра: {order.game_name or 'Не указана'}",
+        f"📅 Дата: {order.date.strftime('%d.%m.%Y')}",
+        f"⏰ Время: {order.date.strftime('%H:%M')}",
+        f"⏱️ Продолжительность: {order.duration_hours:.0f} ч.",
+        f"👥 Участников: {order.participants_count}",
+        f"💰 Сумма: {order.total_price:.0f} ₽",
+        f"💳 Статус оплаты: {format_payment_status(order.payment_status)}",
+    ]
+
+    if order.conference_link:
+        lines.append(f"🔗 Ссылка на встречу: {order.conference_link}")
+    else:
+        lines.append("🔗 Ссылка на встречу появится после подтверждения оплаты")
+
+    return {"order_text": "\n".join(lines)}
+
+
+async def on_cabinet_order_select(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Выбор заказа из списка"""
+    item_id = getattr(manager, 'item_id', None)
+    if item_id is None and c.data:
+        item_id = c.data.split(":")[-1]
+
+    try:
+        order_id = int(item_id)
+    except (TypeError, ValueError):
+        await c.answer("❌ Ошибка: не удалось получить ID заказа", show_alert=True)
+        return
+
+    # Запоминаем, куда возвращаться из деталей заказа
+    current_state = manager.current_context().state
+    manager.dialog_data["cabinet_order_id"] = order_id
+    manager.dialog_data["cabinet_back_to_history"] = current_state == UserCabinet.HISTORY
+    await manager.switch_to(UserCabinet.ORDER)
+
+
+async def on_open_history(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Открытие истории заказов с первой страницы"""
+    manager.dialog_data["history_cursors"] = []
+    await manager.switch_to(UserCabinet.HISTORY)
+
+
+async def on_history_next(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Следующая страница истории"""
+    next_cursor = manager.dialog_data.get("history_next_cursor")
+    if not next_cursor:
+        return
+    cursors = manager.dialog_data.get("history_cursors", [])
+    cursors.append(next_cursor)
+    manager.dialog_data["history_cursors"] = cursors
+
+
+async def on_history_prev(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Предыдущая страница истории"""
+    cursors = manager.dialog_data.get("history_cursors", [])
+    if cursors:
+        cursors.pop()
+    manager.dialog_data["history_cursors"] = cursors
+
+
+async def on_order_back(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Возврат из деталей заказа"""
+    if manager.dialog_data.get("cabinet_back_to_history"):
+        await manager.switch_to(UserCabinet.HISTORY)
+    else:
+        await manager.switch_to(UserCabinet.MAIN)
+
+
+cabinet_dialog = Dialog(
+    Window(
+        Format("👤 <b>Личный кабинет</b>\n\n📅 <b>Ближайшие встречи</b>\n{upcoming_text}"),
+        Group(
+            ListGroup(
+                Button(
+                    Format("{item[title]}"),
+                    id="order_btn",
+                    on_click=on_cabinet_order_select,
+                ),
+                id="upcoming_list",
+                item_id_getter=lambda item: str(item["id"]),
+                items="orders",
+            ),
+            when="has_orders",
+        ),
+        Column(
+            Button(
+                Const("📜 История заказов"),
+                id="history",
+                on_click=on_open_history,
+            ),
+            Button(
+                Const("🔙 Назад"),
+                id="back",
+                on_click=lambda c, b, m: m.done(),
+            ),
+        ),
+        getter=get_cabinet_data,
+        state=UserCabinet.MAIN,
+    ),
+
+    Window(
+        Format("📜 <b>История заказов</b> (стр. {page})\n\n{history_text}"),
+        Group(
+            ListGroup(
+                Button(
+                    Format("{item[title]}"),
+                    id="order_btn",
+                    on_click=on_cabinet_order_select,
+                ),
+                id="history_list",
+                item_id_getter=lambda item: str(item["id"]),
+                items="orders",
+            ),
+            when="has_orders",
+        ),
+        Row(
+            Button(
+                Const("◀️ Новее"),
+                id="prev",
+                on_click=on_history_prev,
+                when="has_prev",
+            ),
+            Button(
+                Const("Старее ▶️"),
+                id="next",
+                on_click=on_history_next,
+                when="has_next",
+            ),
+        ),
+        Button(
+            Const("🔙 Назад"),
+            id="back",
+            on_click=lambda c, b, m: m.switch_to(UserCabinet.MAIN),
+        ),
+        getter=get_history_data,
+        state=UserCabinet.HISTORY,
+    ),
+
+    Window(
+        Format("{order_text}"),
+        Button(
+            Const("🔙 Назад"),
+            id="back",
+            on_click=on_order_back,
+        ),
+        getter=get_order_data,
+        state=UserCabinet.ORDER,
+    ),
+)
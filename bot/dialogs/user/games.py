@@ -0,0 +1,102 @@
+"""Диалог просмотра анкет по играм для пользователя"""
+import logging
+from aiogram_dialog import Dialog, Window, DialogManager, StartMode
+from aiogram_dialog.widgets.text import Const, Format
+from aiogram_dialog.widgets.kbd import Button, ScrollingGroup, ListGroup, Group
+from aiogram.types import CallbackQuery
+
+from bot.dialogs.user.states import UserGames, UserProfiles
+from bot.database.database import async_session_maker
+from bot.services.game_index import game_index
+
+logger = logging.getLogger(__name__)
+
+
+async def get_games_list_data(dialog_manager: DialogManager, **kwargs):
+    """Получение списка игр с количеством анкет из индекса"""
+    if not game_index.loaded:
+        async with async_session_maker() as session:
+            await game_index.ensure_loaded(session)
+
+    games = [
+        {"id": game_id, "name": name, "count": count}
+        for game_id, name, count in game_index.get_games_with_counts()
+    ]
+    logger.info(f"[get_games_list_data] Игр с анкетами: {len(games)}")
+
+    return {
+        "games": games,
+        "has_games": len(games) > 0,
+        "games_text": "Выберите игру:" if games else "❌ Пока нет анкет с играми",
+    }
+
+
+async def on_game_select(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Выбор игры - переход к просмотру анкет этой игры"""
+    item_id = getattr(manager, 'item_id', None)
+
+    if item_id is None:
+        if c.data:
+            parts = c.data.split(":")
+            item_id = parts[-1] if parts else None
+
+    if not item_id:
+        await c.answer("❌ Ошибка: не удалось получить ID игры", show_alert=True)
+        return
+
+    try:
+        game_id = int(item_id)
+    except ValueError:
+        await c.answer("❌ Ошибка: неверный формат ID игры", show_alert=True)
+        return
+
+    profile_ids = game_index.get_profile_ids(game_id)
+    if not profile_ids:
+        await c.answer("❌ Для этой игры пока нет анкет", show_alert=True)
+        return
+
+    logger.info(f"[on_game_select] Пользователь {c.from_user.id} выбрал игру {game_id}, анкет: {len(profile_ids)}")
+
+    # Открываем просмотр анкет сразу на первой анкете выбранной игры
+    await manager.start(
+        UserProfiles.VIEW,
+        mode=StartMode.NORMAL,
+        data={
+            "profile_ids": profile_ids,
+            "current_profile_index": 0,
+            "photo_index": 0,
+            "from_games": True,
+        }
+    )
+
+
+games_dialog = Dialog(
+    Window(
+        Format("🎮 <b>Анкеты по играм</b>\n\n{games_text}"),
+        Group(
+            ScrollingGroup(
+                ListGroup(
+                    Button(
+                        Format("{item[name]} ({item[count]})"),
+                        id="game_btn",
+                        on_click=on_game_select,
+                    ),
+                    id="games_list",
+                    item_id_getter=lambda item: str(item["id"]),
+                    items="games",
+                ),
+                id="games_scroll",
+                width=1,
+                height=10,
+            ),
+            when="has_games",
+        ),
+        Button(
+            Const("🔙 Назад"),
+            id="back",
+            on_click=lambda c, b, m: m.done(),
+        ),
+        getter=get_games_list_data,
+        state=UserGames.LIST,
+    ),
+)
@@ -12,10 +12,27 @@ from aiogram.types import CallbackQuery
 from bot.dialogs.user.states import UserProfiles
 from bot.database.database import async_session_maker
 from bot.database.repositories import ProfileRepository
+from bot.utils.cache import cached_getter
 
 logger = logging.getLogger(__name__)
 
 
+async def on_profiles_start(start_data, dialog_manager: DialogManager):
+    """Обработчик запуска диалога - сохраняем данные из start_data в dialog_data"""
+    if isinstance(start_data, dict):
+        dialog_manager.dialog_data.update(start_data)
+        logger.info(f"[on_profiles_start] Данные из start_data сохранены в dialog_data: {start_data}")
+
+
+async def on_back_from_view(c: CallbackQuery, button: Button, manager: DialogManager):
+    """Возврат из просмотра анкеты"""
+    # При просмотре по играм возвращаемся к списку игр
+    if manager.dialog_data.get("from_games"):
+        await manager.done()
+    else:
+        await manager.switch_to(UserProfiles.LIST)
+
+
 async def get_profiles_list_data(dialog_manager: DialogManager, **kwargs):
     """Получение списка анкет"""
     async with async_session_maker() as session:
@@ -55,6 +72,20 @@ async def on_start_viewing(c: CallbackQuery, button: Button, manager: DialogMana
         await manager.switch_to(UserProfiles.VIEW)
 
 
+def _current_profile_id(manager: DialogManager):
+    """ID анкеты, открытой в просмотре"""
+    profile_ids = manager.dialog_data.get("profile_ids", [])
+    current_index = manager.dialog_data.get("current_profile_index", 0)
+    if 0 <= current_index < len(profile_ids):
+        return profile_ids[current_index]
+    return None
+
+
+@cached_getter(
+    "profile",
+    _current_profile_id,
+    data_keys=("current_profile_index", "photo_index", "profile_ids"),
+)
 async def get_profile_view_data(dialog_manager: DialogManager, **kwargs):
     """Получение данных для просмотра анкеты"""
     profile_ids = dialog_manager.dialog_data.get("profile_ids", [])
@@ -417,11 +448,12 @@ profiles_dialog = Dialog(
             Button(
                 Const("🔙 Назад"),
                 id="back",
-                on_click=lambda c, b, m: m.switch_to(UserProfiles.LIST),
+                on_click=on_back_from_view,
             ),
         ),
         getter=get_profile_view_data,
         state=UserProfiles.VIEW,
     ),
+    on_start=on_profiles_start,
 )
 
@@ -62,17 +62,15 @@ async def on_view_profiles_by_photo(c: CallbackQuery, button: Button, manager: D
 async def on_view_profiles_by_games(c: CallbackQuery, button: Button, manager: DialogManager):
     """Переход к просмотру анкет по играм"""
     logger.info(f"[on_view_profiles_by_games] Пользователь {c.from_user.id} выбрал просмотр по играм")
-    await manager.done()
-    # TODO: Реализовать диалог просмотра анкет по играм
-    await c.answer("Просмотр анкет по играм будет доступен в следующем обновлении")
+    from bot.dialogs.user.states import UserGames
+    await manager.start(UserGames.LIST, mode=StartMode.NORMAL)
 
 
 async def on_open_cabinet(c: CallbackQuery, button: Button, manager: DialogManager):
     """Переход в личный кабинет"""
     logger.info(f"[on_open_cabinet] Пользователь {c.from_user.id} открыл личный кабинет")
-    await manager.done()
-    # TODO: Реализовать диалог личного кабинета
-    await c.answer("Личный кабинет будет доступен в следующем обновлении")
+    from bot.dialogs.user.states import UserCabinet
+    await manager.start(UserCabinet.MAIN, mode=StartMode.NORMAL)
 
 
 start_dialog = Dialog(
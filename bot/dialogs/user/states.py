@@ -25,3 +25,15 @@ class UserBooking(StatesGroup):
     INPUT_PARTICIPANTS = State()  # Ввод количества участников
     CONFIRM_ORDER = State()  # Подтверждение заказа
 
+
+
+class UserGames(StatesGroup):
+    """Состояния для просмотра анкет по играм"""
+    LIST = State()  # Список игр с количеством анкет
+
+
+class UserCabinet(StatesGroup):
+    """Состояния для личного кабинета"""
+    MAIN = State()  # Ближайшие встречи
+    HISTORY = State()  # История заказов (постранично)
+    ORDER = State()  # Детали заказа
@@ -8,6 +8,8 @@ from aiogram.fsm.context import FSMContext
 
 from bot.filters.admin import AdminFilter
 from bot.dialogs.admin.states import AdminMenu
+from bot.database.database import async_session_maker
+from bot.services import stats as order_stats
 
 logger = logging.getLogger(__name__)
 router = Router(name="admin")
@@ -41,3 +43,14 @@ async def cmd_admin(message: Message, dialog_manager: DialogManager, state: FSMC
     )
     logger.info("[cmd_admin] Админ-панель запущена")
 
+
+@router.message(Command("rebuild_stats"), AdminFilter())
+async def cmd_rebuild_stats(message: Message):
+    """Команда для пересчета сводной статистики заказов"""
+    logger.info(f"[cmd_rebuild_stats] Пересчет статистики запущен пользователем {message.from_user.id}")
+    await message.answer("⏳ Пересчитываю статистику...")
+    
+    async with async_session_maker() as session:
+        processed = await order_stats.rebuild(session)
+    
+    await message.answer(f"✅ Статистика пересчитана. Обработано заказов: {processed}")
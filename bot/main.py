@@ -10,14 +10,21 @@ project_root = Path(__file__).parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
+from aiohttp import web
 from aiogram import Bot, Dispatcher, Router
 from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
 from aiogram.enums import ParseMode
 from aiogram.filters import Command
 from aiogram.types import Message, CallbackQuery
 from aiogram.fsm.storage.memory import MemoryStorage
 
-from bot.config import BOT_TOKEN
+from bot.config import (
+    BOT_TOKEN, BOT_MODE, TELEGRAM_API_URL,
+    WEBHOOK_BASE_URL, WEBHOOK_PATH, WEBHOOK_SECRET, WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_MAX_CONNECTIONS,
+)
 from bot.handlers import admin as admin_handlers
 from bot.dialogs.admin import get_admin_dialogs
 from bot.dialogs.user import get_user_dialogs
@@ -29,9 +36,13 @@ from aiogram.filters import BaseFilter
 from bot.database.database import init_db, close_db, async_session_maker
 from bot.dialogs.admin.states import AdminMenu
 from bot.dialogs.user.states import UserStart
-
-# Закомментированные импорты для будущего использования
-# from bot.services.reminders import ReminderService
+from bot.services.game_index import game_index
+from bot.services.slots import slot_index
+from bot.services.outbound import outbound
+from bot.services.outbox import outbox_worker
+from bot.services.broadcast import broadcast_runner
+from bot.services.reminders import reminder_service
+from bot.middlewares import CallbackDedupMiddleware, AckFirstCallbackMiddleware
 
 # Настройка логирования
 logging.basicConfig(
@@ -126,11 +137,61 @@ async def on_unknown_intent(event: ErrorEvent, dialog_manager: DialogManager):
         logger.warning("[on_unknown_intent] Не удалось получить информацию о пользователе")
 
 
+async def run_webhook(bot: Bot, dp: Dispatcher, allowed_updates: list):
+    """
+    Получение обновлений через webhook на встроенном aiohttp-сервере
+    
+    Запрос без верного секрета получает 401. Обновление обрабатывается в
+    фоновой задаче, Telegram сразу получает 200.
+    
+    Рассчитано на один процесс: состояние диалогов (MemoryStorage), индексы
+    слотов и кэши живут в памяти процесса, outbox и рассылки не захватывают
+    строки, поэтому несколько экземпляров за балансировщиком не поддерживаются.
+    """
+    if not WEBHOOK_BASE_URL:
+        raise ValueError("WEBHOOK_BASE_URL не установлен в конфигурации")
+    if not WEBHOOK_SECRET:
+        raise ValueError("WEBHOOK_SECRET не установлен в конфигурации")
+    
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        handle_in_background=True,
+        secret_token=WEBHOOK_SECRET,
+    ).register(app, path=WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+    
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host=WEBHOOK_HOST, port=WEBHOOK_PORT).start()
+    logger.info(f"[run_webhook] Сервер webhook слушает {WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+    
+    try:
+        await bot.set_webhook(
+            url=f"{WEBHOOK_BASE_URL}{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET,
+            allowed_updates=allowed_updates,
+            max_connections=WEBHOOK_MAX_CONNECTIONS,
+        )
+        logger.info(f"[run_webhook] Webhook установлен: {WEBHOOK_BASE_URL}{WEBHOOK_PATH}")
+        # Сервер работает до отмены задачи (Ctrl+C, SIGTERM)
+        await asyncio.Event().wait()
+    finally:
+        # Webhook не удаляется: Telegram подождет с обновлениями до перезапуска
+        await runner.cleanup()
+
+
 async def main():
     """Основная функция запуска бота"""
     # Инициализация бота и диспетчера
+    session = None
+    if TELEGRAM_API_URL:
+        # Локальный сервер Bot API или тестовая заглушка
+        session = AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_URL))
     bot = Bot(
         token=BOT_TOKEN,
+        session=session,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML)
     )
     storage = MemoryStorage()
@@ -140,6 +201,20 @@ async def main():
     await init_db()
     logger.info("База данных инициализирована")
     
+    # Прогрев индексов: игра → анкеты и занятые интервалы анкет
+    async with async_session_maker() as session:
+        await game_index.ensure_loaded(session)
+        await slot_index.ensure_loaded(session)
+    logger.info("Индексы анкет по играм и занятых слотов загружены")
+    
+    # Защита кнопок записи от повторных нажатий (до обработки диалогами)
+    dp.callback_query.outer_middleware(CallbackDedupMiddleware())
+    logger.info("Middleware защиты от повторных нажатий зарегистрирован")
+    
+    # Немедленный ответ на callback для кнопок с долгой обработкой
+    dp.callback_query.outer_middleware(AckFirstCallbackMiddleware())
+    logger.info("Middleware немедленного ответа на callback зарегистрирован")
+    
     # Регистрация роутера с командой /start
     dp.include_router(router)
     logger.info("Базовые хендлеры зарегистрированы")
@@ -170,19 +245,37 @@ async def main():
     )
     logger.info("Обработчик UnknownIntent зарегистрирован")
     
-    # Закомментированная инициализация для будущего использования
-    # reminder_service = ReminderService(bot)
-    # async with async_session_maker() as session:
-    #     await reminder_service.initialize(session)
-    # logger.info("ReminderService инициализирован")
+    # Очередь исходящих сообщений с ограничением скорости (общий лимит и лимиты чатов)
+    outbound.start(bot)
+    
+    # Доставка уведомлений из outbox (в том числе оставшихся с прошлого запуска)
+    outbox_worker.start(bot)
+    
+    # Продолжение рассылок, прерванных остановкой бота
+    await broadcast_runner.start(bot)
+    
+    # Диспетчер напоминаний: ближайшее окно задач из БД
+    await reminder_service.start(bot)
+    logger.info("ReminderService инициализирован")
+    
+    # Только типы обновлений, для которых есть обработчики
+    # (aiogd_update - внутреннее событие aiogram-dialog, не тип обновления Telegram)
+    allowed_updates = dp.resolve_used_update_types(skip_events={"aiogd_update"})
     
     try:
-        logger.info("Бот запущен")
-        await dp.start_polling(bot)
+        if BOT_MODE == "webhook":
+            logger.info(f"Бот запущен (webhook), обновления: {', '.join(allowed_updates)}")
+            await run_webhook(bot, dp, allowed_updates)
+        else:
+            logger.info(f"Бот запущен (polling), обновления: {', '.join(allowed_updates)}")
+            # Webhook, оставшийся от запуска в режиме webhook, мешает getUpdates
+            await bot.delete_webhook()
+            await dp.start_polling(bot, allowed_updates=allowed_updates)
     finally:
-        # Закомментированная очистка для будущего использования
-        # if reminder_service:
-        #     reminder_service.shutdown()
+        reminder_service.shutdown()
+        await broadcast_runner.stop()
+        await outbox_worker.stop()
+        await outbound.stop()
         await close_db()
         await bot.session.close()
 
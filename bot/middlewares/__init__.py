@@ -0,0 +1,5 @@
+"""Middleware бота"""
+from bot.middlewares.dedup import CallbackDedupMiddleware
+from bot.middlewares.ack import AckFirstCallbackMiddleware
+
+__all__ = ["CallbackDedupMiddleware", "AckFirstCallbackMiddleware"]
@@ -0,0 +1,59 @@
+"""Немедленный ответ на callback для медленных обработчиков"""
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from aiogram import BaseMiddleware
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import CallbackQuery
+
+from bot.middlewares.dedup import parse_dialog_callback
+
+logger = logging.getLogger(__name__)
+
+# Кнопки с долгой обработкой (БД + уведомления) и всплывающий текст для них.
+# None - ответить без текста, только убрать "часики".
+ACK_FIRST_WIDGETS: Dict[str, Optional[str]] = {
+    "confirm": "⏳ Оформляем заказ...",
+    "confirm_cancel": "⏳ Отменяем заказ...",
+    "not_paid": None,
+    "processing": None,
+    "paid": None,
+    "bulk_paid": "⏳ Меняем статус...",
+    "bulk_processing": "⏳ Меняем статус...",
+    "bulk_cancel_confirm": "⏳ Отменяем заказы...",
+}
+
+
+class AckFirstCallbackMiddleware(BaseMiddleware):
+    """
+    Отвечает на callback до запуска обработчика
+
+    Telegram перестает показывать "часики" сразу, а не после работы с БД и
+    отправки уведомлений. В данные обработчика передается callback_answered=True,
+    поэтому ответы обработчика нужно отправлять через bot.utils.callbacks.answer_callback.
+    """
+
+    def __init__(self, widgets: Optional[Dict[str, Optional[str]]] = None):
+        self.widgets = ACK_FIRST_WIDGETS if widgets is None else widgets
+
+    async def __call__(
+        self,
+        handler: Callable[[CallbackQuery, Dict[str, Any]], Awaitable[Any]],
+        event: CallbackQuery,
+        data: Dict[str, Any]
+    ) -> Any:
+        if not event.data:
+            return await handler(event, data)
+
+        _, widget_id = parse_dialog_callback(event.data)
+        if widget_id not in self.widgets:
+            return await handler(event, data)
+
+        try:
+            await event.answer(self.widgets[widget_id])
+            data["callback_answered"] = True
+        except TelegramBadRequest as e:
+            # Запрос устарел - обработчик все равно выполняем
+            logger.warning(f"[AckFirstCallbackMiddleware] Не удалось ответить на callback {widget_id}: {e}")
+
+        return await handler(event, data)
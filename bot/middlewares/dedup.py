@@ -0,0 +1,91 @@
+"""Защита кнопок записи от повторных нажатий"""
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery
+
+logger = logging.getLogger(__name__)
+
+# Разделитель intent_id и данных виджета в callback_data aiogram-dialog
+CALLBACK_SEPARATOR = "\x1d"
+
+# Кнопки, которые пишут в БД или отправляют уведомления
+WRITE_WIDGETS = {
+    "confirm",          # подтверждение заказа пользователем (on_confirm_order_yes)
+    "not_paid",         # статусы оплаты в админке
+    "processing",
+    "paid",
+    "confirm_cancel",   # отмена заказа в админке
+    "bulk_paid",        # массовые операции с заказами в админке
+    "bulk_processing",
+    "bulk_cancel_confirm",
+    "dead_letters_replay",          # недоставленные сообщения в админке
+    "dead_letters_clear_confirm",
+}
+
+# Сколько секунд после завершения обработки повторное нажатие считается дублем
+DEFAULT_WINDOW = 2.0
+
+
+def parse_dialog_callback(data: str) -> Tuple[Optional[str], str]:
+    """Разбор callback_data aiogram-dialog на (intent_id, id виджета)"""
+    if CALLBACK_SEPARATOR not in data:
+        return None, data.split(":")[0]
+    intent_id, widget_data = data.split(CALLBACK_SEPARATOR, maxsplit=1)
+    return intent_id, widget_data.split(":")[0]
+
+
+class CallbackDedupMiddleware(BaseMiddleware):
+    """
+    Отбрасывает повторные нажатия кнопок записи
+
+    Ключ - (пользователь, intent диалога, callback_data виджета). Пока нажатие
+    обрабатывается, такие же нажатия отбрасываются; после завершения повторы
+    отбрасываются еще window секунд.
+    """
+
+    def __init__(self, widget_ids: Iterable[str] = WRITE_WIDGETS, window: float = DEFAULT_WINDOW):
+        self.widget_ids = set(widget_ids)
+        self.window = window
+        self._in_flight: Set[Tuple[int, str]] = set()
+        self._completed: Dict[Tuple[int, str], float] = {}
+
+    def _cleanup(self, now: float):
+        """Удаление устаревших завершенных ключей"""
+        expired = [key for key, finished in self._completed.items() if now - finished > self.window]
+        for key in expired:
+            del self._completed[key]
+
+    async def __call__(
+        self,
+        handler: Callable[[CallbackQuery, Dict[str, Any]], Awaitable[Any]],
+        event: CallbackQuery,
+        data: Dict[str, Any]
+    ) -> Any:
+        if not event.data or not event.from_user:
+            return await handler(event, data)
+
+        intent_id, widget_id = parse_dialog_callback(event.data)
+        if widget_id not in self.widget_ids:
+            return await handler(event, data)
+
+        key = (event.from_user.id, event.data)
+        now = time.monotonic()
+        self._cleanup(now)
+
+        if key in self._in_flight or key in self._completed:
+            logger.info(
+                f"[CallbackDedupMiddleware] Повторное нажатие {widget_id} "
+                f"от пользователя {event.from_user.id} (intent {intent_id}) отброшено"
+            )
+            await event.answer("⏳ Уже обрабатывается")
+            return None
+
+        self._in_flight.add(key)
+        try:
+            return await handler(event, data)
+        finally:
+            self._in_flight.discard(key)
+            self._completed[key] = time.monotonic()
@@ -0,0 +1,106 @@
+"""Занятость анкет по дням месяца для календаря бронирования"""
+import calendar
+import logging
+from datetime import date, datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.config import BOOKING_DAY_HOURS
+from bot.database.models import Order
+
+logger = logging.getLogger(__name__)
+
+# Статусы дня
+DAY_FREE = "free"
+DAY_PARTIAL = "partial"
+DAY_FULL = "full"
+
+
+def _month_bounds(year: int, month: int) -> Tuple[datetime, datetime]:
+    """Первый день месяца и первый день следующего месяца"""
+    start = datetime(year, month, 1)
+    if month == 12:
+        return start, datetime(year + 1, 1, 1)
+    return start, datetime(year, month + 1, 1)
+
+
+class MonthAvailability:
+    """
+    Кэш занятости анкет по месяцам
+
+    Для (анкета, месяц) хранится массив часов встреч по дням месяца, который
+    строится одним сгруппированным запросом по заказам. Кэш анкеты
+    сбрасывается при любом изменении ее заказов.
+    """
+
+    def __init__(self):
+        # profile_id -> (год, месяц) -> часы встреч по дням (индекс = день - 1)
+        self._cache: Dict[int, Dict[Tuple[int, int], List[float]]] = {}
+
+    async def get_booked_hours(
+        self,
+        session: AsyncSession,
+        profile_id: int,
+        year: int,
+        month: int
+    ) -> List[float]:
+        """Часы встреч анкеты по дням месяца"""
+        profile_months = self._cache.setdefault(profile_id, {})
+        hours = profile_months.get((year, month))
+        if hours is not None:
+            return hours
+
+        start, end = _month_bounds(year, month)
+        day_column = func.date(Order.date)
+        result = await session.execute(
+            select(day_column, func.sum(Order.duration_hours))
+            .where(Order.profile_id == profile_id)
+            .where(Order.date >= start)
+            .where(Order.date < end)
+            .group_by(day_column)
+        )
+
+        hours = [0.0] * calendar.monthrange(year, month)[1]
+        for day, total in result.all():
+            # SQLite возвращает дату строкой, другие СУБД - объектом date
+            if isinstance(day, str):
+                day = date.fromisoformat(day)
+            hours[day.day - 1] = float(total or 0)
+
+        profile_months[(year, month)] = hours
+        logger.info(f"[MonthAvailability.get_booked_hours] Анкета {profile_id}: занятость за {month:02d}.{year} загружена")
+        return hours
+
+    async def get_day_statuses(
+        self,
+        session: AsyncSession,
+        profile_id: int,
+        year: int,
+        month: int
+    ) -> Dict[str, str]:
+        """Статусы дней месяца: {дата в ISO: free/partial/full}"""
+        hours = await self.get_booked_hours(session, profile_id, year, month)
+        statuses = {}
+        for index, booked in enumerate(hours):
+            if booked >= BOOKING_DAY_HOURS:
+                status = DAY_FULL
+            elif booked > 0:
+                status = DAY_PARTIAL
+            else:
+                status = DAY_FREE
+            statuses[date(year, month, index + 1).isoformat()] = status
+        return statuses
+
+    def invalidate(self, profile_id: int):
+        """Сбросить кэш анкеты (после создания, переноса или отмены заказа)"""
+        self._cache.pop(profile_id, None)
+
+    def clear(self):
+        """Сбросить весь кэш"""
+        self._cache = {}
+
+
+# Общий экземпляр кэша для всего процесса
+month_availability = MonthAvailability()
@@ -0,0 +1,193 @@
+"""Рассылка сообщений всем пользователям"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from sqlalchemy import update
+
+from bot.database.database import async_session_maker
+from bot.database.models import Broadcast, DeadLetter
+from bot.database.repositories import BroadcastRepository, UserRepository
+from bot.services.delivery import (
+    classify_error, retry_after_delay, DELIVERY_MAX_ATTEMPTS, ERROR_PERMANENT,
+)
+from bot.services.outbound import outbound, PRIORITY_BULK
+
+logger = logging.getLogger(__name__)
+
+# Получателей в одной пачке (курсор сохраняется после каждой пачки,
+# после перезапуска повторно может получить сообщение не больше пачки)
+BROADCAST_BATCH_SIZE = 20
+
+BROADCAST_RUNNING = "running"
+BROADCAST_PAUSED = "paused"
+BROADCAST_DONE = "done"
+
+# Тип недоставленного сообщения рассылки в dead_letters
+DEAD_LETTER_KIND = "broadcast"
+
+
+def is_chat_unavailable(error: Exception) -> bool:
+    """Бот заблокирован, аккаунт удален или чат не существует"""
+    if isinstance(error, TelegramForbiddenError):
+        return True
+    return isinstance(error, TelegramBadRequest) and "chat not found" in str(error).lower()
+
+
+class BroadcastRunner:
+    """
+    Выполнение рассылок
+
+    Получатели читаются пачками по users.id (keyset), сообщения идут через
+    очередь исходящих сообщений с низким приоритетом. Временные ошибки
+    повторяются с задержкой. После каждой пачки в одной транзакции
+    сохраняются курсор, счетчики, отметки заблокировавших бота пользователей
+    и недоставленные после повторов сообщения (dead_letters - админ может
+    повторить их из админки), поэтому после перезапуска
+    рассылка продолжается с курсора (повторно может получить сообщение не
+    больше одной пачки).
+    """
+
+    def __init__(self, batch_size: int = BROADCAST_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._bot: Optional[Bot] = None
+        self._tasks: Dict[int, asyncio.Task] = {}
+        # Время запуска в этом процессе и сколько было отправлено к нему - для скорости
+        self._started: Dict[int, tuple] = {}
+
+    async def start(self, bot: Bot):
+        """Запомнить бота и продолжить рассылки, прерванные остановкой"""
+        self._bot = bot
+        async with async_session_maker() as session:
+            running_ids = await BroadcastRepository.get_running_ids(session)
+        for broadcast_id in running_ids:
+            logger.info(f"[BroadcastRunner.start] Продолжаем рассылку {broadcast_id}")
+            self.launch(broadcast_id)
+
+    async def stop(self):
+        """Остановить выполнение (статус в БД остается running - продолжится при запуске)"""
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+
+    def launch(self, broadcast_id: int):
+        """Запустить выполнение рассылки в фоне"""
+        task = self._tasks.get(broadcast_id)
+        if task is not None and not task.done():
+            return
+        self._tasks[broadcast_id] = asyncio.create_task(self._run(broadcast_id))
+
+    def is_active(self, broadcast_id: int) -> bool:
+        task = self._tasks.get(broadcast_id)
+        return task is not None and not task.done()
+
+    def throughput(self, broadcast: Broadcast) -> Optional[float]:
+        """Скорость рассылки в этом процессе, сообщений в секунду"""
+        started = self._started.get(broadcast.id)
+        if not started:
+            return None
+        started_at, sent_before = started
+        elapsed = time.monotonic() - started_at
+        return (broadcast.sent_count - sent_before) / elapsed if elapsed > 0 else None
+
+    async def _send(self, telegram_id: int, text: str) -> Tuple[Optional[Exception], int]:
+        """
+        Отправить сообщение получателю, повторяя временные ошибки
+        
+        Returns:
+            (последняя ошибка или None, количество попыток)
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                await outbound.send_message(self._bot, telegram_id, text, priority=PRIORITY_BULK)
+                return None, attempt
+            except Exception as e:
+                if classify_error(e) == ERROR_PERMANENT or attempt >= DELIVERY_MAX_ATTEMPTS:
+                    return e, attempt
+                await asyncio.sleep(retry_after_delay(e, attempt))
+    
+    async def _run(self, broadcast_id: int):
+        try:
+            async with async_session_maker() as session:
+                broadcast = await BroadcastRepository.get_by_id(session, broadcast_id)
+                if not broadcast or broadcast.status != BROADCAST_RUNNING:
+                    return
+                self._started[broadcast_id] = (time.monotonic(), broadcast.sent_count)
+
+                while True:
+                    # Статус мог изменить админ (пауза)
+                    await session.refresh(broadcast)
+                    if broadcast.status != BROADCAST_RUNNING:
+                        logger.info(f"[BroadcastRunner._run] Рассылка {broadcast_id} остановлена")
+                        return
+
+                    recipients = await UserRepository.get_recipients_page(
+                        session, broadcast.last_user_id, self.batch_size
+                    )
+                    if not recipients:
+                        broadcast.status = BROADCAST_DONE
+                        broadcast.finished_at = datetime.utcnow()
+                        await session.commit()
+                        rate = self.throughput(broadcast)
+                        logger.info(
+                            f"[BroadcastRunner._run] Рассылка {broadcast_id} завершена: "
+                            f"отправлено {broadcast.sent_count}, ошибок {broadcast.failed_count}, "
+                            f"заблокировали бота {broadcast.blocked_count}"
+                            + (f", {rate:.1f} сообщ./с" if rate else "")
+                        )
+                        return
+
+                    results = await asyncio.gather(
+                        *(self._send(telegram_id, broadcast.text) for _, telegram_id in recipients),
+                        return_exceptions=True
+                    )
+
+                    blocked_ids = []
+                    sent = failed = 0
+                    for (user_id, telegram_id), result in zip(recipients, results):
+                        error, attempts = result if isinstance(result, tuple) else (result, 1)
+                        if error is None:
+                            sent += 1
+                        elif is_chat_unavailable(error):
+                            blocked_ids.append(user_id)
+                        else:
+                            failed += 1
+                            logger.warning(f"[BroadcastRunner._run] Не отправлено пользователю {telegram_id}: {error}")
+                            # В той же транзакции, что и курсор: админ сможет повторить из админки
+                            session.add(DeadLetter(
+                                kind=DEAD_LETTER_KIND,
+                                chat_id=str(telegram_id),
+                                text=broadcast.text,
+                                error_class=classify_error(error),
+                                error=str(error)[:1000],
+                                attempts=attempts,
+                            ))
+
+                    # Курсор, счетчики и отметки блокировки - одной транзакцией
+                    await UserRepository.mark_blocked(session, blocked_ids)
+                    await session.execute(
+                        update(Broadcast)
+                        .where(Broadcast.id == broadcast_id)
+                        .values(
+                            last_user_id=recipients[-1][0],
+                            sent_count=Broadcast.sent_count + sent,
+                            failed_count=Broadcast.failed_count + failed,
+                            blocked_count=Broadcast.blocked_count + len(blocked_ids),
+                        )
+                    )
+                    await session.commit()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[BroadcastRunner._run] Ошибка рассылки {broadcast_id}: {e}", exc_info=True)
+
+
+# Общий экземпляр для всего процесса
+broadcast_runner = BroadcastRunner()
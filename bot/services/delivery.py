@@ -0,0 +1,140 @@
+"""Доставка сообщений с повторами и записью недоставленных"""
+import asyncio
+import logging
+import random
+from typing import Optional, Union
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramAPIError, TelegramBadRequest, TelegramEntityTooLarge, TelegramForbiddenError,
+    TelegramNetworkError, TelegramNotFound, TelegramRetryAfter, TelegramServerError,
+    TelegramUnauthorizedError,
+)
+from aiogram.types import Message
+
+from bot.database.database import async_session_maker
+from bot.database.repositories import DeadLetterRepository
+from bot.services.outbound import outbound, PRIORITY_NOTIFY
+
+logger = logging.getLogger(__name__)
+
+ERROR_RETRYABLE = "retryable"        # сеть, 5xx Telegram - повторить с задержкой
+ERROR_RATE_LIMITED = "rate_limited"  # 429 - повторить через retry_after
+ERROR_PERMANENT = "permanent"        # бот заблокирован, неверный запрос - не повторять
+
+# Попыток доставки до записи в недоставленные
+DELIVERY_MAX_ATTEMPTS = 4
+# Экспоненциальная задержка с полным джиттером: случайно от 0 до min(cap, base * 2^n)
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+
+def classify_error(error: BaseException) -> str:
+    """Класс ошибки отправки"""
+    if isinstance(error, TelegramRetryAfter):
+        return ERROR_RATE_LIMITED
+    # TelegramEntityTooLarge наследуется от сетевой ошибки, но повтор не поможет
+    if isinstance(error, (
+        TelegramEntityTooLarge, TelegramForbiddenError, TelegramBadRequest,
+        TelegramNotFound, TelegramUnauthorizedError,
+    )):
+        return ERROR_PERMANENT
+    if isinstance(error, (TelegramNetworkError, TelegramServerError, asyncio.TimeoutError, OSError)):
+        return ERROR_RETRYABLE
+    if isinstance(error, TelegramAPIError):
+        # Неизвестный ответ Telegram - скорее временный
+        return ERROR_RETRYABLE
+    return ERROR_PERMANENT
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """Задержка перед попыткой номер attempt + 1 (attempt >= 1)"""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def retry_after_delay(error: BaseException, attempt: int) -> float:
+    """Задержка перед повтором с учетом класса ошибки"""
+    if isinstance(error, TelegramRetryAfter):
+        return float(error.retry_after)
+    return backoff_delay(attempt)
+
+
+async def save_dead_letter(
+    kind: str,
+    chat_id: Union[int, str],
+    text: str,
+    error: BaseException,
+    attempts: int,
+    order_id: Optional[int] = None
+):
+    """Записать недоставленное сообщение"""
+    try:
+        async with async_session_maker() as session:
+            await DeadLetterRepository.add(session, {
+                "kind": kind,
+                "chat_id": str(chat_id),
+                "text": text,
+                "order_id": order_id,
+                "error_class": classify_error(error),
+                "error": str(error)[:1000],
+                "attempts": attempts,
+            })
+    except Exception as e:
+        logger.error(f"[save_dead_letter] Не удалось записать недоставленное сообщение ({kind}, {chat_id}): {e}", exc_info=True)
+
+
+async def deliver(
+    bot: Bot,
+    chat_id: Union[int, str],
+    text: str,
+    kind: str,
+    order_id: Optional[int] = None,
+    priority: int = PRIORITY_NOTIFY,
+    max_attempts: int = DELIVERY_MAX_ATTEMPTS
+) -> Optional[Message]:
+    """
+    Отправить сообщение с повторами
+
+    Временные ошибки повторяются с экспоненциальной задержкой и джиттером,
+    RetryAfter - через указанное Telegram время, постоянные не повторяются.
+    Если доставить не удалось, сообщение записывается в dead_letters, откуда
+    админ может отправить его повторно.
+
+    Returns:
+        Отправленное сообщение или None
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return await outbound.send_message(bot, chat_id, text, priority=priority)
+        except Exception as e:
+            error_class = classify_error(e)
+            if error_class == ERROR_PERMANENT or attempt >= max_attempts:
+                logger.warning(f"[deliver] {kind} в чат {chat_id} не доставлено ({error_class}, попыток {attempt}): {e}")
+                await save_dead_letter(kind, chat_id, text, e, attempt, order_id)
+                return None
+            delay = retry_after_delay(e, attempt)
+            logger.info(f"[deliver] {kind} в чат {chat_id}: {error_class}, повтор через {delay:.1f} с")
+            await asyncio.sleep(delay)
+
+
+async def replay_dead_letters(bot: Bot, limit: int = 500) -> int:
+    """
+    Повторить пачку недоставленных сообщений
+
+    Сообщения отмечаются повторенными сразу; повторная неудача запишет новую строку.
+
+    Returns:
+        Количество доставленных сообщений
+    """
+    async with async_session_maker() as session:
+        dead_letters = await DeadLetterRepository.claim_for_replay(session, limit)
+
+    results = await asyncio.gather(*(
+        deliver(bot, item.chat_id, item.text, item.kind, item.order_id)
+        for item in dead_letters
+    ))
+    delivered = sum(1 for result in results if result is not None)
+    logger.info(f"[replay_dead_letters] Повторно доставлено: {delivered} из {len(dead_letters)}")
+    return delivered
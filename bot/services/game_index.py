@@ -0,0 +1,140 @@
+"""Инвертированный индекс игра → анкеты для просмотра анкет по играм"""
+import asyncio
+import bisect
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.database.models import Game, ProfileGame
+
+logger = logging.getLogger(__name__)
+
+
+class GameProfileIndex:
+    """
+    Индекс в памяти: game_id -> отсортированный список profile_id
+
+    Загружается из БД один раз (два лёгких запроса без join'ов и eager-load),
+    дальше поддерживается инкрементально из репозиториев при add_game/remove_game,
+    удалении анкет и изменении игр.
+    """
+
+    def __init__(self):
+        self._profiles_by_game: Dict[int, List[int]] = {}
+        self._game_names: Dict[int, str] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    async def ensure_loaded(self, session: AsyncSession):
+        """Загрузить индекс из БД, если он ещё не загружен"""
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            await self._load(session)
+
+    async def _load(self, session: AsyncSession):
+        """Полная загрузка индекса из БД"""
+        games_result = await session.execute(select(Game.id, Game.name))
+        game_names = {game_id: name for game_id, name in games_result.all()}
+
+        links_result = await session.execute(
+            select(ProfileGame.game_id, ProfileGame.profile_id)
+        )
+        profiles_by_game: Dict[int, set] = {}
+        for game_id, profile_id in links_result.all():
+            profiles_by_game.setdefault(game_id, set()).add(profile_id)
+
+        self._game_names = game_names
+        self._profiles_by_game = {
+            game_id: sorted(profile_ids)
+            for game_id, profile_ids in profiles_by_game.items()
+        }
+        self._loaded = True
+        logger.info(
+            f"[GameProfileIndex._load] Индекс загружен: игр {len(self._game_names)}, "
+            f"связей {sum(len(ids) for ids in self._profiles_by_game.values())}"
+        )
+
+    def invalidate(self):
+        """Сбросить индекс (будет перезагружен при следующем обращении)"""
+        self._loaded = False
+        self._profiles_by_game = {}
+        self._game_names = {}
+
+    # Чтение
+
+    def get_profile_ids(self, game_id: int) -> List[int]:
+        """Отсортированный список ID анкет для игры"""
+        return list(self._profiles_by_game.get(game_id, ()))
+
+    def get_count(self, game_id: int) -> int:
+        """Количество анкет для игры"""
+        return len(self._profiles_by_game.get(game_id, ()))
+
+    def get_game_name(self, game_id: int) -> Optional[str]:
+        """Название игры"""
+        return self._game_names.get(game_id)
+
+    def get_games_with_counts(self) -> List[Tuple[int, str, int]]:
+        """Список (game_id, название, количество анкет) для игр, у которых есть анкеты"""
+        games = [
+            (game_id, self._game_names.get(game_id, ""), len(profile_ids))
+            for game_id, profile_ids in self._profiles_by_game.items()
+            if profile_ids
+        ]
+        games.sort(key=lambda item: item[1].lower())
+        return games
+
+    # Инкрементальные обновления (вызываются после успешного commit)
+
+    def add(self, game_id: int, profile_id: int):
+        """Добавить связь игра-анкета"""
+        if not self._loaded:
+            return
+        profile_ids = self._profiles_by_game.setdefault(game_id, [])
+        position = bisect.bisect_left(profile_ids, profile_id)
+        if position == len(profile_ids) or profile_ids[position] != profile_id:
+            profile_ids.insert(position, profile_id)
+
+    def remove(self, game_id: int, profile_id: int):
+        """Удалить связь игра-анкета"""
+        if not self._loaded:
+            return
+        profile_ids = self._profiles_by_game.get(game_id)
+        if not profile_ids:
+            return
+        position = bisect.bisect_left(profile_ids, profile_id)
+        if position < len(profile_ids) and profile_ids[position] == profile_id:
+            del profile_ids[position]
+
+    def remove_profile(self, profile_id: int):
+        """Удалить анкету из всех игр"""
+        if not self._loaded:
+            return
+        for game_id in list(self._profiles_by_game):
+            self.remove(game_id, profile_id)
+
+    def set_game(self, game_id: int, name: str):
+        """Добавить или переименовать игру"""
+        if not self._loaded:
+            return
+        self._game_names[game_id] = name
+
+    def remove_game(self, game_id: int):
+        """Удалить игру из индекса"""
+        if not self._loaded:
+            return
+        self._game_names.pop(game_id, None)
+        self._profiles_by_game.pop(game_id, None)
+
+
+# Общий экземпляр индекса для всего процесса
+game_index = GameProfileIndex()
@@ -1,6 +1,6 @@
 """Сервис для отправки уведомлений администратору"""
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from aiogram import Bot
 from aiogram.types import Message
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,31 +9,15 @@ from bot.config import ORDERS_CHAT_ID
 from bot.database.models import Order, User, Profile, Game
 from bot.database.repositories import OrderRepository
 from bot.services.payment import format_price_calculation
+from bot.services.outbound import outbound
 
 
-async def send_new_order_notification(
-    bot: Bot,
+def format_new_order_text(
     order: Order,
     user: User,
-    profile: Profile,
     game: Optional[Game] = None
-) -> Message:
-    """
-    Отправка уведомления админу о новом заказе
-    
-    Args:
-        bot: Экземпляр бота
-        order: Заказ
-        user: Пользователь
-        profile: Анкета
-        game: Игра (опционально)
-    
-    Returns:
-        Отправленное сообщение
-    """
-    if not ORDERS_CHAT_ID:
-        raise ValueError("ORDERS_CHAT_ID не установлен в конфигурации")
-    
+) -> str:
+    """Текст уведомления админу о новом заказе"""
     username = f"@{user.username}" if user.username else "Не указан"
     
     format_emoji = "🎧" if order.format_type == "audio" else "🎥"
@@ -49,7 +33,7 @@ async def send_new_order_notification(
     
     price_per_hour = order.base_price / order.duration_hours
     
-    text = (
+    return (
         f"🆕 Новый заказ!\n\n"
         f"Заказ номер: {order.order_number}\n"
         f"Пользователь: {username}\n"
@@ -63,13 +47,68 @@ async def send_new_order_notification(
         f"👥 Участников: {order.participants_count}\n\n"
         f"{format_price_calculation(price_per_hour, order.duration_hours, order.participants_count, calculation)}"
     )
+
+
+async def send_new_order_notification(
+    bot: Bot,
+    order: Order,
+    user: User,
+    profile: Optional[Profile] = None,
+    game: Optional[Game] = None
+) -> Message:
+    """
+    Отправка уведомления админу о новом заказе
+    
+    Args:
+        bot: Экземпляр бота
+        order: Заказ
+        user: Пользователь
+        profile: Анкета (опционально)
+        game: Игра (опционально, иначе берется order.game_name)
     
-    return await bot.send_message(
-        chat_id=ORDERS_CHAT_ID,
-        text=text
+    Returns:
+        Отправленное сообщение
+    """
+    if not ORDERS_CHAT_ID:
+        raise ValueError("ORDERS_CHAT_ID не установлен в конфигурации")
+    
+    return await outbound.send_message(bot, ORDERS_CHAT_ID, format_new_order_text(order, user, game))
+
+
+# Сколько заказов перечислять в сводке
+DIGEST_MAX_LINES = 30
+
+
+def format_new_orders_digest(orders: List[Order]) -> str:
+    """Текст сводки о новых заказах (анкета и игра должны быть загружены)"""
+    lines = [
+        f"{order.order_number} · {order.date.strftime('%d.%m %H:%M')} · "
+        f"{order.profile.name if order.profile else '—'} · "
+        f"{order.game.name if order.game else order.game_name or 'без игры'} · "
+        f"{order.total_price:.0f}₽"
+        for order in orders[:DIGEST_MAX_LINES]
+    ]
+    if len(orders) > DIGEST_MAX_LINES:
+        lines.append(f"... и еще {len(orders) - DIGEST_MAX_LINES}")
+    return (
+        f"🆕 Новые заказы: {len(orders)}\n\n"
+        + "\n".join(lines)
+        + "\n\nПодробности - в админке: /admin → 📋 Заказы"
     )
 
 
+async def send_new_orders_digest(bot: Bot, orders: List[Order]) -> Message:
+    """
+    Сводка о нескольких новых заказах одним сообщением
+    
+    Отправляется вместо отдельных уведомлений при большом потоке заказов
+    """
+    if not ORDERS_CHAT_ID:
+        raise ValueError("ORDERS_CHAT_ID не установлен в конфигурации")
+    
+    return await outbound.send_message(bot, ORDERS_CHAT_ID, format_new_orders_digest(orders))
+
+
 async def send_payment_check_notification(
     bot: Bot,
     order: Order
@@ -82,12 +121,7 @@ async def send_payment_check_notification(
     if not ORDERS_CHAT_ID:
         raise ValueError("ORDERS_CHAT_ID не установлен в конфигурации")
     
-    text = f"⏰ Заказ {order.order_number} проверить оплату"
-    
-    return await bot.send_message(
-        chat_id=ORDERS_CHAT_ID,
-        text=text
-    )
+    return await outbound.send_message(bot, ORDERS_CHAT_ID, format_payment_check_text(order))
 
 
 async def send_unpaid_order_notification(
@@ -102,11 +136,37 @@ async def send_unpaid_order_notification(
     if not ORDERS_CHAT_ID:
         raise ValueError("ORDERS_CHAT_ID не установлен в конфигурации")
     
-    text = f"❌ Заказ {order.order_number} не оплачен"
+    return await outbound.send_message(bot, ORDERS_CHAT_ID, format_unpaid_order_text(order))
+
+
+def format_payment_check_text(order: Order) -> str:
+    """Текст напоминания админу проверить оплату"""
+    return f"⏰ Заказ {order.order_number} проверить оплату"
+
+
+def format_unpaid_order_text(order: Order) -> str:
+    """Текст уведомления админу о неоплаченном заказе"""
+    return f"❌ Заказ {order.order_number} не оплачен"
+
+
+def format_cancellation_text(payment_status: str) -> str:
+    """
+    Текст уведомления пользователю об отмене заказа
     
-    return await bot.send_message(
-        chat_id=ORDERS_CHAT_ID,
-        text=text
+    Args:
+        payment_status: Статус оплаты на момент отмены
+    """
+    if payment_status == "paid":
+        return (
+            "К сожалению, ваш заказ был отменён.\n\n"
+            "Возврат денежных средств уже инициирован, срок зачисления до 5 рабочих дней, "
+            "в зависимости от Вашего банка.\n\n"
+            "Если остались вопросы - напишите нам."
+        )
+    # not_paid (processing - не должно происходить, но на всякий случай)
+    return (
+        "К сожалению, ваш заказ был отменён.\n\n"
+        "Если остались вопросы - напишите нам."
     )
 
 
@@ -123,29 +183,4 @@ async def send_order_cancellation_to_user(
         order: Заказ
         payment_status: Статус оплаты на момент отмены
     """
-    user = order.user
-    
-    if payment_status == "paid":
-        text = (
-            "К сожалению, ваш заказ был отменён.\n\n"
-            "Возврат денежных средств уже инициирован, срок зачисления до 5 рабочих дней, "
-            "в зависимости от Вашего банка.\n\n"
-            "Если остались вопросы - напишите нам."
-        )
-    elif payment_status == "not_paid":
-        text = (
-            "К сожалению, ваш заказ был отменён.\n\n"
-            "Если остались вопросы - напишите нам."
-        )
-    else:
-        # processing - не должно происходить, но на всякий случай
-        text = (
-            "К сожалению, ваш заказ был отменён.\n\n"
-            "Если остались вопросы - напишите нам."
-        )
-    
-    return await bot.send_message(
-        chat_id=user.telegram_id,
-        text=text
-    )
-
+    return await outbound.send_message(bot, order.user.telegram_id, format_cancellation_text(payment_status))
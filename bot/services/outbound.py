@@ -0,0 +1,226 @@
+"""Центральная очередь исходящих сообщений с ограничением скорости"""
+import asyncio
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set, Union
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.types import Message
+
+logger = logging.getLogger(__name__)
+
+# Лимиты Telegram: около 30 сообщений в секунду на бота,
+# 1 в секунду в личный чат, 20 в минуту в группу
+GLOBAL_RATE = 30
+PRIVATE_CHAT_RATE = 1
+GROUP_CHAT_RATE = 20 / 60
+GROUP_CHAT_BURST = 3
+
+# Сколько раз повторять сообщение после RetryAfter
+MAX_RETRY_AFTER_ATTEMPTS = 5
+# Больше стольких ведер чатов - удаляются заполненные (давно неактивные)
+MAX_CHAT_BUCKETS = 10000
+
+# Очереди по приоритету: меньше - раньше
+PRIORITY_INTERACTIVE = 0   # ответы на действия пользователя и админа
+PRIORITY_NOTIFY = 1        # уведомления о заказах
+PRIORITY_BULK = 2          # массовые рассылки
+
+
+class TokenBucket:
+    """Ведро токенов: rate токенов в секунду, не больше capacity"""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Через сколько секунд будет доступен токен"""
+        now = time.monotonic()
+        self._refill(now)
+        token_delay = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(token_delay, self.blocked_until - now)
+
+    def consume(self):
+        self.tokens -= 1
+
+    def block(self, seconds: float):
+        """Не выдавать токены seconds секунд (после RetryAfter)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def is_idle(self) -> bool:
+        """Ведро заполнено и не заблокировано - его можно удалить"""
+        now = time.monotonic()
+        self._refill(now)
+        return self.tokens >= self.capacity and self.blocked_until <= now
+
+
+@dataclass(order=True)
+class _Request:
+    """Сообщение в очереди; сравнивается по (приоритет, порядковый номер)"""
+    priority: int
+    seq: int
+    chat_id: Union[int, str] = field(compare=False)
+    text: str = field(compare=False)
+    kwargs: Dict[str, Any] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    attempts: int = field(default=0, compare=False)
+
+
+class OutboundQueue:
+    """
+    Очередь исходящих сообщений бота
+
+    Один воркер берет сообщения по приоритету и отправляет их, соблюдая
+    общее ведро токенов и ведро чата. Если чат еще не готов, сообщение
+    откладывается, не задерживая сообщения в другие чаты. После RetryAfter
+    чат блокируется на указанное время, а сообщение возвращается в очередь.
+    """
+
+    def __init__(self, global_rate: float = GLOBAL_RATE):
+        self._global = TokenBucket(global_rate)
+        self._chats: Dict[str, TokenBucket] = {}
+        self._queue: "asyncio.PriorityQueue[_Request]" = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._bot: Optional[Bot] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._sending: Set[asyncio.Task] = set()
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self, bot: Bot):
+        """Запустить воркер отправки"""
+        if self.running:
+            return
+        self._bot = bot
+        self._worker = asyncio.create_task(self._run())
+        logger.info("[OutboundQueue.start] Очередь исходящих сообщений запущена")
+
+    async def stop(self):
+        """Остановить воркер (неотправленные сообщения теряются)"""
+        if self._worker is None:
+            return
+        if not self._queue.empty():
+            logger.warning(f"[OutboundQueue.stop] Не отправлено сообщений: {self._queue.qsize()}")
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def enqueue(
+        self,
+        chat_id: Union[int, str],
+        text: str,
+        priority: int = PRIORITY_NOTIFY,
+        **kwargs
+    ) -> "asyncio.Future[Message]":
+        """
+        Поставить сообщение в очередь, не дожидаясь отправки
+
+        Ошибки отправки пишутся в лог.
+        """
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(self._log_failure)
+        self._queue.put_nowait(_Request(priority, next(self._seq), chat_id, text, kwargs, future))
+        return future
+
+    async def send_message(
+        self,
+        bot: Bot,
+        chat_id: Union[int, str],
+        text: str,
+        priority: int = PRIORITY_NOTIFY,
+        **kwargs
+    ) -> Message:
+        """
+        Отправить сообщение через очередь и дождаться результата
+
+        Если очередь не запущена (скрипты, тесты), сообщение отправляется напрямую.
+        """
+        if not self.running:
+            return await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+        return await self.enqueue(chat_id, text, priority, **kwargs)
+
+    def _chat_bucket(self, chat_id: Union[int, str]) -> TokenBucket:
+        # chat_id из конфигурации приходит строкой ("-100...", "@channel")
+        key = str(chat_id)
+        bucket = self._chats.get(key)
+        if bucket is None:
+            if len(self._chats) >= MAX_CHAT_BUCKETS:
+                self._chats = {name: value for name, value in self._chats.items() if not value.is_idle()}
+            # У групп и каналов отрицательный chat_id или @username
+            if key.startswith(("-", "@")):
+                bucket = TokenBucket(GROUP_CHAT_RATE, GROUP_CHAT_BURST)
+            else:
+                bucket = TokenBucket(PRIVATE_CHAT_RATE)
+            self._chats[key] = bucket
+        return bucket
+
+    @staticmethod
+    def _log_failure(future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"[OutboundQueue] Сообщение не отправлено: {future.exception()}")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            request = await self._queue.get()
+            if request.future.done():
+                continue
+
+            chat_delay = self._chat_bucket(request.chat_id).delay()
+            if chat_delay > 0:
+                # Чат еще не готов - откладываем, не блокируя остальные чаты
+                loop.call_later(chat_delay, self._queue.put_nowait, request)
+                continue
+
+            global_delay = self._global.delay()
+            if global_delay > 0:
+                await asyncio.sleep(global_delay)
+            self._global.consume()
+            self._chat_bucket(request.chat_id).consume()
+
+            task = asyncio.create_task(self._send(request))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, request: _Request):
+        try:
+            message = await self._bot.send_message(chat_id=request.chat_id, text=request.text, **request.kwargs)
+        except TelegramRetryAfter as e:
+            request.attempts += 1
+            self._chat_bucket(request.chat_id).block(e.retry_after)
+            logger.warning(
+                f"[OutboundQueue._send] RetryAfter {e.retry_after} с для чата {request.chat_id} "
+                f"(попытка {request.attempts})"
+            )
+            if request.attempts >= MAX_RETRY_AFTER_ATTEMPTS:
+                if not request.future.done():
+                    request.future.set_exception(e)
+                return
+            self._queue.put_nowait(request)
+            return
+        except Exception as e:
+            if not request.future.done():
+                request.future.set_exception(e)
+            return
+        if not request.future.done():
+            request.future.set_result(message)
+
+
+# Общий экземпляр для всего процесса
+outbound = OutboundQueue()
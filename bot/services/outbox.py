@@ -0,0 +1,258 @@
+"""Доставка уведомлений из outbox-таблицы"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from aiogram import Bot
+from sqlalchemy import select, func
+from sqlalchemy.orm import selectinload
+
+from bot.database.database import async_session_maker
+from bot.database.models import Order, OutboxMessage
+from bot.config import ORDER_DIGEST_RATE, ORDER_DIGEST_INTERVAL, ORDERS_CHAT_ID
+from bot.services.delivery import (
+    classify_error, backoff_delay, save_dead_letter, ERROR_PERMANENT, ERROR_RATE_LIMITED,
+)
+from bot.services.notifications import (
+    format_new_order_text, send_new_order_notification, send_new_orders_digest,
+)
+from bot.services.outbound import outbound
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_NEW_ORDER = "new_order"   # уведомление админам о новом заказе
+OUTBOX_MESSAGE = "message"       # готовый текст в chat_id
+
+# Сколько уведомлений отправляется за один проход
+OUTBOX_BATCH_SIZE = 50
+# Как часто проверять таблицу, если воркер не разбудили
+OUTBOX_POLL_INTERVAL = 5
+# Задержка повтора: случайная до 5 с, 10 с, 20 с ... но не больше часа
+OUTBOX_RETRY_BASE = 5
+OUTBOX_RETRY_MAX = 3600
+# После стольких неудачных попыток уведомление уходит в недоставленные
+OUTBOX_MAX_ATTEMPTS = 8
+
+
+def retry_delay(attempts: int, error: Optional[BaseException] = None) -> timedelta:
+    """Задержка перед следующей попыткой после attempts неудачных"""
+    if error is not None and classify_error(error) == ERROR_RATE_LIMITED:
+        return timedelta(seconds=error.retry_after)
+    return timedelta(seconds=backoff_delay(attempts, OUTBOX_RETRY_BASE, OUTBOX_RETRY_MAX))
+
+
+class OutboxWorker:
+    """
+    Фоновая доставка уведомлений из outbox
+
+    Уведомления записываются в outbox_messages в одной транзакции с заказом,
+    поэтому подтверждение заказа ждет только commit. Воркер отправляет их
+    через очередь исходящих сообщений и повторяет неудачные с нарастающей
+    задержкой (в том числе после перезапуска бота). Постоянные ошибки и
+    уведомления, не отправленные за OUTBOX_MAX_ATTEMPTS попыток, переносятся
+    в недоставленные (dead_letters).
+    """
+
+    def __init__(self, batch_size: int = OUTBOX_BATCH_SIZE, poll_interval: float = OUTBOX_POLL_INTERVAL):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._bot: Optional[Bot] = None
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        # Когда отправлена последняя сводка о заказах (time.monotonic)
+        self._last_digest_at = 0.0
+
+    def start(self, bot: Bot):
+        """Запустить воркер"""
+        if self._worker is None or self._worker.done():
+            self._bot = bot
+            self._worker = asyncio.create_task(self._run())
+            logger.info("[OutboxWorker.start] Воркер outbox запущен")
+
+    async def stop(self):
+        """Остановить воркер (неотправленное останется в таблице)"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def wake(self):
+        """Разбудить воркер после записи новых уведомлений"""
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                # Полная пачка - возможно, есть еще
+                if await self.drain() == self.batch_size:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[OutboxWorker._run] Ошибка доставки outbox: {e}", exc_info=True)
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _deliver(self, message: OutboxMessage, order: Optional[Order]) -> bool:
+        """
+        Отправить одно уведомление
+
+        Returns:
+            False, если отправлять больше нечего (заказ уже удален)
+        """
+        if message.kind == OUTBOX_NEW_ORDER:
+            if order is None:
+                return False
+            await send_new_order_notification(self._bot, order, order.user, order.profile, order.game)
+        elif message.kind == OUTBOX_MESSAGE:
+            await outbound.send_message(self._bot, message.chat_id, message.text, priority=message.priority)
+        else:
+            logger.warning(f"[OutboxWorker._deliver] Неизвестный тип уведомления: {message.kind}")
+            return False
+        return True
+
+    async def _fail(self, message: OutboxMessage, order: Optional[Order], error: BaseException, now: datetime):
+        """
+        Учесть неудачную попытку
+
+        Постоянные ошибки и исчерпанные попытки - в недоставленные, остальные
+        повторяются: RetryAfter - через указанное время, прочие - с задержкой
+        """
+        message.last_error = str(error)[:1000]
+        if classify_error(error) != ERROR_PERMANENT and message.attempts < OUTBOX_MAX_ATTEMPTS:
+            message.next_attempt_at = now + retry_delay(message.attempts, error)
+            logger.warning(
+                f"[OutboxWorker._fail] Уведомление {message.id} не отправлено "
+                f"(попытка {message.attempts}): {error}"
+            )
+            return
+
+        if message.kind == OUTBOX_NEW_ORDER:
+            if order is not None:
+                await save_dead_letter(
+                    message.kind, ORDERS_CHAT_ID, format_new_order_text(order, order.user, order.game),
+                    error, message.attempts, message.order_id
+                )
+        else:
+            await save_dead_letter(message.kind, message.chat_id, message.text, error, message.attempts, message.order_id)
+        # Дальше уведомление живет в dead_letters
+        message.sent_at = now
+        logger.warning(f"[OutboxWorker._fail] Уведомление {message.id} перенесено в недоставленные: {error}")
+
+    async def _is_order_burst(self, session) -> bool:
+        """Заказов за последнюю минуту больше порога - уведомления собираются в сводку"""
+        result = await session.execute(
+            select(func.count(OutboxMessage.id))
+            .where(OutboxMessage.kind == OUTBOX_NEW_ORDER)
+            .where(OutboxMessage.created_at >= datetime.utcnow() - timedelta(minutes=1))
+        )
+        return (result.scalar() or 0) > ORDER_DIGEST_RATE
+
+    async def _send_digest(self, messages: List[OutboxMessage], orders: Dict[int, Order]) -> int:
+        """
+        Сводка по накопленным уведомлениям о новых заказах
+
+        Returns:
+            Количество обработанных уведомлений (0 - время сводки еще не пришло)
+        """
+        now = datetime.utcnow()
+        wait = ORDER_DIGEST_INTERVAL - (time.monotonic() - self._last_digest_at)
+        if wait > 0:
+            # До сводки уведомления не выбираются и не занимают пачку
+            for message in messages:
+                message.next_attempt_at = now + timedelta(seconds=wait)
+            return 0
+
+        digest_orders = [orders[message.order_id] for message in messages if message.order_id in orders]
+        try:
+            if digest_orders:
+                await send_new_orders_digest(self._bot, digest_orders)
+        except Exception as e:
+            logger.warning(f"[OutboxWorker._send_digest] Сводка не отправлена: {e}")
+            for message in messages:
+                message.attempts += 1
+                await self._fail(message, orders.get(message.order_id), e, now)
+            return len(messages)
+
+        self._last_digest_at = time.monotonic()
+        for message in messages:
+            message.attempts += 1
+            message.sent_at = now
+        logger.info(f"[OutboxWorker._send_digest] Отправлена сводка о заказах: {len(digest_orders)}")
+        return len(messages)
+
+    async def drain(self) -> int:
+        """
+        Отправить пачку готовых уведомлений
+
+        Returns:
+            Количество обработанных уведомлений
+        """
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(OutboxMessage)
+                .where(OutboxMessage.sent_at.is_(None))
+                .where(OutboxMessage.next_attempt_at <= datetime.utcnow())
+                .order_by(OutboxMessage.id)
+                .limit(self.batch_size)
+            )
+            messages = list(result.scalars().all())
+            if not messages:
+                return 0
+
+            # Заказы всех уведомлений пачки одним запросом
+            order_ids = {message.order_id for message in messages if message.kind == OUTBOX_NEW_ORDER}
+            orders = {}
+            if order_ids:
+                orders_result = await session.execute(
+                    select(Order)
+                    .where(Order.id.in_(order_ids))
+                    .options(selectinload(Order.user), selectinload(Order.profile), selectinload(Order.game))
+                )
+                orders = {order.id: order for order in orders_result.scalars().all()}
+
+            # При всплеске заказов уведомления о них копятся и уходят одной сводкой
+            # раз в ORDER_DIGEST_INTERVAL секунд; подробности - в админке заказов
+            processed = 0
+            new_order_messages = [message for message in messages if message.kind == OUTBOX_NEW_ORDER]
+            if new_order_messages and await self._is_order_burst(session):
+                processed += await self._send_digest(new_order_messages, orders)
+                messages = [message for message in messages if message.kind != OUTBOX_NEW_ORDER]
+
+            # Скорость отправки ограничивает очередь исходящих сообщений
+            results = await asyncio.gather(
+                *(self._deliver(message, orders.get(message.order_id)) for message in messages),
+                return_exceptions=True
+            )
+
+            now = datetime.utcnow()
+            sent = 0
+            for message, delivered in zip(messages, results):
+                message.attempts += 1
+                if isinstance(delivered, Exception):
+                    await self._fail(message, orders.get(message.order_id), delivered, now)
+                    continue
+                if delivered is False:
+                    message.last_error = "Нечего отправлять: заказ удален или тип неизвестен"
+                else:
+                    sent += 1
+                message.sent_at = now
+            await session.commit()
+
+        if messages:
+            logger.info(f"[OutboxWorker.drain] Отправлено уведомлений: {sent} из {len(messages)}")
+        return processed + len(messages)
+
+
+# Общий экземпляр для всего процесса
+outbox_worker = OutboxWorker()
@@ -1,391 +1,414 @@
-"""Сервис для управления напоминаниями через APScheduler"""
-import uuid
+"""Сервис для управления напоминаниями: один диспетчер поверх ReminderTask"""
+import asyncio
+import heapq
+import logging
+import time
 from datetime import datetime, timedelta
-from typing import Optional
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.jobstores.memory import MemoryJobStore
-from apscheduler.executors.asyncio import AsyncIOExecutor
+from typing import List, Optional, Set, Tuple
 from aiogram import Bot
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, or_, and_
 
-from bot.config import TIMEZONE
+from bot.config import (
+    INSTANCE_ID, ORDERS_CHAT_ID, REMINDER_LEASE_SECONDS, REMINDER_LOOKAHEAD_MINUTES, REMINDER_TOPUP_MINUTES,
+)
 from bot.database.models import Order, ReminderTask, User, Profile
-from bot.database.repositories import OrderRepository
-import pytz
+from bot.database.repositories import ReminderTaskRepository
+from bot.services.delivery import deliver
+from bot.services.slots import local_now
+
+logger = logging.getLogger(__name__)
+
+# На сколько вперед задачи держатся в памяти
+REMINDER_LOOKAHEAD = timedelta(minutes=REMINDER_LOOKAHEAD_MINUTES)
+# Как часто окно догружается (чаще, чем длина окна, иначе задачи можно пропустить)
+REMINDER_TOPUP_INTERVAL = min(timedelta(minutes=REMINDER_TOPUP_MINUTES), REMINDER_LOOKAHEAD / 2)
+# Задач за один запрос догрузки
+DISPATCH_BATCH_SIZE = 500
+# Максимум задач в памяти (при большем - окно сокращается)
+MAX_TASKS_IN_MEMORY = 20000
+# Максимальный сон диспетчера (страховка от пропущенных пробуждений)
+MAX_SLEEP_SECONDS = 60
+# Сколько напоминаний отправляется одновременно
+REMINDER_CONCURRENCY = 10
+# Срок аренды задачи (должен быть больше времени отправки с повторами)
+REMINDER_LEASE = timedelta(seconds=REMINDER_LEASE_SECONDS)
+# Через сколько после срока невыполненная задача подбирается как брошенная
+ORPHAN_GRACE = timedelta(seconds=30)
+
+# Элемент кучи: (время запуска, id задачи, id заказа, тип задачи)
+HeapItem = Tuple[datetime, int, int, str]
 
 
 class ReminderService:
-    """Сервис для управления напоминаниями"""
+    """
+    Сервис для управления напоминаниями
     
-    def __init__(self, bot: Bot):
-        self.bot = bot
-        self.scheduler = AsyncIOScheduler(
-            jobstores={'default': MemoryJobStore()},
-            executors={'default': AsyncIOExecutor()},
-            timezone=pytz.timezone(TIMEZONE)
-        )
+    Вместо отдельной задачи планировщика на каждое напоминание один цикл
+    держит в min-куче только задачи, наступающие в ближайшие
+    REMINDER_LOOKAHEAD, и раз в REMINDER_TOPUP_INTERVAL догружает окно
+    запросом по диапазону индекса ReminderTask.scheduled_time, продолжая с
+    курсора (время, id) последней загруженной задачи. Память и время запуска
+    зависят от ближайшей нагрузки, а не от числа всех бронирований.
+    Наступившие задачи запускаются пачкой и отмечаются выполненными одним UPDATE.
+    
+    Все времена сервиса (scheduled_time, курсор окна, аренды, проверка
+    наступления) - МСК без tzinfo, как и даты заказов: см. local_now.
+    
+    Процессов бота может быть несколько: каждый держит свое окно, но задачу
+    выполняет тот, кто взял ее в аренду условным UPDATE (lease_owner,
+    lease_expires_at). Аренды упавших процессов истекают, и при догрузке окна
+    такие задачи подбираются другими процессами.
+    """
+    
+    def __init__(self, worker_id: str = INSTANCE_ID):
+        self.bot: Optional[Bot] = None
+        self.worker_id = worker_id
+        # Задачи, наступившие раньше, не подбираются (пропущенные пока бот не работал)
+        self._started_at: Optional[datetime] = None
+        self._heap: List[HeapItem] = []
+        # id задач в куче или выполняющихся - защита от повторной загрузки
+        self._queued: Set[int] = set()
+        # Курсор догрузки: (время, id) последней загруженной задачи
+        self._cursor: Optional[Tuple[datetime, int]] = None
+        # Задачи со временем до loaded_until уже загружены
+        self._loaded_until: Optional[datetime] = None
+        self._next_topup: Optional[datetime] = None
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
         self._initialized = False
+        # Тип задачи -> обработчик; возвращает True, если сообщение отправлено
+        self._handlers = {
+            "reminder_15min": self._send_reminder_15min,
+            "after_meeting": self._send_after_meeting_message,
+            "check_payment_processing": self._check_payment_processing,
+            "check_payment_not_paid": self._check_payment_not_paid,
+        }
+    
+    async def start(self, bot: Bot):
+        """Запомнить бота и запустить диспетчер"""
+        from bot.database.database import async_session_maker
+        
+        self.bot = bot
+        async with async_session_maker() as session:
+            await self.initialize(session)
     
     async def initialize(self, session: AsyncSession):
-        """Инициализация сервиса - восстановление задач из БД"""
+        """Инициализация сервиса - загрузка ближайшего окна задач и запуск диспетчера"""
         if self._initialized:
             return
         
-        # Восстановление задач из БД
-        result = await session.execute(
-            select(ReminderTask)
-            .where(ReminderTask.executed == False)
-            .where(ReminderTask.scheduled_time > datetime.utcnow())
+        started = time.perf_counter()
+        # Задачи, пропущенные пока бот не работал, не запускаются (как и раньше)
+        self._cursor = (local_now(), 0)
+        self._started_at = self._loaded_until = self._cursor[0]
+        await self._top_up(session)
+        self._runner = asyncio.create_task(self._run())
+        self._initialized = True
+        logger.info(
+            f"[initialize] Загружено задач в окно: {len(self._heap)} "
+            f"за {time.perf_counter() - started:.3f} с"
         )
-        tasks = result.scalars().all()
+    
+    def _push(self, item: HeapItem):
+        if item[1] not in self._queued:
+            self._queued.add(item[1])
+            heapq.heappush(self._heap, item)
+    
+    async def _top_up(self, session: AsyncSession):
+        """
+        Догрузка задач до now + REMINDER_LOOKAHEAD
         
-        for task in tasks:
-            await self._schedule_task_from_db(session, task)
+        Запросы с JOIN (задачи удаленных заказов не загружаются) по диапазону
+        scheduled_time после курсора, пачками по DISPATCH_BATCH_SIZE.
+        """
+        target = local_now() + REMINDER_LOOKAHEAD
+        loaded = 0
+        while len(self._heap) < MAX_TASKS_IN_MEMORY:
+            cursor_time, cursor_id = self._cursor
+            result = await session.execute(
+                select(
+                    ReminderTask.scheduled_time, ReminderTask.id,
+                    ReminderTask.order_id, ReminderTask.task_type,
+                )
+                .join(Order, Order.id == ReminderTask.order_id)
+                .where(ReminderTask.executed == False)
+                .where(or_(
+                    ReminderTask.scheduled_time > cursor_time,
+                    and_(ReminderTask.scheduled_time == cursor_time, ReminderTask.id > cursor_id),
+                ))
+                .where(ReminderTask.scheduled_time <= target)
+                .order_by(ReminderTask.scheduled_time, ReminderTask.id)
+                .limit(DISPATCH_BATCH_SIZE)
+            )
+            rows = [tuple(row) for row in result.all()]
+            for row in rows:
+                self._push(row)
+            loaded += len(rows)
+            if rows:
+                self._cursor = (rows[-1][0], rows[-1][1])
+            if len(rows) < DISPATCH_BATCH_SIZE:
+                self._loaded_until = target
+                break
+        else:
+            # Память заполнена - окно заканчивается на последней загруженной задаче
+            self._loaded_until = self._cursor[0]
+            logger.warning(f"[_top_up] В памяти {len(self._heap)} задач, окно сокращено до {self._loaded_until}")
         
-        self.scheduler.start()
-        self._initialized = True
+        loaded += await self._load_orphans(session)
+        self._next_topup = local_now() + REMINDER_TOPUP_INTERVAL
+        if loaded:
+            logger.info(f"[_top_up] Догружено задач: {loaded}, в памяти: {len(self._heap)}")
     
-    async def _schedule_task_from_db(
-        self,
-        session: AsyncSession,
-        task: ReminderTask
-    ):
-        """Восстановление задачи из БД"""
-        from sqlalchemy.orm import selectinload
+    async def _load_orphans(self, session: AsyncSession) -> int:
+        """
+        Подбор просроченных невыполненных задач без действующей аренды
         
-        # Получаем заказ
-        order_result = await session.execute(
-            select(Order)
-            .where(Order.id == task.order_id)
-            .options(
-                selectinload(Order.user),
-                selectinload(Order.profile)
+        Это задачи упавших процессов: взятые в аренду, которая истекла, или
+        созданные и загруженные только в окно процесса, который упал до их
+        срока. Повторное выполнение исключает захват в _fire.
+        """
+        now = local_now()
+        result = await session.execute(
+            select(
+                ReminderTask.scheduled_time, ReminderTask.id,
+                ReminderTask.order_id, ReminderTask.task_type,
             )
+            .join(Order, Order.id == ReminderTask.order_id)
+            .where(ReminderTask.executed == False)
+            .where(ReminderTask.scheduled_time >= self._started_at)
+            .where(ReminderTask.scheduled_time <= now - ORPHAN_GRACE)
+            .where(or_(ReminderTask.lease_expires_at.is_(None), ReminderTask.lease_expires_at < now))
+            .order_by(ReminderTask.scheduled_time, ReminderTask.id)
+            .limit(DISPATCH_BATCH_SIZE)
         )
-        order = order_result.scalar_one_or_none()
-        
-        if not order:
-            return
+        rows = [tuple(row) for row in result.all()]
+        for row in rows:
+            self._push(row)
+        if rows:
+            logger.warning(f"[_load_orphans] Подобрано брошенных задач: {len(rows)}")
+        return len(rows)
+    
+    async def _claim(self, session: AsyncSession, task_ids: List[int]) -> datetime:
+        """
+        Взять задачи в аренду одним условным UPDATE
         
-        # Создаем задачу в планировщике
-        job_id = task.job_id or str(uuid.uuid4())
+        Условие (не выполнена, аренды нет или она истекла) проверяется базой
+        для каждой строки, поэтому из нескольких процессов задачу получает один.
         
-        if task.task_type == "reminder_15min":
-            self.scheduler.add_job(
-                self._send_reminder_15min,
-                'date',
-                run_date=task.scheduled_time,
-                id=job_id,
-                args=[task.order_id],
-                replace_existing=True
-            )
-        elif task.task_type == "after_meeting":
-            self.scheduler.add_job(
-                self._send_after_meeting_message,
-                'date',
-                run_date=task.scheduled_time,
-                id=job_id,
-                args=[task.order_id],
-                replace_existing=True
-            )
-        elif task.task_type == "check_payment_processing":
-            self.scheduler.add_job(
-                self._check_payment_processing,
-                'date',
-                run_date=task.scheduled_time,
-                id=job_id,
-                args=[task.order_id],
-                replace_existing=True
-            )
-        elif task.task_type == "check_payment_not_paid":
-            self.scheduler.add_job(
-                self._check_payment_not_paid,
-                'date',
-                run_date=task.scheduled_time,
-                id=job_id,
-                args=[task.order_id],
-                replace_existing=True
-            )
-        
-        # Обновляем job_id в БД
-        task.job_id = job_id
+        Returns:
+            Срок аренды - по нему (и lease_owner) выбираются захваченные задачи
+        """
+        now = local_now()
+        expires_at = now + REMINDER_LEASE
+        await session.execute(
+            update(ReminderTask)
+            .where(ReminderTask.id.in_(task_ids))
+            .where(ReminderTask.executed == False)
+            .where(or_(ReminderTask.lease_expires_at.is_(None), ReminderTask.lease_expires_at < now))
+            .values(lease_owner=self.worker_id, lease_expires_at=expires_at)
+            .execution_options(synchronize_session=False)
+        )
         await session.commit()
+        return expires_at
     
-    async def schedule_order_reminders(
-        self,
-        session: AsyncSession,
-        order: Order
-    ):
-        """Создание задач напоминаний для заказа"""
-        # Напоминание за 15 минут до встречи
-        reminder_time = order.date - timedelta(minutes=15)
-        if reminder_time > datetime.utcnow():
-            await self._create_reminder_task(
-                session=session,
-                order_id=order.id,
-                task_type="reminder_15min",
-                scheduled_time=reminder_time
-            )
+    async def _run(self):
+        """Цикл диспетчера"""
+        from bot.database.database import async_session_maker
         
-        # Сообщение после окончания встречи
-        meeting_end_time = order.date + timedelta(hours=order.duration_hours)
-        if meeting_end_time > datetime.utcnow():
-            await self._create_reminder_task(
-                session=session,
-                order_id=order.id,
-                task_type="after_meeting",
-                scheduled_time=meeting_end_time
-            )
+        while True:
+            try:
+                now = local_now()
+                if now >= self._next_topup or now >= self._loaded_until:
+                    async with async_session_maker() as session:
+                        await self._top_up(session)
+                
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap))
+                if due:
+                    await self._fire(due)
+                    continue
+                
+                next_time = min(self._next_topup, self._loaded_until)
+                if self._heap:
+                    next_time = min(next_time, self._heap[0][0])
+                timeout = min(max((next_time - local_now()).total_seconds(), 0), MAX_SLEEP_SECONDS)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[_run] Ошибка диспетчера напоминаний: {e}", exc_info=True)
+                await asyncio.sleep(1)
+    
+    async def _fire(self, due: List[HeapItem]):
+        """
+        Выполнение пачки наступивших задач
         
-        # Проверка оплаты для статуса "processing" (через 15 минут)
-        if order.payment_status == "processing":
-            check_time = datetime.utcnow() + timedelta(minutes=15)
-            await self._create_reminder_task(
-                session=session,
-                order_id=order.id,
-                task_type="check_payment_processing",
-                scheduled_time=check_time
-            )
+        Задачи берутся в аренду, затем захваченные задачи и их заказы (с
+        пользователями и анкетами) забираются одним запросом, сообщения
+        отправляются параллельно не больше REMINDER_CONCURRENCY одновременно,
+        отметки о выполнении и отправке напоминаний записываются одним commit.
+        """
+        from bot.database.database import async_session_maker
+        from sqlalchemy.orm import selectinload
         
-        # Проверка оплаты для статуса "not_paid" (через 30 минут)
-        if order.payment_status == "not_paid":
-            check_time = datetime.utcnow() + timedelta(minutes=30)
-            await self._create_reminder_task(
-                session=session,
-                order_id=order.id,
-                task_type="check_payment_not_paid",
-                scheduled_time=check_time
+        task_ids = [task_id for _, task_id, _, _ in due]
+        try:
+            async with async_session_maker() as session:
+                expires_at = await self._claim(session, task_ids)
+                result = await session.execute(
+                    select(ReminderTask.id, ReminderTask.task_type, Order)
+                    .join(Order, Order.id == ReminderTask.order_id)
+                    .where(ReminderTask.id.in_(task_ids))
+                    .where(ReminderTask.executed == False)
+                    .where(ReminderTask.lease_owner == self.worker_id)
+                    .where(ReminderTask.lease_expires_at == expires_at)
+                    .options(selectinload(Order.user), selectinload(Order.profile))
+                )
+                rows = result.all()
+                claimed_ids = [task_id for task_id, _, _ in rows]
+                claimed = [(task_type, order) for _, task_type, order in rows if task_type in self._handlers]
+                
+                semaphore = asyncio.Semaphore(REMINDER_CONCURRENCY)
+                
+                async def run(task_type: str, order: Order) -> bool:
+                    async with semaphore:
+                        return await self._handlers[task_type](order)
+                
+                results = await asyncio.gather(
+                    *(run(task_type, order) for task_type, order in claimed),
+                    return_exceptions=True
+                )
+                for item in results:
+                    if isinstance(item, Exception):
+                        logger.error(f"[_fire] Ошибка выполнения напоминания: {item}", exc_info=item)
+                
+                reminded_ids = [
+                    order.id
+                    for (task_type, order), sent in zip(claimed, results)
+                    if task_type == "reminder_15min" and sent is True
+                ]
+                if reminded_ids:
+                    await session.execute(
+                        update(Order)
+                        .where(Order.id.in_(reminded_ids))
+                        .values(reminder_sent=True)
+                        .execution_options(synchronize_session=False)
+                    )
+                # Только свои задачи: чужие выполнит тот, кто их захватил
+                if claimed_ids:
+                    await session.execute(
+                        update(ReminderTask)
+                        .where(ReminderTask.id.in_(claimed_ids))
+                        .where(ReminderTask.lease_owner == self.worker_id)
+                        .values(executed=True, executed_at=local_now())
+                        .execution_options(synchronize_session=False)
+                    )
+                await session.commit()
+            logger.info(
+                f"[_fire] Выполнено напоминаний: {len(claimed)} из {len(due)} "
+                f"(захвачено этим процессом: {len(claimed_ids)})"
             )
+        finally:
+            self._queued.difference_update(task_ids)
     
-    async def _create_reminder_task(
+    async def schedule_order_reminders(
         self,
         session: AsyncSession,
-        order_id: int,
-        task_type: str,
-        scheduled_time: datetime
+        order: Order
     ):
-        """Создание задачи напоминания в БД и планировщике"""
-        job_id = str(uuid.uuid4())
-        
-        # Создаем запись в БД
-        task = ReminderTask(
-            order_id=order_id,
-            task_type=task_type,
-            scheduled_time=scheduled_time,
-            job_id=job_id
-        )
-        session.add(task)
+        """Создание задач напоминаний для заказа (одним commit)"""
+        tasks = ReminderTaskRepository.build_for_order(order)
+        if not tasks:
+            return
+        session.add_all(tasks)
         await session.commit()
-        await session.refresh(task)
-        
-        # Добавляем в планировщик
-        if task_type == "reminder_15min":
-            self.scheduler.add_job(
-                self._send_reminder_15min,
-                'date',
-                run_date=scheduled_time,
-                id=job_id,
-                args=[order_id],
-                replace_existing=True
-            )
-        elif task_type == "after_meeting":
-            self.scheduler.add_job(
-                self._send_after_meeting_message,
-                'date',
-                run_date=scheduled_time,
-                id=job_id,
-                args=[order_id],
-                replace_existing=True
-            )
-        elif task_type == "check_payment_processing":
-            self.scheduler.add_job(
-                self._check_payment_processing,
-                'date',
-                run_date=scheduled_time,
-                id=job_id,
-                args=[order_id],
-                replace_existing=True
-            )
-        elif task_type == "check_payment_not_paid":
-            self.scheduler.add_job(
-                self._check_payment_not_paid,
-                'date',
-                run_date=scheduled_time,
-                id=job_id,
-                args=[order_id],
-                replace_existing=True
-            )
+        self._track(tasks)
+        logger.info(f"[schedule_order_reminders] Заказ {order.id}: задач напоминаний {len(tasks)}")
+    
+    async def track_order(self, session: AsyncSession, order_id: int):
+        """Добавить в окно невыполненные задачи заказа (после переноса заказа)"""
+        self._track(await ReminderTaskRepository.get_pending_for_order(session, order_id))
     
-    async def _send_reminder_15min(self, order_id: int):
+    def _track(self, tasks: List[ReminderTask]):
+        """Задачи, попадающие в уже загруженное окно, - сразу в кучу (догрузка их не увидит)"""
+        if self._loaded_until is None:
+            return
+        pushed = False
+        for task in tasks:
+            if task.scheduled_time <= self._loaded_until:
+                self._push((task.scheduled_time, task.id, task.order_id, task.task_type))
+                pushed = True
+        if pushed:
+            # Новая задача может быть раньше той, до которой спит диспетчер
+            self._wakeup.set()
+    
+    async def _send_reminder_15min(self, order: Order) -> bool:
         """Отправка напоминания за 15 минут до встречи"""
-        from bot.database.database import async_session_maker
-        from bot.database.repositories import OrderRepository
-        from sqlalchemy.orm import selectinload
-        from sqlalchemy import select
+        if order.reminder_sent or not order.notification_enabled:
+            return False
         
-        async with async_session_maker() as session:
-            result = await session.execute(
-                select(Order)
-                .where(Order.id == order_id)
-                .options(
-                    selectinload(Order.user),
-                    selectinload(Order.profile)
-                )
-            )
-            order = result.scalar_one_or_none()
-            if not order or order.reminder_sent or not order.notification_enabled:
-                return
-            
-            user = order.user
-            profile = order.profile
-            
-            # Сообщение пользователю
-            user_text = (
-                "⏰ Ваша встреча начнётся через 15 минут.\n\n"
-                "Переходите по ссылке заранее, чтобы проверить звук и видео.\n"
-                "Желаем хорошей игры!"
-            )
-            
-            if order.conference_link:
-                user_text += f"\n\n🔗 Ссылка: {order.conference_link}"
-            
-            await self.bot.send_message(
-                chat_id=user.telegram_id,
-                text=user_text
-            )
-            
-            # Сообщение девушке (если есть telegram_id в профиле)
-            # TODO: Добавить telegram_id в модель Profile если нужно
-            
-            # Отмечаем как отправленное
-            order.reminder_sent = True
-            await session.commit()
-            
-            # Отмечаем задачу как выполненную
-            task_result = await session.execute(
-                select(ReminderTask)
-                .where(ReminderTask.order_id == order_id)
-                .where(ReminderTask.task_type == "reminder_15min")
-                .where(ReminderTask.executed == False)
-            )
-            task = task_result.scalar_one_or_none()
-            if task:
-                task.executed = True
-                task.executed_at = datetime.utcnow()
-                await session.commit()
+        # Сообщение пользователю
+        user_text = (
+            "⏰ Ваша встреча начнётся через 15 минут.\n\n"
+            "Переходите по ссылке заранее, чтобы проверить звук и видео.\n"
+            "Желаем хорошей игры!"
+        )
+        
+        if order.conference_link:
+            user_text += f"\n\n🔗 Ссылка: {order.conference_link}"
+        
+        sent = await deliver(self.bot, order.user.telegram_id, user_text, "reminder_15min", order.id)
+        
+        # Сообщение девушке (если есть telegram_id в профиле)
+        # TODO: Добавить telegram_id в модель Profile если нужно
+        
+        # reminder_sent отмечается диспетчером для всей пачки
+        return sent is not None
     
-    async def _send_after_meeting_message(self, order_id: int):
+    async def _send_after_meeting_message(self, order: Order) -> bool:
         """Отправка сообщения после окончания встречи"""
-        from bot.database.database import async_session_maker
-        from sqlalchemy.orm import selectinload
-        from sqlalchemy import select
+        text = (
+            "Спасибо за участие в встрече!\n\n"
+            "Будем рады видеть вас снова и если понравилось — "
+            "посоветуйте нас друзьям 🤗"
+        )
         
-        async with async_session_maker() as session:
-            result = await session.execute(
-                select(Order)
-                .where(Order.id == order_id)
-                .options(selectinload(Order.user))
-            )
-            order = result.scalar_one_or_none()
-            
-            if not order:
-                return
-            
-            user = order.user
-            
-            text = (
-                "Спасибо за участие в встрече!\n\n"
-                "Будем рады видеть вас снова и если понравилось — "
-                "посоветуйте нас друзьям 🤗"
-            )
-            
-            await self.bot.send_message(
-                chat_id=user.telegram_id,
-                text=text
-            )
-            
-            # Отмечаем задачу как выполненную
-            task_result = await session.execute(
-                select(ReminderTask)
-                .where(ReminderTask.order_id == order_id)
-                .where(ReminderTask.task_type == "after_meeting")
-                .where(ReminderTask.executed == False)
-            )
-            task = task_result.scalar_one_or_none()
-            if task:
-                task.executed = True
-                task.executed_at = datetime.utcnow()
-                await session.commit()
+        return await deliver(self.bot, order.user.telegram_id, text, "after_meeting", order.id) is not None
     
-    async def _check_payment_processing(self, order_id: int):
+    async def _check_payment_processing(self, order: Order) -> bool:
         """Проверка оплаты для статуса processing"""
-        from bot.database.database import async_session_maker
-        from bot.services.notifications import send_payment_check_notification
-        from sqlalchemy.orm import selectinload
-        from sqlalchemy import select
+        from bot.services.notifications import format_payment_check_text
         
-        async with async_session_maker() as session:
-            result = await session.execute(
-                select(Order)
-                .where(Order.id == order_id)
-                .options(selectinload(Order.user), selectinload(Order.profile))
-            )
-            order = result.scalar_one_or_none()
-            
-            if not order or order.payment_status != "processing":
-                return
-            
-            await send_payment_check_notification(self.bot, order)
-            
-            # Отмечаем задачу как выполненную
-            task_result = await session.execute(
-                select(ReminderTask)
-                .where(ReminderTask.order_id == order_id)
-                .where(ReminderTask.task_type == "check_payment_processing")
-                .where(ReminderTask.executed == False)
-            )
-            task = task_result.scalar_one_or_none()
-            if task:
-                task.executed = True
-                task.executed_at = datetime.utcnow()
-                await session.commit()
+        if order.payment_status != "processing":
+            return False
+        
+        if not ORDERS_CHAT_ID:
+            raise ValueError("ORDERS_CHAT_ID не установлен в конфигурации")
+        return await deliver(self.bot, ORDERS_CHAT_ID, format_payment_check_text(order), "check_payment_processing", order.id) is not None
     
-    async def _check_payment_not_paid(self, order_id: int):
+    async def _check_payment_not_paid(self, order: Order) -> bool:
         """Проверка оплаты для статуса not_paid"""
-        from bot.database.database import async_session_maker
-        from bot.services.notifications import send_unpaid_order_notification
-        from sqlalchemy.orm import selectinload
-        from sqlalchemy import select
+        from bot.services.notifications import format_unpaid_order_text
         
-        async with async_session_maker() as session:
-            result = await session.execute(
-                select(Order)
-                .where(Order.id == order_id)
-                .options(selectinload(Order.user), selectinload(Order.profile))
-            )
-            order = result.scalar_one_or_none()
-            
-            if not order or order.payment_status != "not_paid":
-                return
-            
-            await send_unpaid_order_notification(self.bot, order)
-            
-            # Отмечаем задачу как выполненную
-            task_result = await session.execute(
-                select(ReminderTask)
-                .where(ReminderTask.order_id == order_id)
-                .where(ReminderTask.task_type == "check_payment_not_paid")
-                .where(ReminderTask.executed == False)
-            )
-            task = task_result.scalar_one_or_none()
-            if task:
-                task.executed = True
-                task.executed_at = datetime.utcnow()
-                await session.commit()
+        if order.payment_status != "not_paid":
+            return False
+        
+        if not ORDERS_CHAT_ID:
+            raise ValueError("ORDERS_CHAT_ID не установлен в конфигурации")
+        return await deliver(self.bot, ORDERS_CHAT_ID, format_unpaid_order_text(order), "check_payment_not_paid", order.id) is not None
     
     def shutdown(self):
-        """Остановка планировщика"""
-        if self.scheduler.running:
-            self.scheduler.shutdown()
+        """Остановка диспетчера"""
+        if self._runner is not None:
+            self._runner.cancel()
+            self._runner = None
+
 
+# Общий экземпляр для всего процесса
+reminder_service = ReminderService()
@@ -0,0 +1,215 @@
+"""Индекс занятых интервалов анкет для проверки пересечений бронирований"""
+import asyncio
+import bisect
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pytz
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.config import TIMEZONE
+from bot.database.models import Order
+
+logger = logging.getLogger(__name__)
+
+tz = pytz.timezone(TIMEZONE)
+
+# Интервал: (начало, конец, ID заказа)
+Interval = Tuple[datetime, datetime, int]
+
+
+def to_local_naive(value: datetime) -> datetime:
+    """Привести время к МСК без tzinfo (в таком виде даты заказов хранятся в БД)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(tz).replace(tzinfo=None)
+    return value
+
+
+def local_now() -> datetime:
+    """Текущее время МСК без tzinfo - те же часы, что у дат заказов"""
+    return to_local_naive(datetime.now(tz))
+
+
+class SlotIndex:
+    """
+    Занятые интервалы [date, date + duration_hours) по анкетам
+
+    Для каждой анкеты хранится список интервалов, отсортированный по началу,
+    и максимальная длительность интервала. Поиск пересечения - бинарный поиск
+    по началу плюс просмотр только тех интервалов, которые могут дотянуться
+    до запрошенного времени, поэтому проверка занимает микросекунды.
+    """
+
+    def __init__(self):
+        self._intervals: Dict[int, List[Interval]] = {}
+        self._max_length: Dict[int, timedelta] = {}
+        self._by_order: Dict[int, Tuple[int, Interval]] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    async def ensure_loaded(self, session: AsyncSession):
+        """Загрузить будущие заказы из БД, если индекс еще не загружен"""
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            await self._load(session)
+
+    async def _load(self, session: AsyncSession):
+        """Полная загрузка индекса из БД"""
+        # Прошедшие встречи не влияют на новые бронирования,
+        # с запасом берем заказы, начавшиеся не раньше суток назад
+        since = to_local_naive(datetime.now(tz)) - timedelta(days=1)
+        result = await session.execute(
+            select(Order.id, Order.profile_id, Order.date, Order.duration_hours)
+            .where(Order.date >= since)
+        )
+
+        self._intervals = {}
+        self._max_length = {}
+        self._by_order = {}
+        self._loaded = True
+
+        count = 0
+        for order_id, profile_id, start, duration_hours in result.all():
+            self.add(order_id, profile_id, start, duration_hours)
+            count += 1
+
+        logger.info(f"[SlotIndex._load] Загружено интервалов: {count}")
+
+    def invalidate(self):
+        """Сбросить индекс (будет перезагружен при следующем обращении)"""
+        self._loaded = False
+        self._intervals = {}
+        self._max_length = {}
+        self._by_order = {}
+
+    # Изменения (вызываются после успешного commit)
+
+    def add(self, order_id: int, profile_id: int, start: datetime, duration_hours: float):
+        """Добавить интервал заказа"""
+        if not self._loaded:
+            return
+        if order_id in self._by_order:
+            self.remove(order_id)
+
+        start = to_local_naive(start)
+        length = timedelta(hours=duration_hours)
+        interval = (start, start + length, order_id)
+
+        intervals = self._intervals.setdefault(profile_id, [])
+        bisect.insort(intervals, interval)
+        if length > self._max_length.get(profile_id, timedelta(0)):
+            self._max_length[profile_id] = length
+        self._by_order[order_id] = (profile_id, interval)
+
+    def remove(self, order_id: int):
+        """Удалить интервал заказа (отмена)"""
+        if not self._loaded:
+            return
+        entry = self._by_order.pop(order_id, None)
+        if not entry:
+            return
+        profile_id, interval = entry
+        intervals = self._intervals.get(profile_id, [])
+        position = bisect.bisect_left(intervals, interval)
+        if position < len(intervals) and intervals[position] == interval:
+            del intervals[position]
+
+    def move(self, order_id: int, start: datetime, duration_hours: float):
+        """Перенести заказ на другое время"""
+        if not self._loaded:
+            return
+        entry = self._by_order.get(order_id)
+        if not entry:
+            return
+        profile_id, _ = entry
+        self.add(order_id, profile_id, start, duration_hours)
+
+    # Чтение
+
+    def find_conflict(
+        self,
+        profile_id: int,
+        start: datetime,
+        end: datetime,
+        exclude_order_id: Optional[int] = None
+    ) -> Optional[Interval]:
+        """
+        Найти занятый интервал, пересекающийся с [start, end)
+
+        Returns:
+            Первый пересекающийся интервал или None
+        """
+        intervals = self._intervals.get(profile_id)
+        if not intervals:
+            return None
+
+        start = to_local_naive(start)
+        end = to_local_naive(end)
+
+        # Пересечь [start, end) могут только интервалы, начавшиеся не раньше
+        # start - max_length и раньше end
+        lowest_start = start - self._max_length.get(profile_id, timedelta(0))
+        position = bisect.bisect_left(intervals, (lowest_start,))
+        while position < len(intervals):
+            interval = intervals[position]
+            if interval[0] >= end:
+                break
+            if interval[1] > start and interval[2] != exclude_order_id:
+                return interval
+            position += 1
+        return None
+
+    def nearest_free(
+        self,
+        profile_id: int,
+        start: datetime,
+        duration_hours: float,
+        not_before: Optional[datetime] = None,
+        exclude_order_id: Optional[int] = None
+    ) -> datetime:
+        """
+        Ближайшее к start свободное время начала для встречи заданной длительности
+
+        Рассматриваются сдвиг вперед (сразу после мешающих встреч) и назад
+        (чтобы закончить до них), выбирается ближайший вариант не раньше not_before.
+        """
+        start = to_local_naive(start)
+        length = timedelta(hours=duration_hours)
+        if not_before is not None:
+            not_before = to_local_naive(not_before)
+
+        # Сдвиг вперед: начинаем сразу после каждой мешающей встречи
+        later = start
+        while True:
+            conflict = self.find_conflict(profile_id, later, later + length, exclude_order_id)
+            if conflict is None:
+                break
+            later = conflict[1]
+
+        # Сдвиг назад: заканчиваем до начала каждой мешающей встречи
+        earlier = start
+        while True:
+            conflict = self.find_conflict(profile_id, earlier, earlier + length, exclude_order_id)
+            if conflict is None:
+                break
+            earlier = conflict[0] - length
+            if not_before is not None and earlier < not_before:
+                earlier = None
+                break
+
+        if earlier is not None and start - earlier < later - start:
+            return earlier
+        return later
+
+
+# Общий экземпляр индекса для всего процесса
+slot_index = SlotIndex()
@@ -0,0 +1,255 @@
+"""Сводная статистика заказов для админки"""
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from bot.database.models import Order, OrderStats
+
+logger = logging.getLogger(__name__)
+
+# Размер пачки заказов при пересчете статистики
+REBUILD_BATCH_SIZE = 500
+
+SCOPE_TOTAL = "total"
+SCOPE_DAY = "day"
+SCOPE_PROFILE = "profile"
+SCOPE_GAME = "game"
+
+
+@dataclass(frozen=True)
+class OrderContribution:
+    """Вклад одного заказа в статистику"""
+    profile_id: int
+    game_id: Optional[int]
+    date: datetime
+    total_price: float
+    payment_status: str
+
+    @classmethod
+    def from_order(cls, order: Order) -> "OrderContribution":
+        return cls(
+            profile_id=order.profile_id,
+            game_id=order.game_id,
+            date=order.date,
+            total_price=order.total_price or 0,
+            # До flush значение по умолчанию еще не подставлено
+            payment_status=order.payment_status or "not_paid",
+        )
+
+    @classmethod
+    def from_row(cls, row) -> "OrderContribution":
+        """Вклад по строке запроса с колонками profile_id, game_id, date, total_price, payment_status"""
+        return cls(
+            profile_id=row.profile_id,
+            game_id=row.game_id,
+            date=row.date,
+            total_price=row.total_price or 0,
+            payment_status=row.payment_status or "not_paid",
+        )
+
+    def keys(self) -> List[Tuple[str, str]]:
+        """Строки статистики, в которые входит заказ"""
+        return [
+            (SCOPE_TOTAL, ""),
+            (SCOPE_DAY, self.date.date().isoformat()),
+            (SCOPE_PROFILE, str(self.profile_id)),
+            (SCOPE_GAME, str(self.game_id or 0)),
+        ]
+
+    def deltas(self, sign: int) -> Dict[str, float]:
+        """Изменения счетчиков при добавлении (sign=1) или удалении (sign=-1) заказа"""
+        paid = self.payment_status == "paid"
+        return {
+            "orders_count": sign,
+            "booked_amount": sign * self.total_price,
+            "paid_count": sign if paid else 0,
+            "revenue": sign * self.total_price if paid else 0,
+        }
+
+
+async def _add_to_row(session: AsyncSession, scope: str, key: str, deltas: Dict[str, float]):
+    """Прибавить значения к строке статистики (создать строку, если ее нет)"""
+    result = await session.execute(
+        update(OrderStats)
+        .where(OrderStats.scope == scope)
+        .where(OrderStats.key == key)
+        .values({
+            name: getattr(OrderStats, name) + value
+            for name, value in deltas.items()
+        })
+    )
+    if result.rowcount == 0:
+        session.add(OrderStats(
+            scope=scope,
+            key=key,
+            orders_count=deltas.get("orders_count", 0),
+            paid_count=deltas.get("paid_count", 0),
+            booked_amount=deltas.get("booked_amount", 0),
+            revenue=deltas.get("revenue", 0),
+            cancelled_count=deltas.get("cancelled_count", 0),
+        ))
+        # Строка должна появиться до следующего UPDATE по тому же ключу
+        await session.flush()
+
+
+async def apply_order(session: AsyncSession, contribution: OrderContribution, sign: int = 1):
+    """
+    Учесть заказ в статистике (sign=1) или убрать его (sign=-1)
+
+    Вызывается в транзакции изменения заказа, до commit.
+    """
+    deltas = contribution.deltas(sign)
+    for scope, key in contribution.keys():
+        await _add_to_row(session, scope, key, deltas)
+
+
+async def apply_change(session: AsyncSession, before: OrderContribution, after: OrderContribution):
+    """Учесть изменение заказа (статус оплаты, дата)"""
+    if before == after:
+        return
+    await apply_order(session, before, -1)
+    await apply_order(session, after, 1)
+
+
+async def apply_cancel(session: AsyncSession, contribution: OrderContribution):
+    """Учесть отмену (удаление) заказа"""
+    deltas = contribution.deltas(-1)
+    deltas["cancelled_count"] = 1
+    for scope, key in contribution.keys():
+        await _add_to_row(session, scope, key, deltas)
+
+
+def _accumulate(
+    totals: Dict[Tuple[str, str], Dict[str, float]],
+    contribution: OrderContribution,
+    deltas: Dict[str, float]
+):
+    """Прибавить изменения счетчиков заказа к агрегатам по строкам статистики"""
+    for key in contribution.keys():
+        for name, value in deltas.items():
+            totals[key][name] += value
+
+
+async def _apply_totals(session: AsyncSession, totals: Dict[Tuple[str, str], Dict[str, float]]):
+    """Записать агрегированные изменения: один UPDATE на строку статистики"""
+    for (scope, key), deltas in totals.items():
+        await _add_to_row(session, scope, key, dict(deltas))
+
+
+async def apply_bulk_change(session: AsyncSession, changes: Iterable[Tuple[OrderContribution, OrderContribution]]):
+    """Учесть изменение пачки заказов (пары до/после), сложив изменения по строкам"""
+    totals: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for before, after in changes:
+        if before == after:
+            continue
+        _accumulate(totals, before, before.deltas(-1))
+        _accumulate(totals, after, after.deltas(1))
+    await _apply_totals(session, totals)
+
+
+async def apply_bulk_cancel(session: AsyncSession, contributions: Iterable[OrderContribution]):
+    """Учесть отмену пачки заказов"""
+    totals: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for contribution in contributions:
+        deltas = contribution.deltas(-1)
+        deltas["cancelled_count"] = 1
+        _accumulate(totals, contribution, deltas)
+    await _apply_totals(session, totals)
+
+
+async def get_rows(session: AsyncSession, scope: str, keys: Iterable[str]) -> Dict[str, OrderStats]:
+    """Строки статистики по ключам (поиск по уникальному индексу)"""
+    keys = list(keys)
+    if not keys:
+        return {}
+    result = await session.execute(
+        select(OrderStats)
+        .where(OrderStats.scope == scope)
+        .where(OrderStats.key.in_(keys))
+    )
+    return {row.key: row for row in result.scalars().all()}
+
+
+async def get_top(session: AsyncSession, scope: str, limit: int = 10) -> List[OrderStats]:
+    """Строки области статистики с наибольшей выручкой"""
+    result = await session.execute(
+        select(OrderStats)
+        .where(OrderStats.scope == scope)
+        .order_by(OrderStats.revenue.desc(), OrderStats.booked_amount.desc())
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def rebuild(session: AsyncSession, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """
+    Пересчитать статистику по всем заказам
+
+    Заказы читаются пачками по id (keyset), агрегаты копятся в памяти и
+    записываются вместе с удалением старых строк в одной транзакции.
+
+    Returns:
+        Количество обработанных заказов
+    """
+    totals: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    last_id = 0
+    processed = 0
+
+    while True:
+        result = await session.execute(
+            select(
+                Order.id, Order.profile_id, Order.game_id, Order.date,
+                Order.total_price, Order.payment_status,
+            )
+            .where(Order.id > last_id)
+            .order_by(Order.id)
+            .limit(batch_size)
+        )
+        rows = result.all()
+        if not rows:
+            break
+
+        for order_id, profile_id, game_id, order_date, total_price, payment_status in rows:
+            contribution = OrderContribution(
+                profile_id=profile_id,
+                game_id=game_id,
+                date=order_date,
+                total_price=total_price or 0,
+                payment_status=payment_status or "not_paid",
+            )
+            _accumulate(totals, contribution, contribution.deltas(1))
+
+        processed += len(rows)
+        last_id = rows[-1][0]
+        logger.info(f"[rebuild] Обработано заказов: {processed}")
+
+    # Отмененных заказов в БД уже нет, поэтому их счетчики переносятся из старых строк
+    result = await session.execute(
+        select(OrderStats.scope, OrderStats.key, OrderStats.cancelled_count)
+        .where(OrderStats.cancelled_count > 0)
+    )
+    for scope, key, cancelled_count in result.all():
+        totals[(scope, key)]["cancelled_count"] += cancelled_count
+
+    await session.execute(delete(OrderStats))
+    session.add_all([
+        OrderStats(
+            scope=scope,
+            key=key,
+            orders_count=int(values["orders_count"]),
+            paid_count=int(values["paid_count"]),
+            booked_amount=values["booked_amount"],
+            revenue=values["revenue"],
+            cancelled_count=int(values["cancelled_count"]),
+        )
+        for (scope, key), values in totals.items()
+    ])
+    await session.commit()
+
+    logger.info(f"[rebuild] Статистика пересчитана: заказов {processed}, строк {len(totals)}")
+    return processed
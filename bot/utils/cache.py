@@ -0,0 +1,176 @@
+"""Кэш данных геттеров диалогов с привязкой к версиям сущностей"""
+import functools
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+if TYPE_CHECKING:
+    # Модуль импортируется репозиториями, поэтому aiogram_dialog только для аннотаций
+    from aiogram_dialog import DialogManager
+
+logger = logging.getLogger(__name__)
+
+# Максимальное количество закэшированных результатов геттеров
+RENDER_CACHE_SIZE = 512
+
+
+class EntityVersions:
+    """
+    Версии сущностей в памяти процесса
+
+    Репозитории увеличивают версию сущности после каждого commit, поэтому
+    ключ кэша с версией устаревает сам, без запроса updated_at в БД.
+    Поколение типа сущности сбрасывает кэш всех сущностей этого типа
+    (например, переименование игры меняет текст всех анкет).
+    """
+
+    def __init__(self):
+        self._versions: Dict[Tuple[str, int], int] = {}
+        self._generations: Dict[str, int] = {}
+
+    def get(self, kind: str, entity_id: int) -> Tuple[int, int]:
+        """Текущая версия сущности: (поколение типа, версия сущности)"""
+        return self._generations.get(kind, 0), self._versions.get((kind, entity_id), 0)
+
+    def bump(self, kind: str, entity_id: int):
+        """Сущность изменилась"""
+        key = (kind, entity_id)
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def bump_all(self, kind: str):
+        """Изменились все сущности типа"""
+        self._generations[kind] = self._generations.get(kind, 0) + 1
+
+
+class RenderCache:
+    """LRU-кэш результатов геттеров"""
+
+    def __init__(self, maxsize: int = RENDER_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self._items.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+
+class TTLCache:
+    """Кэш с ограниченным временем жизни записей"""
+
+    def __init__(self, ttl: float, maxsize: int = 128):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._items: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._items[key]
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._items[key] = (time.monotonic() + self.ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+
+# Общие экземпляры для всего процесса
+entity_versions = EntityVersions()
+render_cache = RenderCache()
+
+
+def _freeze(value: Any) -> Hashable:
+    """Приведение значения из dialog_data к хэшируемому виду"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def cached_getter(
+    kind: str,
+    entity_id: Callable[["DialogManager"], Optional[int]],
+    data_keys: Iterable[str] = (),
+    related: Optional[Callable[[Dict[str, Any]], Iterable[Tuple[str, Optional[int]]]]] = None
+):
+    """
+    Кэширование геттера диалога
+
+    Ключ: (геттер, id сущности, версия сущности, значения data_keys из dialog_data).
+    Пока сущность не менялась, повторная отрисовка не обращается к БД и не
+    форматирует текст заново. Геттер не должен менять dialog_data.
+
+    Args:
+        kind: Тип сущности ("profile", "order")
+        entity_id: Функция, возвращающая id сущности по dialog_manager
+            (None - без кэширования)
+        data_keys: Ключи dialog_data, от которых зависит результат
+        related: Функция, возвращающая по результату связанные сущности
+            [(тип, id)]; если версия любой из них изменилась, результат
+            пересчитывается (например, анкета в карточке заказа)
+    """
+    data_keys = tuple(data_keys)
+
+    def related_versions(result: Dict[str, Any]) -> Tuple:
+        if related is None:
+            return ()
+        return tuple(
+            (related_kind, related_id, entity_versions.get(related_kind, related_id))
+            for related_kind, related_id in related(result)
+            if related_id is not None
+        )
+
+    def decorator(getter):
+        name = f"{getter.__module__}.{getter.__qualname__}"
+
+        @functools.wraps(getter)
+        async def wrapper(dialog_manager: "DialogManager", **kwargs):
+            current_id = entity_id(dialog_manager)
+            if current_id is None:
+                return await getter(dialog_manager, **kwargs)
+
+            key = (
+                name,
+                current_id,
+                entity_versions.get(kind, current_id),
+                tuple(_freeze(dialog_manager.dialog_data.get(data_key)) for data_key in data_keys),
+            )
+            cached = render_cache.get(key)
+            if cached is not None:
+                result, versions = cached
+                if versions == related_versions(result):
+                    return result
+
+            result = await getter(dialog_manager, **kwargs)
+            render_cache.set(key, (result, related_versions(result)))
+            return result
+
+        return wrapper
+
+    return decorator
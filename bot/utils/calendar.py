@@ -1,12 +1,67 @@
 """Утилиты для работы с календарем aiogram-dialog"""
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
 import pytz
-from aiogram_dialog.widgets.kbd import Calendar
-from aiogram_dialog.widgets.text import CalendarScopeText
+from aiogram_dialog import DialogManager
+from aiogram_dialog.widgets.kbd import Calendar, CalendarScope, CalendarUserConfig
+from aiogram_dialog.widgets.kbd.calendar_kbd import (
+    CalendarDaysView, CalendarMonthView, CalendarYearsView, CalendarScopeView
+)
+from aiogram_dialog.widgets.text import Text, Format
 
 from bot.config import TIMEZONE
 
+# Отметки дней в календаре бронирования
+DAY_MARKS = {
+    "free": "{day}",
+    "partial": "{day}½",
+    "full": "✖",
+}
+PAST_DAY_MARK = "·"
+
+
+class DayStatusText(Text):
+    """
+    Текст кнопки дня с отметкой занятости
+
+    Статусы дней берутся из данных окна: {"day_statuses": {"2025-11-26": "partial"}}
+    """
+
+    async def _render_text(self, data: Dict, manager: DialogManager) -> str:
+        day: date = data["date"]
+        today = datetime.now(pytz.timezone(TIMEZONE)).date()
+        if day < today:
+            return PAST_DAY_MARK
+
+        statuses = data["data"].get("day_statuses", {})
+        mark = DAY_MARKS.get(statuses.get(day.isoformat(), "free"), DAY_MARKS["free"])
+        text = mark.format(day=day.day)
+        if day == today:
+            return f"[{text}]"
+        return text
+
+
+class BookingCalendar(Calendar):
+    """Календарь с занятостью анкеты по дням и часовым поясом бота"""
+
+    def _init_views(self) -> Dict[CalendarScope, CalendarScopeView]:
+        return {
+            CalendarScope.DAYS: CalendarDaysView(
+                self._item_callback_data,
+                self.config,
+                date_text=DayStatusText(),
+                today_text=DayStatusText(),
+                header_text=Format("🗓 {date:%m.%Y}"),
+                prev_month_text=Format("<< {date:%m.%Y}"),
+                next_month_text=Format("{date:%m.%Y} >>"),
+            ),
+            CalendarScope.MONTHS: CalendarMonthView(self._item_callback_data, self.config),
+            CalendarScope.YEARS: CalendarYearsView(self._item_callback_data, self.config),
+        }
+
+    async def _get_user_config(self, data: Dict, manager: DialogManager) -> CalendarUserConfig:
+        return CalendarUserConfig(timezone=pytz.timezone(TIMEZONE))
+
 
 def get_calendar_widget(
     id_prefix: str = "calendar",
@@ -24,12 +79,20 @@ def get_calendar_widget(
     """
     calendar = Calendar(
         id=f"{id_prefix}_calendar",
-        on_date_selected=on_date_selected,
-        on_scope_changed=None,
+        on_click=on_date_selected,
     )
     return calendar
 
 
+def get_calendar_month(manager: DialogManager, widget_id: str) -> date:
+    """Первый день месяца, который сейчас показывает календарь"""
+    calendar = manager.find(widget_id)
+    offset = calendar.get_offset() if calendar else None
+    if offset is None:
+        offset = datetime.now(pytz.timezone(TIMEZONE)).date()
+    return offset.replace(day=1)
+
+
 def get_min_date() -> datetime:
     """Получить минимальную дату для календаря (сегодня)"""
     tz = pytz.timezone(TIMEZONE)
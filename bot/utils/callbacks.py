@@ -0,0 +1,38 @@
+"""Ответы на callback с учетом предварительного подтверждения"""
+import logging
+from typing import Optional
+
+from aiogram.types import CallbackQuery
+from aiogram_dialog import DialogManager
+
+from bot.services.outbound import outbound, PRIORITY_INTERACTIVE
+
+logger = logging.getLogger(__name__)
+
+
+async def answer_callback(
+    c: CallbackQuery,
+    manager: DialogManager,
+    text: Optional[str] = None,
+    show_alert: bool = False
+):
+    """
+    Ответить на callback
+
+    Если AckFirstCallbackMiddleware уже ответил на callback, повторный ответ
+    невозможен: всплывающее уведомление (show_alert) отправляется обычным
+    сообщением, короткая подсказка без alert только пишется в лог.
+    """
+    if not manager.middleware_data.get("callback_answered"):
+        await c.answer(text, show_alert=show_alert)
+        return
+
+    if not text:
+        return
+
+    if not show_alert:
+        logger.info(f"[answer_callback] Callback уже подтвержден, подсказка не показана: {text}")
+        return
+
+    chat_id = c.message.chat.id if c.message else c.from_user.id
+    await outbound.send_message(c.bot, chat_id, text, priority=PRIORITY_INTERACTIVE)
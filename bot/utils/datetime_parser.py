@@ -0,0 +1,266 @@
+"""Быстрый разбор даты и времени, введенных пользователем
+
+Большинство вводов при бронировании имеют простой вид (26.11.2025, 14 июня,
+завтра, 19:00, 7pm), поэтому они разбираются заранее скомпилированными
+регулярными выражениями. dateparser импортируется лениво и используется только
+как запасной вариант для редких форм.
+"""
+import re
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+
+from bot.config import TIMEZONE
+
+# Месяцы по первым трем буквам (русские в любом падеже и английские)
+_MONTHS = {
+    "янв": 1, "фев": 2, "мар": 3, "апр": 4, "май": 5, "мая": 5,
+    "июн": 6, "июл": 7, "авг": 8, "сен": 9, "окт": 10, "ноя": 11, "дек": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+# Дни недели по первым трем буквам (0 - понедельник)
+_WEEKDAYS = {
+    "пон": 0, "вто": 1, "сре": 2, "чет": 3, "пят": 4, "суб": 5, "вос": 6,
+    "mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6,
+}
+
+_RELATIVE_DAYS = {
+    "сегодня": 0,
+    "today": 0,
+    "завтра": 1,
+    "tomorrow": 1,
+    "послезавтра": 2,
+    "day after tomorrow": 2,
+}
+
+# 26.11.2025, 26/11/25, 26-11, 26.11
+_NUMERIC_DATE_RE = re.compile(r"^(\d{1,2})[./-](\d{1,2})(?:[./-](\d{2}|\d{4}))?$")
+# 2025-11-26
+_ISO_DATE_RE = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$")
+# 14 июня, 14 июня 2025, 14 june
+_DAY_MONTH_RE = re.compile(r"^(\d{1,2})\s+([a-zа-яё]{3,9})\.?(?:\s+(\d{4}))?$")
+# june 14, june 14th, june 14 2025
+_MONTH_DAY_RE = re.compile(r"^([a-z]{3,9})\.?\s+(\d{1,2})(?:st|nd|rd|th)?,?(?:\s+(\d{4}))?$")
+# через 3 дня, in 3 days
+_IN_DAYS_RE = re.compile(r"^(?:через|in)\s+(\d{1,2})\s+(?:дн|день|days?)[а-я]*$")
+# пятница, в пятницу, friday, on friday
+_WEEKDAY_RE = re.compile(r"^(?:(?:в|во|on)\s+)?([a-zа-яё]{3,11})$")
+# Лишние хвосты после года: "2025 г.", "2025 года" (но не "авг")
+_YEAR_SUFFIX_RE = re.compile(r"(?<=\d{4})\s*(?:г\.?|года|год)$")
+
+# 19:00, 19.30, 19 30, 1930, 19, 19ч, 19 часов, 19ч 30мин ("мин" - только после минут)
+_TIME_24_RE = re.compile(r"^(\d{1,2})(?:(?:[:.\s-]|ч\s*)(\d{2})(?:\s*мин)?)?\s*(?:ч|час|часа|часов|h)?\.?$")
+_TIME_COMPACT_RE = re.compile(r"^(\d{2})(\d{2})$")
+# 7pm, 7:30 pm, 7 a.m.
+_TIME_AMPM_RE = re.compile(r"^(\d{1,2})(?:[:.](\d{2}))?\s*([ap])\.?\s?m\.?$")
+# 7 вечера, 9 утра, 3 дня, 2 ночи, 7:30 вечера
+_TIME_RU_PERIOD_RE = re.compile(r"^(\d{1,2})(?:[:.](\d{2}))?\s*(утра|дня|вечера|ночи)$")
+# Предлог перед временем: "в 19:00", "at 7pm"
+_TIME_PREFIX_RE = re.compile(r"^(?:в|к|at)\s+")
+
+_NAMED_TIMES = {
+    "полдень": (12, 0),
+    "noon": (12, 0),
+    "полночь": (0, 0),
+    "midnight": (0, 0),
+}
+
+
+def _normalize(text: str) -> str:
+    """Нижний регистр, без лишних пробелов"""
+    return " ".join(text.strip().lower().split())
+
+
+def _safe_date(year: int, month: int, day: int) -> Optional[date]:
+    """Создание даты без исключений для несуществующих дат"""
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _with_year(day: int, month: int, year_str: Optional[str], today: date) -> Optional[date]:
+    """
+    Дата с учетом года
+
+    Если год не указан, берется ближайшая такая дата не раньше сегодняшней.
+    """
+    if year_str:
+        year = int(year_str)
+        if year < 100:
+            year += 2000
+        return _safe_date(year, month, day)
+
+    result = _safe_date(today.year, month, day)
+    if result is not None and result < today:
+        result = _safe_date(today.year + 1, month, day)
+    return result
+
+
+def _month_from_word(word: str) -> Optional[int]:
+    """Номер месяца по слову (июня, июнь, june, jun)"""
+    return _MONTHS.get(word[:3])
+
+
+def parse_date_fast(text: str, today: date) -> Optional[date]:
+    """
+    Разбор даты заранее скомпилированными выражениями
+
+    Args:
+        text: Введенный текст
+        today: Сегодняшняя дата (в часовом поясе бота)
+
+    Returns:
+        Дата или None, если форма не распознана
+    """
+    value = _YEAR_SUFFIX_RE.sub("", _normalize(text))
+    if not value:
+        return None
+
+    if value in _RELATIVE_DAYS:
+        return today + timedelta(days=_RELATIVE_DAYS[value])
+
+    match = _NUMERIC_DATE_RE.match(value)
+    if match:
+        day, month, year = match.groups()
+        return _with_year(int(day), int(month), year, today)
+
+    match = _ISO_DATE_RE.match(value)
+    if match:
+        year, month, day = match.groups()
+        return _safe_date(int(year), int(month), int(day))
+
+    match = _DAY_MONTH_RE.match(value)
+    if match:
+        day, month_word, year = match.groups()
+        month = _month_from_word(month_word)
+        if month:
+            return _with_year(int(day), month, year, today)
+        return None
+
+    match = _MONTH_DAY_RE.match(value)
+    if match:
+        month_word, day, year = match.groups()
+        month = _month_from_word(month_word)
+        if month:
+            return _with_year(int(day), month, year, today)
+        return None
+
+    match = _IN_DAYS_RE.match(value)
+    if match:
+        return today + timedelta(days=int(match.group(1)))
+
+    match = _WEEKDAY_RE.match(value)
+    if match:
+        weekday = _WEEKDAYS.get(match.group(1)[:3])
+        if weekday is not None:
+            return today + timedelta(days=(weekday - today.weekday()) % 7)
+
+    return None
+
+
+def parse_date_fallback(text: str, today: date) -> Optional[date]:
+    """
+    Разбор даты через dateparser (медленно, импорт при первом вызове)
+
+    Лучше вызывать через asyncio.to_thread, чтобы не блокировать event loop.
+    """
+    import dateparser
+
+    parsed = dateparser.parse(text, languages=['ru', 'en'], settings={
+        'TIMEZONE': TIMEZONE,
+        'RELATIVE_BASE': datetime.combine(today, datetime.min.time()),
+        'PREFER_DATES_FROM': 'future',
+    })
+    return parsed.date() if parsed else None
+
+
+def parse_date(text: str, today: date) -> Optional[date]:
+    """Разбор даты: сначала быстрый путь, затем dateparser"""
+    result = parse_date_fast(text, today)
+    if result is not None:
+        return result
+    return parse_date_fallback(text, today)
+
+
+def _valid_time(hours: int, minutes: int) -> Optional[Tuple[int, int]]:
+    """Проверка диапазона часов и минут"""
+    if 0 <= hours < 24 and 0 <= minutes < 60:
+        return hours, minutes
+    return None
+
+
+def parse_time_fast(text: str) -> Optional[Tuple[int, int]]:
+    """
+    Разбор времени заранее скомпилированными выражениями
+
+    Поддерживаются формы: 19:00, 19.30, 19 30, 1930, 19, 19ч, 7pm, 7:30 pm,
+    7 вечера, 9 утра, полдень.
+
+    Returns:
+        (часы, минуты) или None
+    """
+    value = _TIME_PREFIX_RE.sub("", _normalize(text))
+    if not value:
+        return None
+
+    if value in _NAMED_TIMES:
+        return _NAMED_TIMES[value]
+
+    match = _TIME_24_RE.match(value)
+    if match:
+        hours, minutes = match.groups()
+        return _valid_time(int(hours), int(minutes or 0))
+
+    match = _TIME_COMPACT_RE.match(value)
+    if match:
+        hours, minutes = match.groups()
+        return _valid_time(int(hours), int(minutes))
+
+    match = _TIME_AMPM_RE.match(value)
+    if match:
+        hours, minutes, period = match.groups()
+        hours = int(hours)
+        if not 1 <= hours <= 12:
+            return None
+        hours = hours % 12 + (12 if period == "p" else 0)
+        return _valid_time(hours, int(minutes or 0))
+
+    match = _TIME_RU_PERIOD_RE.match(value)
+    if match:
+        hours, minutes, period = match.groups()
+        hours = int(hours)
+        if not 1 <= hours <= 12:
+            return None
+        if period in ("дня", "вечера") and hours < 12:
+            hours += 12
+        elif period == "ночи" and hours == 12:
+            hours = 0
+        return _valid_time(hours, int(minutes or 0))
+
+    return None
+
+
+def parse_time_fallback(text: str) -> Optional[Tuple[int, int]]:
+    """
+    Разбор времени через dateparser (медленно, импорт при первом вызове)
+
+    Результат принимается, только если dateparser действительно нашел время,
+    а не одну лишь дату с полуночью по умолчанию.
+    """
+    from dateparser.date import DateDataParser
+
+    parser = DateDataParser(languages=['ru', 'en'], settings={'RETURN_TIME_AS_PERIOD': True})
+    data = parser.get_date_data(text)
+    if data.date_obj is None or data.period != "time":
+        return None
+    return data.date_obj.hour, data.date_obj.minute
+
+
+def parse_time(text: str) -> Optional[Tuple[int, int]]:
+    """Разбор времени: сначала быстрый путь, затем dateparser"""
+    result = parse_time_fast(text)
+    if result is not None:
+        return result
+    return parse_time_fallback(text)
@@ -137,6 +137,18 @@ def format_order_summary(order: Order) -> str:
     return "\n".join(lines)
 
 
+PAYMENT_STATUS_TEXT = {
+    "not_paid": "❌ Не оплачено",
+    "processing": "⏳ В обработке",
+    "paid": "✅ Оплачено",
+}
+
+
+def format_payment_status(status: Optional[str]) -> str:
+    """Текстовое представление статуса оплаты"""
+    return PAYMENT_STATUS_TEXT.get(status, status or "Не указан")
+
+
 def format_date_for_display(date: datetime) -> str:
     """
     Форматирование даты для отображения
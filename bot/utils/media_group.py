@@ -0,0 +1,58 @@
+"""Сборка альбомов (media group) из отдельных сообщений"""
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from aiogram.types import Message
+
+logger = logging.getLogger(__name__)
+
+# Сколько секунд ждать следующую часть альбома
+MEDIA_GROUP_WINDOW = 0.8
+
+
+class MediaGroupCollector:
+    """
+    Буфер частей альбомов
+
+    Telegram присылает альбом отдельными сообщениями с общим media_group_id.
+    Первая часть ждет, пока части перестанут приходить в течение window
+    секунд, и получает весь альбом; остальные части получают None и должны
+    завершить обработку без изменений, чтобы не гоняться за dialog_data.
+    """
+
+    def __init__(self, window: float = MEDIA_GROUP_WINDOW):
+        self.window = window
+        self._groups: Dict[Tuple[int, str], List[Message]] = {}
+
+    async def collect(self, message: Message) -> Optional[List[Message]]:
+        """
+        Добавить сообщение в альбом
+
+        Returns:
+            Все сообщения альбома по порядку - для первой части (или [message]
+            для одиночного сообщения), None - для остальных частей
+        """
+        if not message.media_group_id:
+            return [message]
+
+        key = (message.chat.id, message.media_group_id)
+        group = self._groups.get(key)
+        if group is not None:
+            group.append(message)
+            return None
+
+        group = self._groups[key] = [message]
+        received = 0
+        # Ждем, пока за окно не придет ни одной новой части
+        while received != len(group):
+            received = len(group)
+            await asyncio.sleep(self.window)
+
+        del self._groups[key]
+        logger.info(f"[MediaGroupCollector.collect] Альбом {message.media_group_id}: частей {len(group)}")
+        return sorted(group, key=lambda part: part.message_id)
+
+
+# Общий экземпляр для всего процесса
+media_group_collector = MediaGroupCollector()
@@ -0,0 +1,118 @@
+"""Заглушка Bot API для проверки режима webhook без Telegram
+
+Запуск:
+    1. python fake_bot_api.py
+    2. В другом терминале бот с переменными окружения
+       BOT_MODE=webhook
+       TELEGRAM_API_URL=http://127.0.0.1:8081
+       WEBHOOK_BASE_URL=http://127.0.0.1:8080
+       WEBHOOK_SECRET=test-secret
+       python -m bot.main
+
+Заглушка отвечает на методы Bot API, а после setWebhook отправляет на
+webhook запрос с неверным секретом (ожидается 401) и /start с верным
+(ожидается быстрый 200), затем ждет sendMessage от бота и печатает итог.
+"""
+import asyncio
+import io
+import itertools
+import json
+import sys
+import time
+
+from aiohttp import web, ClientSession
+
+# Настройка кодировки для Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+
+HOST = "127.0.0.1"
+PORT = 8081
+# Сколько секунд ждать ответа бота на /start
+REPLY_TIMEOUT = 10
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Test bot", "username": "test_bot"}
+TEST_USER = {"id": 1001, "is_bot": False, "first_name": "Тест", "username": "tester"}
+
+message_ids = itertools.count(1)
+calls = []
+reply_received = asyncio.Event()
+
+
+def make_message(params: dict) -> dict:
+    """Ответ на send*/edit* - сообщение в чат из запроса"""
+    return {
+        "message_id": next(message_ids),
+        "date": int(time.time()),
+        "chat": {"id": int(params.get("chat_id", TEST_USER["id"])), "type": "private"},
+        "from": BOT_USER,
+        "text": params.get("text", ""),
+    }
+
+
+async def read_params(request: web.Request) -> dict:
+    if request.content_type == "application/json":
+        return await request.json()
+    return dict(await request.post())
+
+
+async def handle_method(request: web.Request) -> web.Response:
+    method = request.match_info["method"]
+    params = await read_params(request)
+    calls.append(method)
+    print(f"← {method} {json.dumps(params, ensure_ascii=False)[:200]}")
+
+    if method == "getMe":
+        result = BOT_USER
+    elif method.startswith(("send", "edit")):
+        result = make_message(params)
+        if method == "sendMessage":
+            reply_received.set()
+    else:
+        result = True
+
+    if method == "setWebhook":
+        asyncio.create_task(check_webhook(params["url"], params.get("secret_token", "")))
+    return web.json_response({"ok": True, "result": result})
+
+
+async def check_webhook(url: str, secret: str):
+    """Проверка webhook: неверный секрет, затем /start"""
+    await asyncio.sleep(0.5)
+    update = {
+        "update_id": 1,
+        "message": {
+            "message_id": 1,
+            "date": int(time.time()),
+            "chat": {"id": TEST_USER["id"], "type": "private"},
+            "from": TEST_USER,
+            "text": "/start",
+            "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+        },
+    }
+    async with ClientSession() as session:
+        async with session.post(url, json=update, headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"}) as response:
+            print(f"Неверный секрет: {response.status} (ожидается 401)")
+
+        started = time.perf_counter()
+        async with session.post(url, json=update, headers={"X-Telegram-Bot-Api-Secret-Token": secret}) as response:
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"/start: {response.status} за {elapsed:.1f} мс (ожидается 200)")
+
+    try:
+        await asyncio.wait_for(reply_received.wait(), timeout=REPLY_TIMEOUT)
+        print("✅ Бот ответил на /start через заглушку")
+    except asyncio.TimeoutError:
+        print(f"❌ Бот не ответил за {REPLY_TIMEOUT} с")
+    print(f"Вызванные методы: {', '.join(calls)}")
+
+
+def main():
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", handle_method)
+    print(f"Заглушка Bot API: http://{HOST}:{PORT}")
+    web.run_app(app, host=HOST, port=PORT, print=None)
+
+
+if __name__ == "__main__":
+    main()
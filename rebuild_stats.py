@@ -0,0 +1,19 @@
+"""Скрипт для пересчета сводной статистики заказов"""
+import asyncio
+from bot.database.database import async_session_maker, engine, init_db
+from bot.services import stats as order_stats
+
+
+async def rebuild_stats():
+    """Пересчет статистики по всем заказам пачками"""
+    # Создаем таблицу статистики, если ее еще нет
+    await init_db()
+    
+    async with async_session_maker() as session:
+        processed = await order_stats.rebuild(session)
+    
+    print(f"[OK] Order stats rebuilt, orders processed: {processed}")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_stats())